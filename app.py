@@ -1,85 +1,89 @@
-from flask import Flask, render_template, request, jsonify, send_from_directory
-from markdown2 import markdown
-from pathlib import Path
-import yaml
-import logging
-import simulation
+from flask import (
+    Flask,
+    Response,
+    render_template,
+    request,
+    jsonify,
+    send_file,
+    send_from_directory,
+    stream_with_context,
+    url_for,
+)
+import os
+import assets
+from jobs import DONE, FAILED, TIMED_OUT, JobQueue, QueueFull
+from post_index import PostIndex
+from response_cache import ResponseCache, cache_key, conditional_response
+import wire_format
 
 app = Flask(__name__)
 
-POSTS_DIRECTORY = "posts"
+# The simulation engine and NumPy are imported by the routes that use them,
+# so workers start, and blog pages are served, without loading either.
 
+POSTS_DIRECTORY = "posts"
 
-def load_posts():
-    posts = []
-    # Load local Markdown posts
-    for md_file in Path(POSTS_DIRECTORY).glob("*.md"):
-        with open(md_file, "r", encoding="utf-8") as file:
-            content = file.read()
-            if content.startswith("---"):
-                _, front_matter, md_content = content.split("---", 2)
-                metadata = yaml.safe_load(front_matter)
-                metadata["content"] = md_content.strip()
-            else:
-                metadata = {
-                    "title": "Untitled",
-                    "description": "",
-                    "image": "",
-                    "content": content,
-                }
-            metadata["filename"] = md_file.stem
-            posts.append(metadata)
-    
-    # Load Medium posts from YAML
-    medium_posts_file = Path(f"{POSTS_DIRECTORY}/medium_posts.yaml")
-    try:
-        with open(medium_posts_file, "r", encoding="utf-8") as file:
-            medium_posts = yaml.safe_load(file)
-            for post in medium_posts:
-                post["is_medium"] = True  # Add a flag for Medium posts
-                posts.append(post)
-    except Exception as e:
-        logging.error(f"Error loading Medium posts: {e}")
+# Parsed posts, refreshed per request by mtime, or every few seconds by a
+# background thread when PYISRU_WATCH_POSTS is set to an interval in seconds
+post_index = PostIndex(
+    POSTS_DIRECTORY,
+    watch_interval_s=float(os.environ.get("PYISRU_WATCH_POSTS", 0)) or None,
+)
 
-    # Sort posts by title or add custom sorting
-    return posts
+job_queue = JobQueue()
 
+# Rendered pages and seeded simulation results, keyed by their inputs
+response_cache = ResponseCache()
+PAGE_CACHE_CONTROL = "no-cache"  # Always revalidate; unchanged pages get a 304
+SIMULATION_CACHE_CONTROL = "public, max-age=86400"
 
 
 @app.route("/")
 def index():
-    posts = load_posts()
-    return render_template("index.html", posts=posts)
+    version, posts = post_index.posts()
+    entry = response_cache.get_or_build(
+        cache_key("index", version, assets.revision()),
+        lambda: render_template("index.html", posts=posts),
+        "text/html",
+    )
+    return conditional_response(entry, PAGE_CACHE_CONTROL)
 
 
 @app.route("/post/<filename>")
 def post(filename):
-    filepath = Path(POSTS_DIRECTORY) / f"{filename}.md"
-    if not filepath.exists():
+    post = post_index.get(filename)
+    if post is None:
         return "Post not found", 404
 
-    with open(filepath, "r", encoding="utf-8") as file:
-        content = file.read()
-        if content.startswith("---"):
-            _, front_matter, md_content = content.split("---", 2)
-            metadata = yaml.safe_load(front_matter)
-            content = md_content.strip()
-        else:
-            metadata = {"title": "Untitled", "image": ""}
-        
-        html_content = markdown(content, extras=["fenced-code-blocks", "tables"])
-
-    return render_template(
-        "post.html",
-        content=html_content,
-        title=metadata.get("title", "Untitled"),
-        image=metadata.get("image", "")
+    entry = response_cache.get_or_build(
+        cache_key("post", filename, post.key, assets.revision()),
+        lambda: render_template(
+            "post.html",
+            content=post.html,
+            title=post.metadata.get("title", "Untitled"),
+            image=post.metadata.get("image", ""),
+        ),
+        "text/html",
     )
+    return conditional_response(entry, PAGE_CACHE_CONTROL)
+
+
+app.jinja_env.globals.update(
+    asset_url=assets.asset_url,
+    image_url=assets.image_url,
+    image_srcset=assets.image_srcset,
+)
 
 
 @app.route("/static/images/<path:filename>")
 def images(filename):
-    return send_from_directory("static/images", filename)
+    # Originals, for clients without a build; pages link to the derivatives
+    return send_from_directory("static/images", filename, max_age=86400)
+
+
+@app.route("/static/build/<path:filename>")
+def built_asset(filename):
+    return assets.send_built(filename)
 
 
 @app.route("/dashboard")
@@ -87,12 +91,255 @@ def dashboard():
     return render_template("dashboard.html")
 
 
-@app.route("/run_simulation", methods=["POST"])
+def result_view():
+    """Column projection, time window and reduction requested for a result.
+
+    columns: comma-separated column names (all by default)
+    start_hour, end_hour: half-open window of hours to return
+    points: approximate rows to keep per column
+    downsample: "minmax" (each bucket's extremes, the default) or "lttb"
+    aggregate: comma-separated per-sol statistics (mean, min, max, sum),
+        returned instead of hourly rows
+    """
+    def names(parameter):
+        value = request.values.get(parameter, "")
+        return tuple(name for name in value.split(",") if name)
+
+    return {
+        "columns": names("columns") or None,
+        "start_hour": request.values.get("start_hour", type=float),
+        "end_hour": request.values.get("end_hour", type=float),
+        "points": request.values.get("points", type=int),
+        "method": request.values.get("downsample", "minmax"),
+        "aggregates": names("aggregate"),
+    }
+
+
+def result_encoding():
+    """Float dtype for the binary wire format, or None for JSON.
+
+    Binary is sent for format=binary or when the client accepts
+    wire_format.MIMETYPE; dtype=float32 halves it at reduced precision.
+    """
+    if request.values.get("format") != "binary" and (
+        wire_format.MIMETYPE not in request.accept_mimetypes.values()
+    ):
+        return None
+    return request.values.get("dtype", "float64")
+
+
+def serialize_view(recorder, view, encoding=None):
+    """(body, mimetype) for the requested view of a recorder."""
+    from lib.downsample import select
+
+    columns = select(recorder, **view)
+    if encoding is not None:
+        return wire_format.encode(columns, recorder.metadata, encoding), wire_format.MIMETYPE
+    data = {name: values.tolist() for name, values in columns.items()}
+    data.update(recorder.metadata)
+    return app.json.dumps(data), "application/json"
+
+
+def requested_plant():
+    """The plant description named by the `plant` parameter (the default
+    plant if absent). Only the names in data/plants are accepted, never
+    paths."""
+    from lib.plant_config import DEFAULT_PLANT, available_plants
+
+    plant = request.values.get("plant", DEFAULT_PLANT)
+    plants = available_plants()
+    if plant not in plants:
+        raise ValueError(f"Unknown plant {plant!r}; available: {', '.join(plants)}")
+    return plant
+
+
+def seeded_simulation(sim_duration, seed, plant=None):
+    """Full results of a seeded run, kept so that each view of it (another
+    column, window or resolution) is cut from one simulation. Recorders are
+    kept in response_cache, so they share its byte budget with the
+    responses."""
+    import simulation
+    from lib.plant_config import DEFAULT_PLANT, plant_revision
+
+    # The file revision is part of the key, so an edited plant is re-run
+    revision = plant_revision(plant or DEFAULT_PLANT)
+    return response_cache.get_or_compute(
+        cache_key("seeded_simulation", plant, revision, sim_duration, seed),
+        lambda: simulation.run_simulation(
+            sim_duration=sim_duration, seed=seed, plan=plant
+        ),
+        lambda recorder: recorder.nbytes,
+    )
+
+
+@app.route("/run_simulation", methods=["GET", "POST"])
 def run_simulation_route():
-    sim_speed = float(request.form.get("sim_speed", 1.0))
-    sim_duration = float(request.form.get("sim_duration", 0.1))
-    simulation_data = simulation.run_simulation(sim_speed, sim_duration)
-    return jsonify(simulation_data)
+    import simulation
+    from lib.plant_config import plant_revision
+
+    sim_speed = float(request.values.get("sim_speed", 1.0))
+    sim_duration = float(request.values.get("sim_duration", 0.1))
+    seed = request.values.get("seed", type=int)
+    view = result_view()
+    encoding = result_encoding()
+    try:
+        plant = requested_plant()
+        if seed is None:
+            # Unseeded runs are random, so every request gets a fresh one
+            simulation_data = simulation.run_simulation(
+                sim_speed, sim_duration, plan=plant
+            )
+            body, mimetype = serialize_view(simulation_data, view, encoding)
+            response = Response(body, mimetype=mimetype)
+            response.headers["Cache-Control"] = "no-store"
+            return response
+
+        # sim_speed only paces playback in the dashboard and is not part of the key
+        entry = response_cache.get_or_build(
+            cache_key(
+                "run_simulation",
+                plant,
+                plant_revision(plant),
+                sim_duration,
+                seed,
+                view,
+                encoding,
+            ),
+            lambda: serialize_view(
+                seeded_simulation(sim_duration, seed, plant), view, encoding
+            )[0],
+            wire_format.MIMETYPE if encoding else "application/json",
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return conditional_response(entry, SIMULATION_CACHE_CONTROL)
+
+
+@app.route("/run_simulation/stream")
+def stream_simulation_route():
+    """Stream recorded rows as the engine produces them, one sol per message.
+
+    Sends NDJSON by default, server-sent events when the client accepts
+    text/event-stream or passes format=sse, or concatenated wire_format
+    messages, each with the run's `total_rows` in its header, for
+    format=binary.
+    """
+    import simulation
+
+    sim_duration = float(request.values.get("sim_duration", 0.1))
+    seed = request.values.get("seed", type=int)
+    chunk_hours = request.values.get("chunk_hours", 24, type=int)
+    try:
+        plant = requested_plant()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    columns = result_view()["columns"]
+    if columns:
+        from lib.recorder import COLUMNS, DERIVED_COLUMNS
+
+        unknown = sorted(set(columns) - set(COLUMNS) - set(DERIVED_COLUMNS))
+        if unknown:
+            return jsonify({"error": f"Unknown columns: {', '.join(unknown)}"}), 400
+    encoding = result_encoding()
+    if encoding is not None and encoding not in wire_format.DTYPES:
+        return jsonify({"error": f"Unknown dtype {encoding!r}"}), 400
+    use_sse = request.values.get("format") == "sse" or (
+        request.accept_mimetypes.best == "text/event-stream"
+    )
+    names = columns and ("hour", "sol", *columns)
+    total_rows = simulation.environment.total_time_steps(sim_duration)
+
+    def generate():
+        for chunk in simulation.iter_simulation(
+            sim_duration, seed=seed, chunk_hours=max(chunk_hours, 1), plan=plant
+        ):
+            if encoding is not None:
+                yield wire_format.encode(
+                    {name: chunk[name] for name in names or chunk},
+                    {"total_rows": total_rows},
+                    encoding,
+                )
+                continue
+            message = app.json.dumps(
+                chunk.to_json_dict(names)
+            )
+            yield f"data: {message}\n\n" if use_sse else message + "\n"
+        if use_sse:
+            yield "event: end\ndata: {}\n\n"
+
+    if encoding is not None:
+        mimetype = wire_format.MIMETYPE
+    else:
+        mimetype = "text/event-stream" if use_sse else "application/x-ndjson"
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.headers["Cache-Control"] = "no-store"
+    response.headers["X-Accel-Buffering"] = "no"  # Tell nginx not to buffer the stream
+    return response
+
+
+@app.route("/jobs", methods=["POST"])
+def submit_job():
+    try:
+        job_id = job_queue.submit(
+            sim_speed=float(request.values.get("sim_speed", 1.0)),
+            sim_duration=float(request.values.get("sim_duration", 0.1)),
+            seed=request.values.get("seed", type=int),
+            plant=requested_plant(),
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except QueueFull as e:
+        response = jsonify({"error": str(e)})
+        response.status_code = 503
+        response.headers["Retry-After"] = "10"
+        return response
+    response = jsonify(
+        {
+            "job_id": job_id,
+            "status_url": url_for("job_status", job_id=job_id),
+            "result_url": url_for("job_result", job_id=job_id),
+        }
+    )
+    response.status_code = 202
+    return response
+
+
+@app.route("/jobs/<job_id>")
+def job_status(job_id):
+    status = job_queue.status(job_id)
+    if status is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(status)
+
+
+@app.route("/jobs/<job_id>/result")
+def job_result(job_id):
+    status = job_queue.status(job_id)
+    if status is None:
+        return jsonify({"error": "Job not found"}), 404
+    if status["state"] == DONE:
+        result_path = job_queue.result_path(job_id)
+        if not result_path.is_file():
+            # Removed after retention_s while the status was still readable
+            return jsonify({**status, "error": "Job result expired"}), 410
+        return send_file(result_path, mimetype="application/json", max_age=3600)
+    if status["state"] == TIMED_OUT:
+        return jsonify(status), 504
+    if status["state"] == FAILED:
+        return jsonify(status), 500
+    return jsonify(status), 202
+
+
+def warm_up():
+    """Import the simulation engine and chemistry helpers ahead of first use.
+
+    Called in the gunicorn master when preloading, so forked workers share
+    the imported modules copy-on-write instead of each importing them.
+    """
+    import simulation  # noqa: F401
+    from lib import chem_help
+
+    chem_help.periodic_table()
 
 
 if __name__ == "__main__":
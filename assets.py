@@ -0,0 +1,297 @@
+"""Build-time static asset pipeline.
+
+    python assets.py
+
+writes resized, recompressed derivatives of every image in static/images
+at IMAGE_WIDTHS, and content-hashed copies of the CSS and JS with gzip
+(and Brotli, when the brotli package is installed) variants, to
+static/build/ along with a manifest. Hashed files never change, so they
+are served with strong ETags and a year-long immutable Cache-Control;
+templates reach them through the asset_url, image_url and image_srcset
+helpers, which fall back to the originals until the build has run. The
+manifest records the content hash of every source, so a source edited
+since the build is served as is rather than through its stale build, and
+debug mode always serves the sources.
+
+A build writes its files beside the previous build's and then replaces the
+manifest, which running workers re-read when it changes, so pages already
+rendered with the previous URLs keep working. Files of older builds are
+removed.
+"""
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+from pathlib import Path
+
+from flask import abort, current_app, request, send_file, url_for
+from werkzeug.security import safe_join
+
+ROOT = Path(__file__).resolve().parent
+STATIC_DIRECTORY = ROOT / "static"
+BUILD_DIRECTORY = STATIC_DIRECTORY / "build"
+MANIFEST_FILE = BUILD_DIRECTORY / "manifest.json"
+
+IMAGE_WIDTHS = (400, 800, 1600)  # px; cards are ~400 px wide, posts ~800 px
+JPEG_QUALITY = 80
+TEXT_ASSETS = ("css/*.css", "js/*.js")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+EMPTY_MANIFEST = {"images": {}, "files": {}, "sources": {}}
+
+# Accept-Encoding token and file suffix of each precompressed variant, preferred first
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def _write_atomic(path, data):
+    """Write then rename, so a file being served is never seen half-written."""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def _write_hashed(relative_path, data):
+    """Write `data` as <stem>.<hash><suffix> under BUILD_DIRECTORY, unless
+    an earlier build already did.
+
+    Returns the path relative to BUILD_DIRECTORY and the written file.
+    """
+    relative_path = Path(relative_path)
+    hashed = relative_path.with_name(
+        f"{relative_path.stem}.{content_hash(data)}{relative_path.suffix}"
+    )
+    output = BUILD_DIRECTORY / hashed
+    output.parent.mkdir(parents=True, exist_ok=True)
+    if not output.is_file():
+        _write_atomic(output, data)
+    return hashed.as_posix(), output
+
+
+def _image_derivatives(path):
+    from io import BytesIO
+
+    from PIL import Image, ImageOps
+
+    derivatives = {}
+    with Image.open(path) as original:
+        image = ImageOps.exif_transpose(original)
+        is_jpeg = original.format == "JPEG"
+        for width in IMAGE_WIDTHS:
+            width = min(width, image.width)
+            if str(width) in derivatives:
+                continue
+            resized = image.resize(
+                (width, round(image.height * width / image.width)),
+                Image.Resampling.LANCZOS,
+            )
+            buffer = BytesIO()
+            if is_jpeg:
+                resized.convert("RGB").save(
+                    buffer, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True
+                )
+            else:
+                resized.save(buffer, original.format, optimize=True)
+            hashed, _ = _write_hashed(
+                Path("images") / f"{path.stem}.{width}{path.suffix}", buffer.getvalue()
+            )
+            derivatives[str(width)] = hashed
+    return derivatives
+
+
+def _precompress(output):
+    data = output.read_bytes()
+    gzipped = output.with_name(output.name + ".gz")
+    if not gzipped.is_file():
+        _write_atomic(gzipped, gzip.compress(data, compresslevel=9, mtime=0))
+    try:
+        import brotli
+    except ImportError:
+        return
+    brotlied = output.with_name(output.name + ".br")
+    if not brotlied.is_file():
+        _write_atomic(brotlied, brotli.compress(data, quality=11))
+
+
+def _read_manifest():
+    try:
+        return json.loads(MANIFEST_FILE.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return EMPTY_MANIFEST
+
+
+def _manifest_files(manifest):
+    """Paths, relative to BUILD_DIRECTORY, of a manifest's files and their
+    precompressed variants."""
+    names = list(manifest.get("files", {}).values())
+    for derivatives in manifest.get("images", {}).values():
+        names += derivatives.values()
+    return {
+        name + suffix for name in names for suffix in ("", *(s for _, s in ENCODINGS))
+    }
+
+
+def _remove_unused(keep):
+    for path in BUILD_DIRECTORY.rglob("*"):
+        relative_path = path.relative_to(BUILD_DIRECTORY).as_posix()
+        if path.is_file() and path != MANIFEST_FILE and relative_path not in keep:
+            path.unlink(missing_ok=True)
+
+
+def build(static_directory=STATIC_DIRECTORY):
+    """Build the static sources into BUILD_DIRECTORY beside the previous
+    build, publish the new manifest, then remove files neither build uses."""
+    BUILD_DIRECTORY.mkdir(parents=True, exist_ok=True)
+    previous = _read_manifest()
+    manifest = {"images": {}, "files": {}, "sources": {}}
+
+    for path in sorted((static_directory / "images").iterdir()):
+        if path.suffix.lower() in (".jpg", ".jpeg", ".png"):
+            manifest["images"][path.name] = _image_derivatives(path)
+            manifest["sources"][f"images/{path.name}"] = content_hash(path.read_bytes())
+
+    for pattern in TEXT_ASSETS:
+        for path in sorted(static_directory.glob(pattern)):
+            relative_path = path.relative_to(static_directory).as_posix()
+            data = path.read_bytes()
+            hashed, output = _write_hashed(relative_path, data)
+            _precompress(output)
+            manifest["files"][relative_path] = hashed
+            manifest["sources"][relative_path] = content_hash(data)
+
+    _write_atomic(MANIFEST_FILE, json.dumps(manifest, indent=2).encode("utf-8"))
+    _remove_unused(_manifest_files(previous) | _manifest_files(manifest))
+    return manifest
+
+
+# (mtime_ns, size) of the manifest file and its contents, as last read
+_manifest = (None, EMPTY_MANIFEST)
+
+
+def manifest_cache():
+    """The build manifest, re-read when the file changes, so running
+    workers pick up a new build without a restart."""
+    global _manifest
+    try:
+        stat = MANIFEST_FILE.stat()
+    except FileNotFoundError:
+        return EMPTY_MANIFEST
+    key = (stat.st_mtime_ns, stat.st_size)
+    if _manifest[0] != key:
+        _manifest = (key, _read_manifest())
+    return _manifest[1]
+
+
+# Static path -> (mtime_ns, content_hash), so unchanged sources are not re-read
+_source_hashes = {}
+
+
+def _source_hash(relative_path):
+    path = STATIC_DIRECTORY / relative_path
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    cached = _source_hashes.get(relative_path)
+    if cached is None or cached[0] != mtime_ns:
+        cached = _source_hashes[relative_path] = (mtime_ns, content_hash(path.read_bytes()))
+    return cached[1]
+
+
+def is_current(relative_path):
+    """Whether the build of a static file (relative to static/) can be served:
+    not in debug mode, and built from the source as it is now."""
+    if current_app.debug:
+        return False
+    built_from = manifest_cache().get("sources", {}).get(relative_path)
+    return built_from is not None and built_from == _source_hash(relative_path)
+
+
+def revision():
+    """The manifest in use and the sources whose builds the URL helpers
+    currently link to, for keying cached pages that embed those URLs."""
+    sources = manifest_cache().get("sources", {})
+    return _manifest[0], tuple(path for path in sources if is_current(path))
+
+
+def _derivatives(name):
+    return manifest_cache()["images"].get(name) if is_current(f"images/{name}") else None
+
+
+def asset_url(filename):
+    """URL of the hashed build of a static file, or of the file itself if
+    unbuilt or changed since the build."""
+    hashed = manifest_cache()["files"].get(filename)
+    if hashed is None or not is_current(filename):
+        return url_for("static", filename=filename)
+    return url_for("built_asset", filename=hashed)
+
+
+def image_url(name, width=IMAGE_WIDTHS[0]):
+    """URL of the smallest derivative of an image at least `width` px wide."""
+    derivatives = _derivatives(name)
+    if not derivatives:
+        return url_for("images", filename=name)
+    widths = sorted(int(w) for w in derivatives)
+    chosen = next((w for w in widths if w >= width), widths[-1])
+    return url_for("built_asset", filename=derivatives[str(chosen)])
+
+
+def image_srcset(name):
+    """srcset listing every derivative of an image, or "" if unbuilt."""
+    derivatives = _derivatives(name) or {}
+    return ", ".join(
+        f"{url_for('built_asset', filename=hashed)} {width}w"
+        for width, hashed in sorted(derivatives.items(), key=lambda item: int(item[0]))
+    )
+
+
+def send_built(filename):
+    """Serve a hashed build file, precompressed when the client accepts it.
+
+    The content hash in the name is the strong ETag, so conditional and
+    Range requests are answered by send_file against it.
+    """
+    path = safe_join(str(BUILD_DIRECTORY), filename)
+    if path is None or filename == MANIFEST_FILE.name or not Path(path).is_file():
+        abort(404)
+    # Build files are named <stem>.<hash><suffix>
+    suffixes = Path(filename).suffixes
+    etag = suffixes[-2].lstrip(".") if len(suffixes) > 1 else True
+    mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+    variants = [
+        (token, path + suffix)
+        for token, suffix in ENCODINGS
+        if Path(path + suffix).is_file()
+    ]
+    encoding = next(
+        (variant for variant in variants if variant[0] in request.accept_encodings),
+        None,
+    )
+    if encoding is not None:
+        token, path = encoding
+        if etag is not True:
+            etag = f"{etag}-{token}"
+
+    response = send_file(
+        path, mimetype=mimetype, conditional=True, etag=etag, max_age=31536000
+    )
+    response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    if encoding is not None:
+        response.content_encoding = encoding[0]
+    if variants:
+        response.vary.add("Accept-Encoding")
+    return response
+
+
+if __name__ == "__main__":
+    result = build()
+    print(
+        f"Built {sum(len(d) for d in result['images'].values())} image derivatives "
+        f"and {len(result['files'])} text assets in {BUILD_DIRECTORY}"
+    )
@@ -0,0 +1,112 @@
+"""Cold-start report for the web app.
+
+Run from anywhere with
+
+    python benchmarks/import_time.py [--budget-ms 400] [--top 15]
+
+Imports wsgi in a fresh interpreter under `python -X importtime`, prints
+the total and the slowest modules, then checks in another fresh
+interpreter that the blog routes are served without importing NumPy and
+times the first simulation request, which pays for the deferred imports.
+Exits non-zero if the import of wsgi exceeds the budget or a blog route
+pulls in NumPy.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Imported modules that mean a route paid for the simulation stack
+HEAVY_MODULES = ("numpy", "pandas", "scipy", "matplotlib", "seaborn")
+
+ROUTE_CHECK = """
+import json, sys, time
+start = time.perf_counter()
+from wsgi import app
+imported = time.perf_counter()
+client = app.test_client()
+report = {"import_wsgi_s": imported - start, "routes": []}
+for path in ("/", "/dashboard", "/post/__missing__"):
+    t = time.perf_counter()
+    status = client.get(path).status_code
+    report["routes"].append({
+        "path": path,
+        "status": status,
+        "seconds": time.perf_counter() - t,
+        "heavy_modules": [m for m in %(heavy)r if m in sys.modules],
+    })
+t = time.perf_counter()
+status = client.get("/run_simulation?sim_duration=0.01&seed=0").status_code
+report["first_simulation"] = {"status": status, "seconds": time.perf_counter() - t}
+print(json.dumps(report))
+"""
+
+
+def import_times(module="wsgi"):
+    """(module, self_us, cumulative_us) for every import, from -X importtime."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def route_check():
+    output = subprocess.run(
+        [sys.executable, "-c", ROUTE_CHECK % {"heavy": HEAVY_MODULES}],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=400)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    rows = import_times()
+    total_ms = next(c for name, _, c in rows if name == "wsgi") / 1000
+    print(f"import wsgi: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    print(f"\n{'cumulative ms':>14} {'self ms':>8}  module")
+    for name, self_us, cumulative_us in sorted(rows, key=lambda r: -r[2])[: args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>8.1f}  {name}")
+    heavy = sorted({name for name, _, _ in rows if name.split(".")[0] in HEAVY_MODULES})
+    print(f"\nheavy modules imported by wsgi: {', '.join(heavy) or 'none'}")
+
+    report = route_check()
+    print()
+    for route in report["routes"]:
+        print(
+            f"GET {route['path']:<20} {route['status']}  {route['seconds'] * 1000:7.1f} ms"
+            f"  heavy modules loaded: {', '.join(route['heavy_modules']) or 'none'}"
+        )
+    first = report["first_simulation"]
+    print(
+        f"GET /run_simulation (first) {first['status']}  {first['seconds'] * 1000:7.1f} ms"
+    )
+
+    failed = total_ms > args.budget_ms or any(
+        route["heavy_modules"] for route in report["routes"]
+    )
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""Benchmarks for the simulation engine, chemistry utilities and web routes.
+
+Run from anywhere with
+
+    python benchmarks/run_benchmarks.py [--quick] [--filter NAME] [--compare OLD.json]
+
+Each case reports throughput, latency percentiles and peak traced memory,
+and the whole run is written to benchmarks/results/ as JSON so later runs
+can be compared against it.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)  # The Flask app resolves posts/ and templates relative to the cwd
+
+import numpy as np  # noqa: E402
+
+RESULTS_DIRECTORY = ROOT / "benchmarks" / "results"
+EQUATIONS_FILE = ROOT / "benchmarks" / "equations.txt"
+
+
+def load_equations():
+    return [
+        line.strip()
+        for line in EQUATIONS_FILE.read_text(encoding="utf-8").splitlines()
+        if line.strip()
+    ]
+
+
+def load_formulas():
+    formulas = []
+    for equation in load_equations():
+        for species in equation.replace("->", "+").split("+"):
+            if species.strip() not in formulas:
+                formulas.append(species.strip())
+    return formulas
+
+
+def measure(name, func, repeat, ops_per_call=1, warmup=1):
+    """Time `func` `repeat` times, then run it once more under tracemalloc.
+
+    `func` may return a count of failed operations, which is reported;
+    any other return value is ignored.
+    """
+    failures = None
+    for _ in range(warmup):
+        result = func()
+        failures = result if isinstance(result, int) else None
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = np.array(latencies)
+    return {
+        "name": name,
+        "repeat": repeat,
+        "ops_per_call": ops_per_call,
+        "throughput_ops_per_s": ops_per_call * repeat / latencies.sum(),
+        "latency_s": {
+            "mean": latencies.mean(),
+            "p50": np.percentile(latencies, 50),
+            "p90": np.percentile(latencies, 90),
+            "p99": np.percentile(latencies, 99),
+            "max": latencies.max(),
+        },
+        "peak_memory_bytes": peak_bytes,
+        "failures": failures,
+    }
+
+
+def simulation_cases(quick):
+    import simulation
+
+    durations = [(0.1, 5), (1, 3)] if quick else [(0.1, 10), (1, 5), (10, 2)]
+    for sim_duration, repeat in durations:
+        yield (
+            f"run_simulation[{sim_duration}y]",
+            lambda sim_duration=sim_duration: simulation.run_simulation(
+                1.0, sim_duration, seed=0
+            ),
+            repeat,
+            1,
+        )
+
+
+def run_cycle_cases(quick):
+    from lib.plant import Plant
+    from lib.plant_parameters import PlantParameters
+
+    hours = 500 if quick else 5000
+    plant = Plant.build(sim_duration=1, rng=np.random.default_rng(0))
+    power = plant.power_system.available_power(0)
+
+    def cycles(run_cycle, hours=hours):
+        def run():
+            for hour in range(hours):
+                run_cycle(hour, power)
+
+        return run
+
+    yield "SabatierReactor.run_cycle", cycles(plant.sabatier_reactor.run_cycle), 5, hours
+    yield (
+        "ElectrolysisReactor.run_cycle",
+        cycles(plant.electrolysis_reactor.run_cycle),
+        5,
+        hours,
+    )
+    yield (
+        "AtmosphereIntakeSystem.run_cycle",
+        cycles(plant.atmosphere_intake.run_cycle),
+        5,
+        hours,
+    )
+
+    # Thermal response in 12 sub-steps per hour
+    vessel = plant.sabatier_reactor.vessel
+    vessel.substeps = 12
+    yield (
+        "ContainmentVessel.adjust_temperature[substeps=12]",
+        cycles(lambda hour, power: vessel.adjust_temperature(-60.0, hour)),
+        5,
+        hours,
+    )
+
+    # Thermal response integrated by the adaptive ODE model
+    ode_vessel = Plant.build(
+        PlantParameters(vessel_rtol=1e-4), sim_duration=1, rng=np.random.default_rng(0)
+    ).sabatier_reactor.vessel
+    ode_hours = hours // 10
+    yield (
+        "ContainmentVessel.adjust_temperature[ode]",
+        cycles(lambda hour, power: ode_vessel.adjust_temperature(-60.0, hour), ode_hours),
+        5,
+        ode_hours,
+    )
+
+
+def chemistry_cases(quick):
+    from lib import chem_help
+
+    equations = load_equations()
+    formulas = load_formulas()
+
+    def each(func, items):
+        def run():
+            failures = 0
+            for item in items:
+                try:
+                    func(item)
+                except Exception:
+                    failures += 1
+            return failures
+
+        return run
+
+    def molar_masses_batch():
+        chem_help.molar_masses(formulas * 100)
+
+    balance_all = each(chem_help.balance, equations)
+    percent_composition_all = each(chem_help.percent_composition, formulas)
+
+    repeat = 5 if quick else 20
+    yield "chem_help.balance", balance_all, repeat, len(equations)
+    yield (
+        "chem_help.balance_many[x100]",
+        lambda: sum(
+            result.status != chem_help.BALANCED
+            for result in chem_help.balance_many(equations * 100, max_workers=1)
+        ),
+        repeat,
+        len(equations) * 100,
+    )
+    yield "chem_help.percent_composition", percent_composition_all, repeat, len(formulas)
+    yield (
+        "chem_help.molar_masses[x100]",
+        molar_masses_batch,
+        repeat,
+        len(formulas) * 100,
+    )
+
+
+def web_cases(quick):
+    from app import app
+
+    client = app.test_client()
+
+    def get(path):
+        def run():
+            response = client.get(path)
+            assert response.status_code == 200, response.status_code
+
+        return run
+
+    def post_simulation():
+        response = client.post("/run_simulation", data={"sim_duration": "0.1"})
+        assert response.status_code == 200, response.status_code
+
+    repeat = 5 if quick else 20
+    yield "GET /", get("/"), repeat * 5, 1
+    yield "POST /run_simulation[0.1y]", post_simulation, repeat, 1
+    yield (
+        "GET /run_simulation[0.1y, seeded, cached]",
+        get("/run_simulation?sim_duration=0.1&seed=0"),
+        repeat * 5,
+        1,
+    )
+
+
+SUITES = (simulation_cases, run_cycle_cases, chemistry_cases, web_cases)
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=ROOT,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(quick=False, name_filter=None):
+    results = []
+    for suite in SUITES:
+        for name, func, repeat, ops_per_call in suite(quick):
+            if name_filter and name_filter not in name:
+                continue
+            try:
+                result = measure(name, func, repeat, ops_per_call)
+            except Exception as e:
+                result = {"name": name, "error": f"{type(e).__name__}: {e}"}
+            results.append(result)
+            print_result(result)
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "quick": quick,
+        "results": results,
+    }
+
+
+def print_result(result, previous=None):
+    if "error" in result:
+        print(f"{result['name']:<45} ERROR {result['error']}")
+        return
+    line = (
+        f"{result['name']:<45} {result['throughput_ops_per_s']:>12.1f} ops/s"
+        f"  p50 {result['latency_s']['p50'] * 1000:>9.2f} ms"
+        f"  p99 {result['latency_s']['p99'] * 1000:>9.2f} ms"
+        f"  peak {result['peak_memory_bytes'] / 1e6:>8.2f} MB"
+    )
+    if result.get("failures"):
+        line += f"  ({result['failures']} failed)"
+    if previous and "error" not in previous:
+        speedup = result["throughput_ops_per_s"] / previous["throughput_ops_per_s"]
+        line += f"  {speedup:5.2f}x vs previous"
+    print(line)
+
+
+def compare(report, previous_path):
+    previous = {
+        result["name"]: result
+        for result in json.loads(Path(previous_path).read_text())["results"]
+    }
+    print(f"\nCompared with {previous_path}:")
+    for result in report["results"]:
+        print_result(result, previous.get(result["name"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="Shorter runs")
+    parser.add_argument("--filter", help="Only run cases whose name contains this")
+    parser.add_argument("--output", help="Where to write the JSON report")
+    parser.add_argument("--compare", help="Earlier JSON report to compare against")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    report = run(quick=args.quick, name_filter=args.filter)
+
+    RESULTS_DIRECTORY.mkdir(exist_ok=True)
+    output = Path(args.output) if args.output else RESULTS_DIRECTORY / (
+        datetime.now().strftime("%Y%m%d-%H%M%S") + ".json"
+    )
+    output.write_text(json.dumps(report, indent=2, default=float), encoding="utf-8")
+    print(f"\nWrote {output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
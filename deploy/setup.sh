@@ -13,6 +13,9 @@ pip install wheel
 pip install -r requirements.txt
 pip install gunicorn
 
+# Build resized images and hashed CSS/JS into static/build
+python assets.py
+
 # Deactivate virtual environment
 deactivate
 
@@ -0,0 +1,15 @@
+# Loaded automatically by gunicorn from the working directory; command line
+# options in deploy/pyisru.service take precedence.
+import gc
+import os
+
+# Opt-in: import the app and the simulation engine once in the master and
+# fork workers copy-on-write. Code changes then need a full restart rather
+# than a HUP, and a crashed worker is re-forked already warm.
+preload_app = os.environ.get("PYISRU_PRELOAD") == "1"
+
+
+def pre_fork(server, worker):
+    if preload_app:
+        # Keep the collector from touching (and so copying) the preloaded objects
+        gc.freeze()
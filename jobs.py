@@ -0,0 +1,270 @@
+import json
+import multiprocessing
+import os
+import re
+import signal
+import socket
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from response_cache import cache_key
+
+JOBS_DIRECTORY = Path(
+    os.environ.get("PYISRU_JOBS_DIR", Path(tempfile.gettempdir()) / "pyisru_jobs")
+)
+
+QUEUED, RUNNING, DONE, FAILED, TIMED_OUT = (
+    "queued",
+    "running",
+    "done",
+    "failed",
+    "timeout",
+)
+
+
+JOB_ID_PATTERN = re.compile(r"[0-9a-f]{32}")
+
+HOST = socket.gethostname()
+
+# Past its timeout, a running job is abandoned even if its process cannot be checked
+ABANDON_GRACE_S = 60
+
+
+class QueueFull(Exception):
+    pass
+
+
+class JobTimeout(Exception):
+    pass
+
+
+def _write_json(path, data):
+    # Write then rename so readers in other processes never see a partial
+    # file; each writer gets its own temporary file, so concurrent writers of
+    # one status (the pool process, a done callback, a status check) never
+    # rename each other's half-written file
+    with tempfile.NamedTemporaryFile(
+        "w",
+        encoding="utf-8",
+        dir=path.parent,
+        prefix=path.name,
+        suffix=".tmp",
+        delete=False,
+    ) as file:
+        try:
+            json.dump(data, file)
+        except BaseException:
+            file.close()
+            os.unlink(file.name)
+            raise
+    os.replace(file.name, path)
+
+
+def _on_alarm(signum, frame):
+    raise JobTimeout()
+
+
+def _is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Alive, under another user
+    return True
+
+
+def _abandoned(status, timeout_s):
+    """Whether a queued or running job can no longer finish: the request
+    worker whose pool queued it, or the pool process running it, has exited.
+    Processes are only checked on this host; a running job from any host is
+    also abandoned once it is well past the timeout that should have ended
+    it."""
+    if status["state"] == QUEUED:
+        owner = status.get("owner_pid")
+    elif status["state"] == RUNNING:
+        if time.time() > status["started_at"] + timeout_s + ABANDON_GRACE_S:
+            return True
+        owner = status.get("runner_pid")
+    else:
+        return False
+    return status.get("host") == HOST and owner is not None and not _is_alive(owner)
+
+
+def _run_job(job_id, directory, sim_speed, sim_duration, seed, plant, timeout_s):
+    """Runs in a pool process and reports through files in `directory`, so any
+    gunicorn worker can answer status and result requests for the job."""
+    import simulation
+
+    directory = Path(directory)
+    status_path = directory / f"{job_id}.status.json"
+    status = json.loads(status_path.read_text(encoding="utf-8"))
+    status.update(state=RUNNING, started_at=time.time(), runner_pid=os.getpid())
+    _write_json(status_path, status)
+
+    signal.signal(signal.SIGALRM, _on_alarm)
+    signal.alarm(timeout_s)
+    try:
+        simulation_data = simulation.run_simulation(
+            sim_speed, sim_duration, seed=seed, plan=plant
+        )
+        _write_json(
+            directory / f"{job_id}.result.json",
+            simulation_data.to_json_dict(include_metadata=True),
+        )
+        status.update(state=DONE)
+    except JobTimeout:
+        status.update(state=TIMED_OUT, error=f"Job exceeded {timeout_s} s")
+    except Exception as e:
+        status.update(state=FAILED, error=str(e))
+    finally:
+        signal.alarm(0)
+    status.update(finished_at=time.time())
+    _write_json(status_path, status)
+    return status["state"]
+
+
+class JobQueue:
+    """Runs simulations in a local process pool so request workers stay free.
+
+    Each gunicorn worker owns one queue; job state lives in JOBS_DIRECTORY so
+    status and result requests can be answered by any worker. Statuses record
+    the process that owns the job, and a queued or running job whose owner
+    has exited (a restarted worker, a crashed pool) is reported as failed
+    rather than left pending until it expires.
+
+    max_workers and max_pending (PYISRU_JOB_WORKERS, PYISRU_JOB_QUEUE_DEPTH)
+    are per process: with N gunicorn workers, up to N * max_workers
+    simulations run and N * max_pending jobs are pending at once.
+    """
+
+    def __init__(
+        self,
+        directory=JOBS_DIRECTORY,
+        max_workers=int(os.environ.get("PYISRU_JOB_WORKERS", 2)),
+        max_pending=int(os.environ.get("PYISRU_JOB_QUEUE_DEPTH", 8)),
+        timeout_s=int(os.environ.get("PYISRU_JOB_TIMEOUT", 600)),
+        retention_s=3600,
+    ):
+        self.directory = Path(directory)
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout_s = timeout_s
+        self.retention_s = retention_s
+        self._executor = None
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        # Created on first use so it is never inherited across a gunicorn fork
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("forkserver"),
+            )
+        return self._executor
+
+    def submit(self, sim_speed=1.0, sim_duration=0.1, seed=None, plant=None):
+        """Queue a run of a plant (by name, the default if None) and return
+        its job id.
+
+        Seeded runs are deterministic, so they get an id derived from their
+        inputs and a repeated submission reuses the existing job.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if seed is None:
+            job_id = uuid.uuid4().hex
+        else:
+            from lib.plant_config import DEFAULT_PLANT, plant_revision
+
+            # An edited plant description gets new jobs
+            revision = plant_revision(plant or DEFAULT_PLANT)
+            job_id = cache_key("job", plant, revision, sim_duration, seed)[:32]
+            status = self.status(job_id)
+            if status is not None and status["state"] in (QUEUED, RUNNING, DONE):
+                return job_id
+
+        with self._lock:
+            self._pending = {
+                pending_id: future
+                for pending_id, future in self._pending.items()
+                if not future.done()
+            }
+            if len(self._pending) >= self.max_pending:
+                raise QueueFull(f"{len(self._pending)} jobs already pending")
+            self._remove_expired()
+            _write_json(
+                self.directory / f"{job_id}.status.json",
+                {
+                    "job_id": job_id,
+                    "state": QUEUED,
+                    "submitted_at": time.time(),
+                    "sim_duration": sim_duration,
+                    "seed": seed,
+                    "plant": plant,
+                    "host": HOST,
+                    "owner_pid": os.getpid(),
+                },
+            )
+            job = (job_id, str(self.directory), sim_speed, sim_duration, seed, plant)
+            try:
+                future = self._pool().submit(_run_job, *job, self.timeout_s)
+            except BrokenProcessPool:
+                # A pool process died; its jobs failed, later ones get a new pool
+                self.shutdown()
+                future = self._pool().submit(_run_job, *job, self.timeout_s)
+            future.add_done_callback(lambda future: self._on_done(job_id, future))
+            self._pending[job_id] = future
+        return job_id
+
+    def _on_done(self, job_id, future):
+        # A job that raised here never reported its own outcome, e.g. because
+        # its pool process died and broke the pool
+        if future.cancelled() or future.exception() is not None:
+            error = "cancelled" if future.cancelled() else repr(future.exception())
+            self._fail(job_id, f"Job abandoned: {error}")
+
+    def _fail(self, job_id, error):
+        status = self.status(job_id, check_abandoned=False)
+        if status is None or status["state"] not in (QUEUED, RUNNING):
+            return status
+        status.update(state=FAILED, error=error, finished_at=time.time())
+        _write_json(self.directory / f"{job_id}.status.json", status)
+        return status
+
+    def status(self, job_id, check_abandoned=True):
+        if not JOB_ID_PATTERN.fullmatch(job_id):
+            return None
+        try:
+            status = json.loads(
+                (self.directory / f"{job_id}.status.json").read_text(encoding="utf-8")
+            )
+        except (FileNotFoundError, ValueError):
+            return None
+        if check_abandoned and _abandoned(status, self.timeout_s):
+            return self._fail(job_id, "Job abandoned: its worker process exited")
+        return status
+
+    def result_path(self, job_id):
+        return self.directory / f"{job_id}.result.json"
+
+    def _remove_expired(self):
+        cutoff = time.time() - self.retention_s
+        # Temporary files are only left behind by a writer that crashed
+        for path in (*self.directory.glob("*.json"), *self.directory.glob("*.tmp")):
+            try:
+                expired = path.stat().st_mtime < cutoff
+            except FileNotFoundError:
+                continue  # Renamed or removed by another process meanwhile
+            if expired and path.name.split(".")[0] not in self._pending:
+                path.unlink(missing_ok=True)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -1,7 +1,11 @@
 from dataclasses import dataclass
+from typing import Optional
 import logging
 from lib.storage_tank import StorageTank
+from lib.power_bus import INTAKE, PowerBus
 from lib.power_system import PowerSystem
+from lib.scheduler import Rate
+from lib.telemetry import INTAKE_SKIPPED, Telemetry, report
 
 logger = logging.getLogger(__name__)
 
@@ -14,32 +18,63 @@ class AtmosphereIntakeSystem:
     intake_rate: float  # CO2 intake rate in grams per cycle
     power_per_cycle: float  # Power used per cycle in kJ
     interval_hours: int = 6  # Run every 6 hours by default
+    telemetry: Optional[Telemetry] = None
+
+    # Result of an hour without an intake cycle
+    IDLE = {"CO2 Added (g)": 0, "Power Used (kJ)": 0}
+
+    @property
+    def rate(self):
+        return Rate(interval_hours=self.interval_hours)
+
+    def power_demand(self):
+        """kJ for a full cycle, or for as much CO2 as the tank has room for."""
+        tank_space_available = max(self.CO2_tank.capacity - self.CO2_tank.level, 0)
+        return (
+            min(self.intake_rate, tank_space_available)
+            / self.intake_rate
+            * self.power_per_cycle
+        )
+
+    def request_power(self, bus, hour):
+        bus.request(INTAKE, self.power_demand())
 
     def run_cycle(self, hour, total_power_available):
-        if hour % self.interval_hours == 0:
-            max_intake_possible = (
-                total_power_available / self.power_per_cycle * self.intake_rate
+        """Run a cycle if one is due, settling its power on its own bus."""
+        if not self.rate.due(hour):
+            return dict(self.IDLE)
+        bus = PowerBus()
+        self.request_power(bus, hour)
+        settlement = bus.settle_power_system(self.power_system, total_power_available)
+        return self.intake(hour, settlement[INTAKE])
+
+    def intake(self, hour, power_kj):
+        """Run one intake cycle with the energy granted to it on the bus; the
+        scheduler calls this only in due hours."""
+        max_intake_possible = power_kj / self.power_per_cycle * self.intake_rate
+        tank_space_available = self.CO2_tank.capacity - self.CO2_tank.level
+        intake_amount = min(self.intake_rate, max_intake_possible, tank_space_available)
+
+        if intake_amount > 0:
+            # Add CO₂ to the tank
+            self.CO2_tank.add(intake_amount)
+
+            # Power used by the intake process, already settled on the bus
+            power_used = (intake_amount / self.intake_rate) * self.power_per_cycle
+
+            logger.debug(
+                "Atmosphere intake system added %sg CO2 at hour %s.",
+                intake_amount,
+                hour,
             )
-            tank_space_available = self.CO2_tank.capacity - self.CO2_tank.level
-            intake_amount = min(
-                self.intake_rate, max_intake_possible, tank_space_available
+            return {"CO2 Added (g)": intake_amount, "Power Used (kJ)": power_used}
+        else:
+            report(
+                self.telemetry,
+                logger,
+                self.name,
+                INTAKE_SKIPPED,
+                "Insufficient power or tank capacity for atmosphere intake at hour %s.",
+                hour,
             )
-
-            if intake_amount > 0:
-                # Add CO₂ to the tank
-                self.CO2_tank.add(intake_amount)
-
-                # Consume power for the intake process
-                power_used = (intake_amount / self.intake_rate) * self.power_per_cycle
-                self.power_system.manage_battery(power_used, total_power_available)
-
-                logger.info(
-                    f"Atmosphere intake system added {intake_amount}g CO2 at hour {hour}."
-                )
-                return {"CO2 Added (g)": intake_amount, "Power Used (kJ)": power_used}
-            else:
-                logger.warning(
-                    f"Insufficient power or tank capacity for atmosphere intake at hour {hour}."
-                )
-                return {"CO2 Added (g)": 0, "Power Used (kJ)": 0}
-        return {"CO2 Added (g)": 0, "Power Used (kJ)": 0}
+            return dict(self.IDLE)
@@ -0,0 +1,206 @@
+from dataclasses import asdict, dataclass, field
+import io
+import json
+from typing import Optional
+import numpy as np
+from lib import environment
+from lib.plant import Plant
+from lib.plant_config import compile_plan
+from lib.plant_parameters import PlantParameters
+from lib.recorder import SimulationRecorder
+from lib.telemetry import Telemetry
+
+# Mutable plant state saved in a checkpoint, as (component path, attribute)
+STATE_FIELDS = (
+    ("CO2_tank", "level"),
+    ("CO2_tank", "is_low"),
+    ("H2_tank", "level"),
+    ("H2_tank", "is_low"),
+    ("CH4_tank", "level"),
+    ("CH4_tank", "is_low"),
+    ("H2O_tank", "level"),
+    ("H2O_tank", "is_low"),
+    ("O2_tank", "level"),
+    ("O2_tank", "is_low"),
+    ("power_system", "battery_level_kj"),
+    ("power_system", "last_solar_power_kj"),
+    ("power_system", "last_nuclear_power_kj"),
+    ("sabatier_reactor.vessel", "internal_temp_c"),
+    ("sabatier_reactor.vessel", "internal_pressure_pa"),
+    ("sabatier_reactor", "current_efficiency"),
+)
+
+# Parameters that only set the starting state, so they have no effect on a fork
+INITIAL_STATE_PARAMETERS = (
+    "CO2_initial_level",
+    "H2_initial_level",
+    "CH4_initial_level",
+    "H2O_initial_level",
+    "O2_initial_level",
+    "battery_level_kj",
+    "initial_temp_c",
+    "initial_pressure_pa",
+)
+
+
+def _component(plant, path):
+    component = plant
+    for name in path.split("."):
+        component = getattr(component, name)
+    return component
+
+
+@dataclass
+class Checkpoint:
+    """The state of a scalar-engine run at the start of `hour`.
+
+    The environment cycles and power timeline are not stored: they are drawn
+    again from `rng_state`, the generator state the plant was built from, so
+    a restored plant sees the same weather as the original run. `columns`
+    holds the rows recorded before `hour`, so a resumed or forked run
+    returns the full trajectory without recomputing the shared prefix.
+    `plant` is the plant description the run was built from, compiled
+    again on restore; None means the default plant.
+    """
+
+    hour: int
+    sim_duration: float
+    params: PlantParameters
+    rng_state: dict
+    state: np.ndarray  # Values of STATE_FIELDS
+    events: list = field(default_factory=list)  # [component, event, count, first, last]
+    columns: dict = field(default_factory=dict)  # Recorded rows before `hour`
+    plant: Optional[dict] = None  # See lib.plant_config
+
+    @classmethod
+    def capture(cls, plant, hour, recorder=None):
+        """Snapshot `plant` before it steps `hour`, with `recorder`'s rows if given."""
+        sabatier = plant.sabatier_reactor
+        if not hasattr(sabatier, "current_efficiency"):
+            sabatier.current_efficiency = sabatier.efficiency  # Not stepped yet
+        return cls(
+            hour=hour,
+            sim_duration=plant.sim_duration,
+            params=plant.params,
+            rng_state=plant.rng_state,
+            state=np.array(
+                [
+                    float(getattr(_component(plant, path), name))
+                    for path, name in STATE_FIELDS
+                ]
+            ),
+            events=[
+                [component, event, *counter]
+                for (component, event), counter in plant.telemetry.counters.items()
+            ],
+            columns=(
+                {}
+                if recorder is None
+                else {name: recorder[name].copy() for name in recorder.columns}
+            ),
+            plant=plant.plan.description,
+        )
+
+    def restore(self, telemetry=None, **overrides):
+        """Rebuild the plant at `hour`, optionally with changed parameters.
+
+        Overrides apply to the plant design (capacities, power, vessel and
+        reactor settings). INITIAL_STATE_PARAMETERS are rejected since the
+        state is carried over; levels are clipped to any new capacity.
+        Returns the plant and a recorder sized to the rest of the run and
+        holding the checkpoint's rows.
+        """
+        bit_generator = getattr(np.random, self.rng_state["bit_generator"])()
+        bit_generator.state = self.rng_state
+        rng = np.random.Generator(bit_generator)
+        telemetry = telemetry or Telemetry()
+        for component, event, count, first, last in self.events:
+            telemetry.counters[(component, event)] = [count, first, last]
+
+        ignored = set(overrides) & set(INITIAL_STATE_PARAMETERS)
+        if ignored:
+            raise ValueError(
+                f"{', '.join(sorted(ignored))} only set the starting state; "
+                "a restored plant keeps the checkpoint's state"
+            )
+        params = self.params.with_overrides(**overrides)
+        plan = None if self.plant is None else compile_plan(self.plant)
+        plant = Plant.build(params, self.sim_duration, rng, telemetry, plan)
+        plant.rng_state = self.rng_state
+        for (path, name), value in zip(STATE_FIELDS, self.state):
+            setattr(
+                _component(plant, path),
+                name,
+                bool(value) if name == "is_low" else float(value),
+            )
+        for tank in (
+            plant.CO2_tank,
+            plant.H2_tank,
+            plant.CH4_tank,
+            plant.H2O_tank,
+            plant.O2_tank,
+        ):
+            tank.level = min(tank.level, tank.capacity)
+        power_system = plant.power_system
+        power_system.battery_level_kj = min(
+            power_system.battery_level_kj, power_system.battery_capacity_kj
+        )
+
+        total_time_steps = environment.total_time_steps(self.sim_duration)
+        if self.columns:
+            recorder = SimulationRecorder(total_time_steps)
+            for name, values in self.columns.items():
+                recorder.buffers[name][: len(values)] = values
+            recorder.position = self.hour
+        else:
+            recorder = SimulationRecorder(
+                total_time_steps - self.hour, start_hour=self.hour
+            )
+        return plant, recorder
+
+    def to_bytes(self):
+        """Serialize to a compressed NumPy archive with a JSON header."""
+        header = {
+            "hour": self.hour,
+            "sim_duration": self.sim_duration,
+            "params": asdict(self.params),
+            "rng_state": self.rng_state,
+            "events": self.events,
+            "plant": self.plant,
+        }
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            header=np.frombuffer(json.dumps(header).encode("utf-8"), dtype=np.uint8),
+            state=self.state,
+            **{f"column.{name}": values for name, values in self.columns.items()},
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data):
+        with np.load(io.BytesIO(data)) as archive:
+            header = json.loads(archive["header"].tobytes().decode("utf-8"))
+            return cls(
+                hour=header["hour"],
+                sim_duration=header["sim_duration"],
+                params=PlantParameters(**header["params"]),
+                rng_state=header["rng_state"],
+                state=archive["state"],
+                events=header["events"],
+                plant=header.get("plant"),
+                columns={
+                    key.split(".", 1)[1]: archive[key]
+                    for key in archive.files
+                    if key.startswith("column.")
+                },
+            )
+
+    def save(self, path):
+        with open(path, "wb") as file:
+            file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as file:
+            return cls.from_bytes(file.read())
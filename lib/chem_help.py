@@ -1,76 +1,179 @@
-import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from math import gcd, lcm
+import multiprocessing
+from typing import Optional, Tuple
 import numpy as np
+from lib.periodic_table import periodic_table
+
+BALANCED = "balanced"
+NO_SOLUTION = "no_solution"  # Only the trivial solution, or one needing negative coefficients
+AMBIGUOUS = "ambiguous"  # More than one independent reaction fits the species
+INVALID = "invalid"  # The equation could not be parsed
+
+
+@dataclass(frozen=True)
+class BalancedEquation:
+    equation: str
+    reactants: Tuple[str, ...]
+    products: Tuple[str, ...]
+    status: str
+    coefficients: Optional[Tuple[int, ...]] = None  # Reactants then products
+    error: Optional[str] = None
+
+    def __str__(self):
+        if self.status != BALANCED:
+            return self.equation
+        reactant_coefficients = self.coefficients[: len(self.reactants)]
+        product_coefficients = self.coefficients[len(self.reactants) :]
+        return " -> ".join(
+            " + ".join(f"{c}{species}" for c, species in zip(coefficients, side))
+            for coefficients, side in (
+                (reactant_coefficients, self.reactants),
+                (product_coefficients, self.products),
+            )
+        )
+
+
+@lru_cache(maxsize=65536)
+def parse_species(species):
+    """
+    Input: Species in form (H_2 O)
+    Output: Tuple of (element, count) pairs, repeated elements summed
+    """
+    counts = {}
+    for token in species.split():
+        element, _, count = token.partition("_")
+        if not element or not element.isalpha():
+            raise ValueError(f"Bad element {token!r} in {species!r}")
+        counts[element] = counts.get(element, 0) + int(count or 1)
+    if not counts:
+        raise ValueError("Empty species")
+    return tuple(counts.items())
+
+
+@lru_cache(maxsize=65536)
+def parse_equation(equation):
+    """
+    Input: Equation in form (H_2 + O_2 -> H_2 O)
+    Output: (reactants, products) as tuples of species strings
+    """
+    sides = equation.split("->")
+    if len(sides) != 2:
+        raise ValueError(f"Expected one '->' in {equation!r}")
+    reactants, products = (
+        tuple(species.strip() for species in side.split("+")) for side in sides
+    )
+    return reactants, products
+
+
+def composition_matrix(reactants, products):
+    """Element by species counts, with products negated, and the element order."""
+    species = [parse_species(s) for s in reactants + products]
+    elements = list(dict.fromkeys(e for composition in species for e, _ in composition))
+    index = {element: i for i, element in enumerate(elements)}
+    matrix = [[0] * len(species) for _ in elements]
+    for column, composition in enumerate(species):
+        sign = 1 if column < len(reactants) else -1
+        for element, count in composition:
+            matrix[index[element]][column] = sign * count
+    return matrix, elements
+
+
+def null_space(matrix):
+    """Integer basis of the null space of an integer matrix.
+
+    Fraction-free Gauss-Jordan elimination: rows are combined with integer
+    multiples and divided by their gcd, so the arithmetic stays exact
+    without the cost of rational numbers.
+    """
+    rows = [list(row) for row in matrix]
+    columns = len(rows[0]) if rows else 0
+    pivots = []
+    row = 0
+    for column in range(columns):
+        pivot = next((r for r in range(row, len(rows)) if rows[r][column]), None)
+        if pivot is None:
+            continue
+        rows[row], rows[pivot] = rows[pivot], rows[row]
+        pivot_row = rows[row]
+        pivot_value = pivot_row[column]
+        for r in range(len(rows)):
+            factor = rows[r][column]
+            if r != row and factor:
+                combined = [
+                    a * pivot_value - factor * b for a, b in zip(rows[r], pivot_row)
+                ]
+                divisor = gcd(*combined)
+                rows[r] = [value // divisor for value in combined] if divisor else combined
+        pivots.append(column)
+        row += 1
+        if row == len(rows):
+            break
+
+    basis = []
+    scale = lcm(*(rows[r][column] for r, column in enumerate(pivots))) if pivots else 1
+    for free in (c for c in range(columns) if c not in pivots):
+        vector = [0] * columns
+        vector[free] = scale
+        for r, column in enumerate(pivots):
+            vector[column] = -rows[r][free] * scale // rows[r][column]
+        divisor = gcd(*vector)
+        basis.append([value // divisor for value in vector])
+    return basis
+
+
+def balance_equation(equation):
+    """Balance one equation and return a BalancedEquation."""
+    try:
+        reactants, products = parse_equation(equation)
+        matrix, _ = composition_matrix(reactants, products)
+    except ValueError as e:
+        return BalancedEquation(equation, (), (), INVALID, error=str(e))
+
+    basis = null_space(matrix)
+    if len(basis) > 1:
+        return BalancedEquation(equation, reactants, products, AMBIGUOUS)
+    if not basis:
+        return BalancedEquation(equation, reactants, products, NO_SOLUTION)
+    (vector,) = basis
+    if all(value < 0 for value in vector):
+        vector = [-value for value in vector]
+    if not all(value > 0 for value in vector):
+        return BalancedEquation(equation, reactants, products, NO_SOLUTION)
+    return BalancedEquation(equation, reactants, products, BALANCED, tuple(vector))
+
+
+def balance_many(equations, max_workers=None, chunk_size=512):
+    """Balance many equations, in order, across a process pool.
+
+    Small batches, or `max_workers=1`, run in this process where the
+    parser cache is shared; pools pay off from a few thousand equations.
+    """
+    equations = list(equations)
+    if max_workers == 1 or len(equations) <= 2 * chunk_size:
+        return [balance_equation(equation) for equation in equations]
+    # forkserver, as in jobs.py, since forking a threaded worker can deadlock
+    with ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=multiprocessing.get_context("forkserver")
+    ) as executor:
+        return list(executor.map(balance_equation, equations, chunksize=chunk_size))
+
 
 def balance(equation_str):
-    return_dict = {}
-    # String Parsing
-    for species in equation_str.replace('->', '+').split('+'):
-        return_dict[species.strip()] = {}
-        for element in species.strip().split(' '):
-            if len(element) < 3:
-                element += '_1'
-            return_dict[species.strip()][element.split('_')[0]] = element.split('_')[1]
-
-    # Lawrence R. Thorne: Simplified Matrix Null-Space Method
-
-    # Step 0
-    chem_comp_table = pd.DataFrame(return_dict, dtype = 'float').fillna(0)
-    #print("Step 0\n", chem_comp_table)
-    #print('\n')
-
-    # Step 1
-    chem_comp_matrix = chem_comp_table.values
-    #print("Step 1\n", chem_comp_matrix)
-    #print('\n')
-
-    # Step 2
-    nullity = len(chem_comp_table.columns) - np.linalg.matrix_rank(chem_comp_matrix)
-    if nullity == 0:
+    """
+    Input: Equation in form (C H_4 + H_2 O -> C O_2 + H_2)
+    Output: Balanced equation string, "No solution" or "Infinite solutions"
+    """
+    result = balance_equation(equation_str)
+    if result.status == INVALID:
+        raise ValueError(result.error)
+    if result.status == NO_SOLUTION:
         return "No solution"
-    #print("Step 2\n", nullity)
-    #print('\n')
-
-    # Step 3
-    a = np.zeros((nullity, chem_comp_matrix.shape[1]))
-    b = np.identity(nullity)
-    augmentation = np.append(a[:, :a.shape[1] - b.shape[1]], b, axis = 1)
-    augmented_ccm = np.append(chem_comp_matrix, augmentation, axis = 0)
-    #print("Step 3\n", augmented_ccm)
-    #print('\n')
-
-    # Step 4
-    inverted_ccm = np.linalg.inv(augmented_ccm)
-    #print("Step 4\n", inverted_ccm)
-    #print('\n')
-
-    # Step 5 & 6
-    null_space_vec = inverted_ccm[:, -nullity].T
-    #print("Step 5 & 6\n", null_space_vec)
-    #print('\n')
-
-    # Step 7
-    coefs = null_space_vec / min([abs(i) for i in list(null_space_vec)])
-    if (float("inf") in coefs) or (float("-inf") in coefs):
+    if result.status == AMBIGUOUS:
         return "Infinite solutions"
-    coefs = [int(round(abs(i))) for i in coefs]
-    #print("Step 7\n", coefs)
-    #print('\n')
-
-    # Step 8
-    species = [i.strip() for i in equation_str.replace('->', '+').split('+')]
-    for i in range(len(species)):
-        return_dict[species[i]] = coefs[i]
-
-    return_eq = []
-
-    for side in equation_str.split('->'):
-        new_side = []
-        for species in side.split('+'):
-            #print(return_dict[species.strip()], species.strip())
-            new_side.append(str(return_dict[species.strip()]) + str(species.strip()))
-        return_eq.append(' + '.join(new_side))
-
-    return ' -> '.join(return_eq)
+    return str(result)
 
 """
 Examples
@@ -123,27 +226,83 @@ def chem_spliter(chem):
     Input: Chemical formula in form (H_2 O)
     Output: Array of tuples shape (Chem abbv, ,moles)
     """
-    return_array = []
-    for i in chem.split(' '):
-        return_array.append((i.split('_')[0],i.split('_')[1]))
-    return return_array
+    return list(parse_species(chem))
+
 
-def percent_composition(chemical, elements="data/elements.csv"):
+@lru_cache(maxsize=65536)
+def compile_formula(chemical):
     """
     Input: Chemical formula in form (H_2 O)
-    Output: Dict in form {Element: %comp}
+    Output: Sparse element-count vector as (periodic table rows, counts)
+
+    Compiled once per formula; the arrays are shared, so do not modify them.
     """
-    elements = pd.read_csv(elements, index_col='symbol').to_dict('index')
-    return_dict = {}
-    masses = []
-    chem_spliter(chemical)
+    table = periodic_table()
+    composition = parse_species(chemical)
+    rows = np.array([table.row(element) for element, _ in composition], dtype=np.intp)
+    counts = np.array([count for _, count in composition], dtype=float)
+    rows.flags.writeable = counts.flags.writeable = False
+    return rows, counts
 
-    for i in chem_spliter(chemical):
-        masses.append(elements[i[0]]['atomic_mass'] * int(i[1]))
 
-    chemical_mass = sum(masses)
+def species_matrix(chemicals):
+    """
+    Input: Sequence of N chemical formulas
+    Output: N x elements count matrix, columns in periodic_table() order
+    """
+    compiled = [compile_formula(chemical) for chemical in chemicals]
+    matrix = np.zeros((len(compiled), len(periodic_table())))
+    if compiled:
+        species = np.repeat(
+            np.arange(len(compiled)), [len(rows) for rows, _ in compiled]
+        )
+        matrix[species, np.concatenate([rows for rows, _ in compiled])] = np.concatenate(
+            [counts for _, counts in compiled]
+        )
+    return matrix
+
+
+def molar_masses(chemicals):
+    """
+    Input: Sequence of N chemical formulas
+    Output: Array of N molar masses in g/mol, from one matrix product
+    """
+    return species_matrix(chemicals) @ periodic_table().atomic_mass
+
 
-    for k, v in zip(chem_spliter(chemical), masses):
-        return_dict[k[0]] = (v / chemical_mass) * 100
+def percent_compositions(chemicals):
+    """
+    Input: Sequence of N chemical formulas
+    Output: N x elements array of mass %, columns in periodic_table() order
+    """
+    mass_matrix = species_matrix(chemicals) * periodic_table().atomic_mass
+    return mass_matrix / mass_matrix.sum(axis=1, keepdims=True) * 100
 
-    return return_dict
+
+@lru_cache(maxsize=65536)
+def molar_mass(chemical):
+    """
+    Input: Chemical formula in form (H_2 O)
+    Output: Molar mass in g/mol
+    """
+    rows, counts = compile_formula(chemical)
+    return float(counts @ periodic_table().atomic_mass[rows])
+
+
+@lru_cache(maxsize=65536)
+def _percent_composition(chemical):
+    rows, counts = compile_formula(chemical)
+    table = periodic_table()
+    masses = counts * table.atomic_mass[rows]
+    return tuple(
+        (table.symbols[row], float(percent))
+        for row, percent in zip(rows, masses / masses.sum() * 100)
+    )
+
+
+def percent_composition(chemical):
+    """
+    Input: Chemical formula in form (H_2 O)
+    Output: Dict in form {Element: %comp}
+    """
+    return dict(_percent_composition(chemical))
@@ -1,5 +1,10 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Optional
+import math
+from .power_bus import HEATING, PRESSURIZATION, PowerBus
 from .power_system import PowerSystem
+from .scheduler import Rate
+from .vessel_dynamics import VesselDynamics, VesselTrajectory
 
 
 @dataclass
@@ -15,63 +20,117 @@ class ContainmentVessel:
     internal_temp_c: float  # Current internal temperature in Celsius
     internal_pressure_pa: float  # Current internal pressure in Pascals
     power_system: PowerSystem
-
-    def adjust_temperature(self, external_temp_c, hour):
-        # Mass of gas (assuming ideal gas)
+    substeps: int = 1  # Sub-steps per hour for the thermal response
+    # Adaptive ODE model replacing the hourly sub-steps, see advance
+    dynamics: Optional[VesselDynamics] = field(default=None, repr=False)
+    # Dense solution of the last hour advanced with `dynamics`
+    trajectory: Optional[VesselTrajectory] = field(default=None, repr=False)
+    # (state key, temperature, kJ) from the last plan_heating, see heat
+    _heating_plan: tuple = field(default=(None, None, None), repr=False)
+    # (state key, trajectory) from the last power_demand with `dynamics`
+    _ode_plan: tuple = field(default=(None, None), repr=False)
+
+    @property
+    def rate(self):
+        return Rate(substeps=self.substeps)
+
+    def integrate_temperature(self, external_temp_c, energy_kj=math.inf):
+        """Integrate heating and insulation losses over one hour.
+
+        The hour is split into `substeps` sub-steps. Each heats towards the
+        target with up to its share of the heater's output, while energy
+        from `energy_kj` remains, then closes 1 - insulation_factor**dt of
+        the gap to `external_temp_c`. With `dynamics` the hour is instead
+        integrated adaptively, with the pressure held. Returns (temperature,
+        energy used) without changing the vessel.
+        """
+        if self.dynamics is not None:
+            trajectory = self.dynamics.solve(
+                self.internal_temp_c,
+                self.internal_pressure_pa,
+                external_temp_c,
+                heating_budget_kj=energy_kj,
+                pressurization_budget_kj=0,
+            )
+            internal_temp_c, _, energy_used, _ = trajectory.final()
+            return float(internal_temp_c[0]), min(float(energy_used[0]), energy_kj)
+
+        dt_hours = 1 / self.substeps
         vessel_volume_m3 = self.vessel_volume_m3  # Define vessel volume
         pressure_pa = self.internal_pressure_pa
-        temp_k = self.internal_temp_c + 273.15
         R_specific = 287  # J/(kg·K) for air (approximation)
 
-        mass_kg = max((pressure_pa * vessel_volume_m3) / (R_specific * temp_k), 0.001)
-
         # Specific heat capacity (assumed average for gas mixture)
         cp = 1005  # J/(kg·K)
 
-        # Energy required
-        temp_diff = self.target_temp_c - self.internal_temp_c
-        required_energy_j = mass_kg * cp * temp_diff
-        required_energy_kj = required_energy_j / 1000
-
-        # Check available power
-        heating_power_kj = self.heating_power_kw * 3600
-        available_energy = min(
-            heating_power_kj, self.power_system.available_power(hour)
+        step_heating_kj = self.heating_power_kw * 3600 * dt_hours
+
+        # The insulation keeps insulation_factor of the gap per hour
+        drift_fraction = 1 - self.insulation_factor**dt_hours
+
+        internal_temp_c = self.internal_temp_c
+        energy_used = 0
+        for _ in range(self.substeps):
+            # Mass of gas (assuming ideal gas)
+            temp_k = internal_temp_c + 273.15
+            mass_kg = max(
+                (pressure_pa * vessel_volume_m3) / (R_specific * temp_k), 0.001
+            )
+
+            # Energy required to reach the target
+            required_energy_kj = (
+                mass_kg * cp * (self.target_temp_c - internal_temp_c) / 1000
+            )
+            step_energy_used = max(
+                min(step_heating_kj, energy_kj - energy_used, required_energy_kj), 0
+            )
+            internal_temp_c += (step_energy_used * 1000) / (mass_kg * cp)
+            energy_used += step_energy_used
+
+            # Apply temperature drift
+            internal_temp_c += (external_temp_c - internal_temp_c) * drift_fraction
+
+        return internal_temp_c, energy_used
+
+    def plan_heating(self, external_temp_c):
+        """(temperature, kJ used) for this hour if the heater gets all it
+        asks for; kept so that `heat` with the full request reuses it."""
+        self._heating_plan = (
+            self._state_key(external_temp_c),
+            *self.integrate_temperature(external_temp_c),
         )
+        return self._heating_plan[1:]
 
-        # Adjust internal temperature
-        energy_used = min(available_energy, required_energy_kj)
-        self.power_system.manage_battery(energy_used, available_energy)
-        if required_energy_kj > 0:
-            temp_increase = (energy_used * 1000) / (mass_kg * cp)
-        else:
-            temp_increase = 0
-
-        self.internal_temp_c += temp_increase
-
-        # Apply temperature drift
-        temp_drift = (external_temp_c - self.internal_temp_c) * (
-            1 - self.insulation_factor
-        )
-        self.internal_temp_c += temp_drift
+    def heating_demand(self, external_temp_c):
+        """kJ the heater would use this hour if given all it asks for."""
+        return self.plan_heating(external_temp_c)[1]
 
+    def heat(self, external_temp_c, energy_kj):
+        """Advance the temperature by one hour with `energy_kj` granted."""
+        key, planned_temp_c, planned_energy = self._heating_plan
+        if key == self._state_key(external_temp_c) and energy_kj >= planned_energy:
+            self.internal_temp_c, energy_used = planned_temp_c, planned_energy
+        else:
+            self.internal_temp_c, energy_used = self.integrate_temperature(
+                external_temp_c, energy_kj
+            )
+        self._heating_plan = (None, None, None)
         return {
             "Internal Temperature (°C)": self.internal_temp_c,
             "Heating Power Used (kJ)": energy_used,
         }
 
-    def adjust_pressure(self, hour):
-        # Pressure difference
-        pressure_ratio = self.target_pressure_pa / self.internal_pressure_pa
-        if pressure_ratio <= 1:
-            return {
-                "Internal Pressure (Pa)": self.internal_pressure_pa,
-                "Pressurization Power Used (kJ)": 0,
-            }
+    def pressurization_energy_kj(self, internal_temp_c=None):
+        """kJ to bring the pressure up to target at `internal_temp_c`
+        (the current temperature by default), ignoring the pump's limit."""
+        if self.target_pressure_pa <= self.internal_pressure_pa:
+            return 0
 
         # Calculate moles of gas to add using PV = nRT
         R = 8.314  # J/(mol·K)
-        temp_k = self.internal_temp_c + 273.15
+        if internal_temp_c is None:
+            internal_temp_c = self.internal_temp_c
+        temp_k = internal_temp_c + 273.15
         delta_n = (
             (self.target_pressure_pa - self.internal_pressure_pa)
             * self.vessel_volume_m3
@@ -80,17 +139,27 @@ class ContainmentVessel:
 
         # Energy required to compress gas into vessel (simplified)
         specific_energy_kj_per_mol = 1  # kJ/mol, adjust as necessary
-        required_energy_kj = delta_n * specific_energy_kj_per_mol
+        return delta_n * specific_energy_kj_per_mol
 
-        # Check available power
-        pressurization_power_kj = self.pressurization_power_kw * 3600
-        available_energy = min(
-            pressurization_power_kj, self.power_system.available_power(hour)
+    def pressurization_demand(self, internal_temp_c=None):
+        return min(
+            self.pressurization_power_kw * 3600,
+            self.pressurization_energy_kj(internal_temp_c),
         )
 
+    def pressurize(self, energy_kj):
+        """Raise the pressure towards target with `energy_kj` granted."""
+        required_energy_kj = self.pressurization_energy_kj()
+        if required_energy_kj <= 0:
+            return {
+                "Internal Pressure (Pa)": self.internal_pressure_pa,
+                "Pressurization Power Used (kJ)": 0,
+            }
+
         # Adjust internal pressure
-        energy_used = min(available_energy, required_energy_kj)
-        self.power_system.manage_battery(energy_used, available_energy)
+        energy_used = min(
+            energy_kj, self.pressurization_power_kw * 3600, required_energy_kj
+        )
         pressure_increase = (energy_used / required_energy_kj) * (
             self.target_pressure_pa - self.internal_pressure_pa
         )
@@ -100,3 +169,81 @@ class ContainmentVessel:
             "Internal Pressure (Pa)": self.internal_pressure_pa,
             "Pressurization Power Used (kJ)": energy_used,
         }
+
+    def _state_key(self, external_temp_c):
+        return (external_temp_c, self.internal_temp_c, self.internal_pressure_pa)
+
+    def power_demand(self, external_temp_c):
+        """(heating kJ, pressurization kJ) for this hour if both get all
+        they ask for."""
+        if self.dynamics is None:
+            planned_temp_c, heating_kj = self.plan_heating(external_temp_c)
+            # Pressurization happens after heating, so it is costed at that temperature
+            return heating_kj, self.pressurization_demand(planned_temp_c)
+        trajectory = self.dynamics.solve(
+            self.internal_temp_c, self.internal_pressure_pa, external_temp_c
+        )
+        self._ode_plan = (self._state_key(external_temp_c), trajectory)
+        _, _, heating_kj, pressurization_kj = trajectory.final()
+        return float(heating_kj[0]), float(pressurization_kj[0])
+
+    def advance(self, external_temp_c, heating_kj, pressurization_kj):
+        """Heat and pressurize for one hour with the energy granted to each.
+
+        Without `dynamics` this is `heat` followed by `pressurize`. With it,
+        temperature and pressure are integrated together, reusing the
+        power_demand solution when both requests were met in full, and the
+        hour's dense solution is kept in `trajectory`. Returns the (heating,
+        pressurization) kJ used.
+        """
+        if self.dynamics is None:
+            heating_info = self.heat(external_temp_c, heating_kj)
+            pressurization_info = self.pressurize(pressurization_kj)
+            return (
+                heating_info["Heating Power Used (kJ)"],
+                pressurization_info["Pressurization Power Used (kJ)"],
+            )
+
+        key, trajectory = self._ode_plan
+        self._ode_plan = (None, None)
+        if trajectory is not None:
+            _, _, planned_heating_kj, planned_pressurization_kj = trajectory.final()
+        if (
+            trajectory is None
+            or key != self._state_key(external_temp_c)
+            or heating_kj < planned_heating_kj[0]
+            or pressurization_kj < planned_pressurization_kj[0]
+        ):
+            trajectory = self.dynamics.solve(
+                self.internal_temp_c,
+                self.internal_pressure_pa,
+                external_temp_c,
+                heating_budget_kj=heating_kj,
+                pressurization_budget_kj=pressurization_kj,
+            )
+        self.trajectory = trajectory
+        internal_temp_c, internal_pressure_pa, heating_used, pressurization_used = (
+            float(values[0]) for values in trajectory.final()
+        )
+        self.internal_temp_c = internal_temp_c
+        self.internal_pressure_pa = internal_pressure_pa
+        # The solver meets a budget to within its tolerance; never report more
+        return min(heating_used, heating_kj), min(pressurization_used, pressurization_kj)
+
+    def adjust_temperature(self, external_temp_c, hour):
+        """Heat for one hour, settling the heater's power on its own bus."""
+        bus = PowerBus()
+        bus.request(HEATING, self.heating_demand(external_temp_c))
+        settlement = bus.settle_power_system(
+            self.power_system, self.power_system.available_power(hour)
+        )
+        return self.heat(external_temp_c, settlement[HEATING])
+
+    def adjust_pressure(self, hour):
+        """Pressurize for one hour, settling the pump's power on its own bus."""
+        bus = PowerBus()
+        bus.request(PRESSURIZATION, self.pressurization_demand())
+        settlement = bus.settle_power_system(
+            self.power_system, self.power_system.available_power(hour)
+        )
+        return self.pressurize(settlement[PRESSURIZATION])
@@ -0,0 +1,142 @@
+import numpy as np
+from lib.environment import TIME_STEPS_PER_DAY
+
+DOWNSAMPLE_METHODS = ("minmax", "lttb")
+AGGREGATES = ("mean", "min", "max", "sum")
+
+
+def min_max_indices(values, points):
+    """Indices of the minimum and maximum of each of `points` // 2 equal
+    buckets, plus the first and last row, so peaks survive the reduction."""
+    n = len(values)
+    buckets = max(points // 2, 1)
+    if n <= points:
+        return np.arange(n)
+    size = -(-n // buckets)
+    # Pad with the last value so the rows reshape into whole buckets
+    padded = np.concatenate([values, np.repeat(values[-1:], size * buckets - n)])
+    padded = padded.reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    indices = np.concatenate(
+        [
+            [0, n - 1],
+            offsets + padded.argmin(axis=1),
+            offsets + padded.argmax(axis=1),
+        ]
+    )
+    return np.unique(np.minimum(indices, n - 1))
+
+
+def lttb_indices(x, y, points):
+    """Indices chosen by Largest-Triangle-Three-Buckets (Steinarsson, 2013).
+
+    Keeps the first and last row and, from each of `points` - 2 buckets
+    between them, the row forming the largest triangle with the row kept
+    from the previous bucket and the mean of the next one.
+    """
+    n = len(y)
+    if n <= points or points < 3:
+        return np.arange(n) if n <= points else np.array([0, n - 1])
+    edges = np.linspace(1, n - 1, points - 1).astype(int)
+    indices = np.empty(points, dtype=int)
+    indices[0], indices[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = x[end:next_end].mean()
+        next_y = y[end:next_end].mean()
+        # Twice the triangle area; the constant factor does not change the argmax
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(areas.argmax())
+        indices[bucket + 1] = previous
+    return indices
+
+
+def downsample_indices(hours, columns, points, method="minmax"):
+    """Sorted rows to keep so that every array in `columns` keeps its shape
+    at about `points` rows; the rows chosen for each column are merged so
+    all columns share one hour axis."""
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(
+            f"Unknown downsampling method {method!r}; use one of {DOWNSAMPLE_METHODS}"
+        )
+    if len(hours) <= points:
+        return np.arange(len(hours))
+    chosen = [
+        min_max_indices(values, points)
+        if method == "minmax"
+        else lttb_indices(hours, values, points)
+        for values in columns
+    ]
+    return np.unique(np.concatenate(chosen)) if chosen else np.arange(0)
+
+
+def sol_aggregate(hours, values, statistic, steps_per_sol=TIME_STEPS_PER_DAY):
+    """(sol, statistic of `values` over the recorded hours of each sol)."""
+    if statistic not in AGGREGATES:
+        raise ValueError(f"Unknown aggregate {statistic!r}; use one of {AGGREGATES}")
+    sols, starts = np.unique(hours // steps_per_sol, return_index=True)
+    if statistic == "min":
+        return sols, np.minimum.reduceat(values, starts)
+    if statistic == "max":
+        return sols, np.maximum.reduceat(values, starts)
+    sums = np.add.reduceat(values, starts)
+    if statistic == "sum":
+        return sols, sums
+    return sols, sums / np.diff(np.append(starts, len(values)))
+
+
+def select(
+    recorder,
+    columns=None,
+    start_hour=None,
+    end_hour=None,
+    points=None,
+    method="minmax",
+    aggregates=(),
+):
+    """The part of a recorder's results a client asked for, as arrays.
+
+    Keeps only `columns` (all by default) for hours in [start_hour,
+    end_hour). With `aggregates`, each column is reduced to one value per
+    sol per statistic, named "<column>_<statistic>", and `hour` holds the
+    first hour of each sol. Otherwise, with `points`, rows are reduced to
+    about `points` per column by `method` ("minmax" or "lttb").
+    """
+    columns = list(columns or recorder.columns)
+    unknown = [name for name in columns if name not in recorder]
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+    if points is not None and points <= 0:
+        raise ValueError(f"points must be positive, not {points}")
+    columns = [name for name in columns if name not in ("hour", "sol")]
+
+    hours = recorder["hour"]
+    window = slice(
+        None if start_hour is None else np.searchsorted(hours, start_hour),
+        None if end_hour is None else np.searchsorted(hours, end_hour),
+    )
+    hours = hours[window]
+    values = {name: recorder[name][window] for name in columns}
+
+    if aggregates:
+        result = {}
+        sols = np.arange(0)
+        for name in columns:
+            for statistic in aggregates:
+                sols, result[f"{name}_{statistic}"] = sol_aggregate(
+                    hours, values[name], statistic
+                )
+        if not columns:
+            sols = np.unique(hours // TIME_STEPS_PER_DAY)
+        return {"hour": sols * TIME_STEPS_PER_DAY, "sol": sols, **result}
+
+    if points:
+        keep = downsample_indices(hours, list(values.values()), points, method)
+        hours = hours[keep]
+        values = {name: column[keep] for name, column in values.items()}
+    return {"hour": hours, "sol": hours / TIME_STEPS_PER_DAY, **values}
@@ -1,8 +1,11 @@
 from dataclasses import dataclass
+from typing import Optional
 import logging
 from lib.reactor_settings import ReactorSettings
 from lib.storage_tank import StorageTank
+from lib.power_bus import ELECTROLYSIS, PowerBus
 from lib.power_system import PowerSystem
+from lib.telemetry import ELECTROLYSIS_IDLE, Telemetry, report
 
 logger = logging.getLogger(__name__)
 
@@ -15,12 +18,30 @@ class ElectrolysisReactor:
     O2_tank: StorageTank
     power_system: PowerSystem
     efficiency: float = 0.8  # Default efficiency of 80%
+    telemetry: Optional[Telemetry] = None
+
+    # Result of an hour without electrolysis
+    IDLE = {"H2 Produced (g)": 0, "O2 Produced (g)": 0, "Power Used (kJ)": 0}
+
+    def power_demand(self):
+        """kJ to split all the water in the H2O tank."""
+        moles_H2O_available = self.H2O_tank.level / self.settings.molar_mass_H2O
+        return moles_H2O_available * self.settings.energy_per_mole_H2O / self.efficiency
+
+    def request_power(self, bus, hour):
+        bus.request(ELECTROLYSIS, self.power_demand())
 
     def run_cycle(self, hour, total_power_available):
+        """Run one cycle, settling its power on its own bus."""
+        bus = PowerBus()
+        self.request_power(bus, hour)
+        settlement = bus.settle_power_system(self.power_system, total_power_available)
+        return self.electrolyze(hour, settlement[ELECTROLYSIS])
+
+    def electrolyze(self, hour, power_kj):
+        """Split water with the energy granted to electrolysis on the bus."""
         # Maximum moles of H₂O that can be processed based on power
-        max_moles_power = (
-            total_power_available * self.efficiency
-        ) / self.settings.energy_per_mole_H2O
+        max_moles_power = (power_kj * self.efficiency) / self.settings.energy_per_mole_H2O
 
         # Moles of H₂O available in the tank
         moles_H2O_available = self.H2O_tank.level / self.settings.molar_mass_H2O
@@ -40,20 +61,20 @@ class ElectrolysisReactor:
                 moles_H2O * self.settings.molar_mass_O2
             )  # 1 mole O₂ per mole H₂O
 
-            # Calculate power required
+            # Power used, already settled on the bus
             power_required = (
                 moles_H2O * self.settings.energy_per_mole_H2O
             ) / self.efficiency
 
-            # Consume power and update battery
-            self.power_system.manage_battery(power_required, total_power_available)
-
             # Add produced gases to tanks
             self.H2_tank.add(hydrogen_produced)
             self.O2_tank.add(oxygen_produced)
 
-            logger.info(
-                f"Electrolysis produced {hydrogen_produced}g H2 and {oxygen_produced}g O2 at hour {hour}."
+            logger.debug(
+                "Electrolysis produced %sg H2 and %sg O2 at hour %s.",
+                hydrogen_produced,
+                oxygen_produced,
+                hour,
             )
 
             return {
@@ -62,5 +83,12 @@ class ElectrolysisReactor:
                 "Power Used (kJ)": power_required,
             }
         else:
-            logger.warning(f"Insufficient resources for electrolysis at hour {hour}.")
-            return {"H2 Produced (g)": 0, "O2 Produced (g)": 0, "Power Used (kJ)": 0}
+            report(
+                self.telemetry,
+                logger,
+                "Electrolysis",
+                ELECTROLYSIS_IDLE,
+                "Insufficient resources for electrolysis at hour %s.",
+                hour,
+            )
+            return dict(self.IDLE)
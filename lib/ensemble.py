@@ -0,0 +1,392 @@
+from dataclasses import dataclass, field
+from typing import Optional
+import numpy as np
+from lib.reactor_settings import ReactorSettings
+from lib.plant_config import (
+    ELECTROLYSIS_STAGE,
+    INTAKE_STAGE,
+    SABATIER_STAGE,
+    TANKS,
+    ExecutionPlan,
+    as_plan,
+)
+from lib.plant_parameters import PlantParameters
+from lib.power_bus import ELECTROLYSIS, HEATING, INTAKE, PRESSURIZATION, PowerBus
+from lib.power_system import PowerSystem
+from lib.power_timeline import PowerTimeline
+from lib.sabatier_reactor import SabatierReactor
+from lib.vessel_dynamics import VesselDynamics
+
+# Row of each tank in EnsembleSimulation.levels
+CO2, H2, CH4, H2O, O2 = range(len(TANKS))
+
+
+@dataclass
+class EnsembleSimulation:
+    """Advance many independent plants at once.
+
+    Every component's state is held as a NumPy array with one entry per
+    scenario, and `step` applies the same physics as the dataclass
+    components in `lib` to all scenarios in a single vectorized pass. The
+    plan's stage order and tank rows are unpacked once, so each step only
+    indexes `levels` with plain ints.
+    """
+
+    params: PlantParameters  # Fields are arrays, see PlantParameters.stack
+    temperature_cycle_c: np.ndarray  # Noise-free external temperature by hour
+    settings: ReactorSettings = field(default_factory=ReactorSettings)
+    rng: np.random.Generator = field(default_factory=np.random.default_rng)
+    temp_noise_c: float = 2  # Per-scenario noise on the external temperature
+    power_block_hours: int = 24  # Hours of generation drawn per PowerTimeline
+    power_bus: PowerBus = field(default_factory=PowerBus)  # Settles each step's power
+    plan: Optional[ExecutionPlan] = None  # Topology and call order; default plant if None
+
+    def __post_init__(self):
+        p = self.params
+        plan = self.plan = as_plan(self.plan)
+        self._stages = plan.stages
+        self._intake_rows = plan.tank_rows(INTAKE_STAGE)
+        self._sabatier_rows = plan.tank_rows(SABATIER_STAGE)
+        self._electrolysis_rows = plan.tank_rows(ELECTROLYSIS_STAGE)
+
+        self.n_scenarios = len(p.solar_max_kw)
+        self.capacity = np.stack([getattr(p, f"{name}_capacity") for name in TANKS])
+        self.levels = np.stack(
+            [getattr(p, f"{name}_initial_level") for name in TANKS]
+        ).astype(float)
+        self.battery_level_kj = np.array(p.battery_level_kj, dtype=float)
+        self.internal_temp_c = np.array(p.initial_temp_c, dtype=float)
+        self.internal_pressure_pa = np.array(p.initial_pressure_pa, dtype=float)
+        self.is_low = np.zeros_like(self.levels, dtype=bool)
+
+        # The adaptive vessel model solves every scenario's vessel together,
+        # so they share one tolerance
+        rtol = np.unique(p.vessel_rtol)
+        if len(rtol) > 1:
+            raise ValueError("vessel_rtol must be the same in every scenario")
+        self.vessel_dynamics = (
+            VesselDynamics.from_parameters(p, float(rtol[0])) if rtol[0] > 0 else None
+        )
+
+        # Generation parameters only; battery state lives in battery_level_kj
+        self.power_system = PowerSystem(
+            solar_max_kw=p.solar_max_kw,
+            nuclear_max_kw=p.nuclear_max_kw,
+            battery_capacity_kj=p.battery_capacity_kj,
+        )
+        self._timeline = None
+
+    def _add(self, tank, amount):
+        self.levels[tank] = np.minimum(self.capacity[tank], self.levels[tank] + amount)
+
+    def _remove(self, tank, amount):
+        removed = np.minimum(amount, self.levels[tank])
+        self.levels[tank] -= removed
+        self.is_low[tank] |= self.levels[tank] < 0.1 * self.capacity[tank]
+        return removed
+
+    def available_power(self, hour):
+        """Return this hour's (solar_kj, nuclear_kj) arrays for all scenarios.
+
+        Output is drawn a block of hours at a time with PowerTimeline, so the
+        whole ensemble costs two draws per block instead of two per hour.
+        """
+        timeline = self._timeline
+        if timeline is None or hour >= timeline.start_hour + len(timeline):
+            timeline = self._timeline = PowerTimeline.generate(
+                self.power_system, self.power_block_hours, self.rng, start_hour=hour
+            )
+        index = hour - timeline.start_hour
+        return timeline.solar_power_kj[index], timeline.nuclear_power_kj[index]
+
+    def _integrate_temperature(self, external_temp_c, energy_kj=np.inf):
+        """Array version of ContainmentVessel.integrate_temperature, with
+        per-scenario sub-step counts; returns (temperature, energy used)."""
+        p = self.params
+        cp = 1005  # J/(kg·K)
+        substeps = p.vessel_substeps
+        dt_hours = 1 / substeps
+        step_heating_kj = p.heating_power_kw * 3600 * dt_hours
+        drift_fraction = 1 - p.insulation_factor**dt_hours
+        internal_temp_c = self.internal_temp_c.copy()
+        energy_used = np.zeros(self.n_scenarios)
+        for substep in range(int(np.max(substeps))):
+            active = substep < substeps
+            temp_k = internal_temp_c + 273.15
+            mass_kg = np.maximum(
+                (self.internal_pressure_pa * p.vessel_volume_m3) / (287 * temp_k), 0.001
+            )
+            required_heat_kj = (
+                mass_kg * cp * (p.target_temp_c - internal_temp_c) / 1000
+            )
+            step_heat_used = np.where(
+                active,
+                np.maximum(
+                    np.minimum(
+                        np.minimum(step_heating_kj, energy_kj - energy_used),
+                        required_heat_kj,
+                    ),
+                    0,
+                ),
+                0,
+            )
+            internal_temp_c += (step_heat_used * 1000) / (mass_kg * cp)
+            internal_temp_c += np.where(
+                active, (external_temp_c - internal_temp_c) * drift_fraction, 0
+            )
+            energy_used += step_heat_used
+        return internal_temp_c, energy_used
+
+    def _pressurization_energy_kj(self, internal_temp_c):
+        p = self.params
+        pressure_gap = p.target_pressure_pa - self.internal_pressure_pa
+        return np.where(
+            pressure_gap > 0,
+            pressure_gap * p.vessel_volume_m3 / (8.314 * (internal_temp_c + 273.15)),
+            0,
+        )
+
+    def _intake(self, due, power_kj):
+        """Intake cycle for all scenarios; returns (CO2 added, power used)."""
+        p = self.params
+        (CO2_out,) = self._intake_rows
+        max_intake_possible = power_kj / p.intake_power_per_cycle * p.intake_rate
+        tank_space_available = self.capacity[CO2_out] - self.levels[CO2_out]
+        intake_amount = np.minimum(
+            np.minimum(p.intake_rate, max_intake_possible), tank_space_available
+        )
+        CO2_added = np.where(due & (intake_amount > 0), intake_amount, 0.0)
+        self._add(CO2_out, CO2_added)
+        return CO2_added, (CO2_added / p.intake_rate) * p.intake_power_per_cycle
+
+    def _vessel_demand(self, external_temp_c):
+        """(plan, heating kJ, pressurization kJ) each vessel asks for this
+        hour; the plan is the planned temperature, or with vessel_dynamics
+        the solution of the hour, for _advance_vessel to reuse."""
+        p = self.params
+        if self.vessel_dynamics is not None:
+            trajectory = self.vessel_dynamics.solve(
+                self.internal_temp_c, self.internal_pressure_pa, external_temp_c
+            )
+            _, _, heating_demand, pressurization_demand = trajectory.final()
+            return trajectory, heating_demand, pressurization_demand
+        planned_temp_c, heating_demand = self._integrate_temperature(external_temp_c)
+        pressurization_demand = np.minimum(
+            p.pressurization_power_kw * 3600,
+            self._pressurization_energy_kj(planned_temp_c),
+        )
+        return planned_temp_c, heating_demand, pressurization_demand
+
+    def _advance_vessel(
+        self, external_temp_c, plan, heating_demand, pressurization_demand, settlement
+    ):
+        """Heat and pressurize every vessel for the hour with its allocation;
+        returns the (heating, pressurization) energy used."""
+        p = self.params
+        # The plan stands wherever both requests were met in full, so it is
+        # only integrated again when some were not
+        met = np.all(settlement[HEATING] >= heating_demand)
+        if self.vessel_dynamics is not None:
+            if not (met and np.all(settlement[PRESSURIZATION] >= pressurization_demand)):
+                plan = self.vessel_dynamics.solve(
+                    self.internal_temp_c,
+                    self.internal_pressure_pa,
+                    external_temp_c,
+                    heating_budget_kj=settlement[HEATING],
+                    pressurization_budget_kj=settlement[PRESSURIZATION],
+                )
+            (
+                self.internal_temp_c,
+                self.internal_pressure_pa,
+                heating_used,
+                pressurization_used,
+            ) = plan.final()
+            # The solver meets a budget to within its tolerance; never report more
+            return (
+                np.minimum(heating_used, settlement[HEATING]),
+                np.minimum(pressurization_used, settlement[PRESSURIZATION]),
+            )
+
+        # Containment vessel temperature
+        if met:
+            self.internal_temp_c, heating_power_used = plan, heating_demand
+        else:
+            self.internal_temp_c, heating_power_used = self._integrate_temperature(
+                external_temp_c, settlement[HEATING]
+            )
+
+        # Containment vessel pressure
+        pressure_gap = p.target_pressure_pa - self.internal_pressure_pa
+        required_pressure_kj = self._pressurization_energy_kj(self.internal_temp_c)
+        pressurization_power_used = np.minimum(
+            np.minimum(settlement[PRESSURIZATION], p.pressurization_power_kw * 3600),
+            required_pressure_kj,
+        )
+        self.internal_pressure_pa += np.where(
+            required_pressure_kj > 0,
+            pressurization_power_used
+            / np.where(required_pressure_kj > 0, required_pressure_kj, 1)
+            * pressure_gap,
+            0,
+        )
+        return heating_power_used, pressurization_power_used
+
+    def _sabatier(
+        self,
+        hour,
+        external_temp_c,
+        vessel_plan,
+        heating_demand,
+        pressurization_demand,
+        settlement,
+    ):
+        """Vessel and Sabatier reaction for all scenarios; returns the
+        (heating, pressurization) energy used and the CH4 made."""
+        p = self.params
+        s = self.settings
+        CO2_in, H2_in, CH4_out, H2O_out = self._sabatier_rows
+
+        # Catalyst degradation
+        reaction_efficiency = np.maximum(
+            p.sabatier_efficiency * np.exp(-p.catalyst_degradation_rate * hour), 0
+        )
+
+        heating_power_used, pressurization_power_used = self._advance_vessel(
+            external_temp_c, vessel_plan, heating_demand, pressurization_demand, settlement
+        )
+
+        # Sabatier reaction, scaled by the share of the vessel's request met
+        R = 8.314
+        E_a = SabatierReactor.activation_energy_kj * 1000
+        temp_effect = np.exp(
+            -E_a / (R * (self.internal_temp_c + 273.15))
+        ) / np.exp(-E_a / (R * (p.target_temp_c + 273.15)))
+        pressure_effect = np.clip(self.internal_pressure_pa / p.target_pressure_pa, 0, 1)
+        adjusted_efficiency = np.clip(
+            reaction_efficiency * temp_effect * pressure_effect, 0, 1
+        ) * settlement.fraction(HEATING, PRESSURIZATION)
+        available_moles = np.minimum(
+            self.levels[CO2_in] / s.molar_mass_CO2, self.levels[H2_in] / s.molar_mass_H2 / 4
+        )
+        moles_CH4 = np.maximum(available_moles * adjusted_efficiency, 0)
+        self._remove(CO2_in, moles_CH4 * s.molar_mass_CO2)
+        self._remove(H2_in, moles_CH4 * 4 * s.molar_mass_H2)
+        CH4_produced = moles_CH4 * s.molar_mass_CH4
+        self._add(CH4_out, CH4_produced)
+        self._add(H2O_out, moles_CH4 * 2 * s.molar_mass_H2O)
+        return heating_power_used, pressurization_power_used, CH4_produced
+
+    def _electrolysis(self, power_kj):
+        """Electrolysis for all scenarios; returns (H2 produced, power used)."""
+        p = self.params
+        s = self.settings
+        H2O_in, H2_out, O2_out = self._electrolysis_rows
+        max_moles_power = (power_kj * p.electrolysis_efficiency) / s.energy_per_mole_H2O
+        moles_H2O = np.maximum(
+            np.minimum(max_moles_power, self.levels[H2O_in] / s.molar_mass_H2O), 0
+        )
+        self._remove(H2O_in, moles_H2O * s.molar_mass_H2O)
+        H2_produced = moles_H2O * 2 * s.molar_mass_H2
+        self._add(H2_out, H2_produced)
+        self._add(O2_out, moles_H2O * s.molar_mass_O2)
+        return H2_produced, (moles_H2O * s.energy_per_mole_H2O) / p.electrolysis_efficiency
+
+    def step(self, hour, recorder=None):
+        """Advance every scenario by one hour, appending the results to
+        `recorder` (a SimulationRecorder one scenario wide) if given.
+
+        As in Plant.step, each consumer's demand is requested on a PowerBus,
+        settled once against generation and the battery for all scenarios,
+        and each component then runs with its allocation, in plan order.
+        """
+        p = self.params
+        s = self.settings
+        solar_power_kj, nuclear_power_kj = self.available_power(hour)
+        total_power = solar_power_kj + nuclear_power_kj
+        external_temp_c = self.temperature_cycle_c[hour] + self.rng.normal(
+            0, self.temp_noise_c, self.n_scenarios
+        )
+
+        # Power requests
+        vessel_plan, heating_demand, pressurization_demand = self._vessel_demand(
+            external_temp_c
+        )
+        bus = self.power_bus
+        bus.request(HEATING, heating_demand)
+        bus.request(PRESSURIZATION, pressurization_demand)
+        if self._intake_rows:
+            (CO2_out,) = self._intake_rows
+            due = (hour % p.intake_interval_hours) == 0
+            tank_space_available = self.capacity[CO2_out] - self.levels[CO2_out]
+            bus.request(
+                INTAKE,
+                np.where(
+                    due,
+                    np.minimum(p.intake_rate, np.maximum(tank_space_available, 0))
+                    / p.intake_rate
+                    * p.intake_power_per_cycle,
+                    0,
+                ),
+            )
+        if self._electrolysis_rows:
+            H2O_in = self._electrolysis_rows[0]
+            bus.request(
+                ELECTROLYSIS,
+                (self.levels[H2O_in] / s.molar_mass_H2O * s.energy_per_mole_H2O)
+                / p.electrolysis_efficiency,
+            )
+        settlement = bus.settle(total_power, self.battery_level_kj, p.battery_capacity_kj)
+        self.battery_level_kj = settlement.battery_level_kj
+
+        # Components, in the plan's order; the recorder broadcasts the zeros
+        # of a component the plant does not have
+        CO2_added = intake_power = H2_produced = electrolysis_power = 0.0
+        for stage in self._stages:
+            if stage == SABATIER_STAGE:
+                (
+                    heating_power_used,
+                    pressurization_power_used,
+                    CH4_produced,
+                ) = self._sabatier(
+                    hour,
+                    external_temp_c,
+                    vessel_plan,
+                    heating_demand,
+                    pressurization_demand,
+                    settlement,
+                )
+            elif stage == INTAKE_STAGE:
+                CO2_added, intake_power = self._intake(due, settlement[INTAKE])
+            else:
+                H2_produced, electrolysis_power = self._electrolysis(
+                    settlement[ELECTROLYSIS]
+                )
+        if recorder is None:
+            return
+
+        # Written straight into the recorder's buffers, which copy each row
+        sabatier_power = heating_power_used + pressurization_power_used
+        recorder.append(
+            self.levels[CO2],
+            self.levels[H2],
+            self.levels[CH4],
+            self.levels[H2O],
+            self.levels[O2],
+            self.battery_level_kj,
+            sabatier_power + electrolysis_power + intake_power,
+            H2_produced,
+            CH4_produced,
+            self.levels[O2],
+            CO2_added,
+            intake_power,
+            electrolysis_power,
+            sabatier_power,
+            heating_power_used,
+            pressurization_power_used,
+            settlement.unmet_kj,
+            self.internal_temp_c,
+            self.internal_pressure_pa,
+            p.sabatier_efficiency * (1 - p.catalyst_degradation_rate * hour),
+            solar_power_kj,
+            nuclear_power_kj,
+        )
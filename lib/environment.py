@@ -0,0 +1,61 @@
+import numpy as np
+
+# Mars-specific constants
+MARTIAN_DAY_HOURS = 24.6  # Length of a Martian day in Earth hours
+MARTIAN_YEAR_DAYS = 687  # Length of a Martian year in Earth days
+TIME_STEPS_PER_DAY = int(
+    MARTIAN_DAY_HOURS
+)  # Simulation time steps per day (1-hour intervals)
+TIME_STEPS_PER_YEAR = (
+    MARTIAN_YEAR_DAYS * TIME_STEPS_PER_DAY
+)  # Total steps for one Martian year
+
+# Seasonal Temperature Variation: amplitude over Martian year with a baseline Martian avg temp ~ -60°C
+MEAN_TEMP_C = -60
+SEASONAL_TEMP_VARIATION_C = 30  # Temperature seasonal swing in degrees Celsius
+DAILY_TEMP_FLUCTUATION_C = 40  # Daily swing in degrees Celsius
+TEMP_NOISE_C = 2
+
+# Pressure Cycle: Mars surface pressure varies between ~600 Pa to ~1200 Pa across seasons
+MEAN_PRESSURE_PA = 800
+SEASONAL_PRESSURE_VARIATION_PA = 300  # Seasonal pressure swing in Pa
+DAILY_PRESSURE_FLUCTUATION_PA = 50  # Daily pressure swing in Pa
+PRESSURE_NOISE_PA = 10
+
+
+def total_time_steps(num_years):
+    return int(TIME_STEPS_PER_YEAR * num_years)
+
+
+def temperature_cycle_c(num_years, noise_c=TEMP_NOISE_C, rng=None):
+    steps = total_time_steps(num_years)
+    seasonal_component_c = (
+        np.sin(np.linspace(0, 2 * np.pi * num_years, steps))
+        * SEASONAL_TEMP_VARIATION_C
+    )
+    daily_component_c = (
+        np.sin(np.linspace(0, 2 * np.pi * steps / MARTIAN_DAY_HOURS, steps))
+        * DAILY_TEMP_FLUCTUATION_C
+    )
+    cycle = MEAN_TEMP_C + seasonal_component_c + daily_component_c
+    if noise_c:
+        cycle = cycle + (rng or np.random).normal(0, noise_c, steps)  # Added noise
+    return cycle
+
+
+def pressure_cycle_pa(num_years, noise_pa=PRESSURE_NOISE_PA, rng=None):
+    steps = total_time_steps(num_years)
+    seasonal_component_pressure_pa = (
+        np.cos(np.linspace(0, 2 * np.pi * num_years, steps))
+        * SEASONAL_PRESSURE_VARIATION_PA
+    )
+    daily_component_pressure_pa = (
+        np.cos(np.linspace(0, 2 * np.pi * steps / MARTIAN_DAY_HOURS, steps))
+        * DAILY_PRESSURE_FLUCTUATION_PA
+    )
+    cycle = (
+        MEAN_PRESSURE_PA + seasonal_component_pressure_pa + daily_component_pressure_pa
+    )
+    if noise_pa:
+        cycle = cycle + (rng or np.random).normal(0, noise_pa, steps)  # Added noise
+    return cycle
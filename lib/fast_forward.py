@@ -0,0 +1,228 @@
+import math
+import numpy as np
+from lib.environment import TIME_STEPS_PER_DAY
+
+# Recorder columns holding a tank level, by Plant attribute
+TANK_COLUMNS = {
+    "CO2_tank": ("CO2_level",),
+    "H2_tank": ("H2_level",),
+    "CH4_tank": ("CH4_level",),
+    "H2O_tank": ("H2O_level",),
+    "O2_tank": ("O2_level", "O2_produced"),
+}
+
+# Recorder columns whose per-sol means must settle before fast-forwarding
+TRAJECTORY_COLUMNS = (
+    "battery_level",
+    "power_demand",
+    "internal_temp_c",
+    "internal_pressure_pa",
+    "CO2_added",
+    "H2_produced",
+)
+
+
+class SteadyStateFastForward:
+    """Step a Plant, skipping whole sols once its daily cycle has converged.
+
+    After every sol the per-sol means of TRAJECTORY_COLUMNS and the sol's
+    change in each tank level are summarized. When the last `window` sols
+    agree within `rtol`, the last sol is replayed for a stride of sols:
+    tank levels and telemetry counts are extrapolated linearly and catalyst
+    efficiency and power generation are filled in exactly. Strides stop
+    short of any tank reaching empty, its low threshold or capacity, and of
+    a catalyst replacement, and are shortened while a tank's daily change is
+    itself drifting; full stepping resumes to re-validate the cycle after
+    each stride.
+
+    Only sols stepped in full since `start_hour` are summarized, so a run
+    resumed mid-sol or without its history starts at the next whole sol.
+    The intake interval must divide the sol for a sol to repeat.
+    """
+
+    def __init__(
+        self,
+        plant,
+        recorder,
+        rtol=5e-3,
+        atol=1e-6,
+        window=2,
+        min_stride_sols=8,
+        max_stride_sols=128,
+        margin_sols=2,
+        steps_per_sol=TIME_STEPS_PER_DAY,
+    ):
+        intake = plant.atmosphere_intake
+        if intake is not None and steps_per_sol % intake.interval_hours:
+            raise ValueError(
+                f"Cannot fast-forward an intake every {intake.interval_hours} "
+                f"hours; the interval must divide {steps_per_sol}"
+            )
+        self.plant = plant
+        self.recorder = recorder
+        self.rtol = rtol
+        self.atol = atol
+        self.window = window
+        self.min_stride_sols = min_stride_sols
+        self.max_stride_sols = max_stride_sols
+        self.margin_sols = margin_sols
+        self.steps_per_sol = steps_per_sol
+        self.stride_sols = min_stride_sols
+        self.history = []
+        self.skipped_sols = 0
+        self.last_trend = None  # (sol, per-sol tank deltas) at the previous stride
+
+    def run(self, total_time_steps, start_hour=0):
+        hour = start_hour
+        while hour < total_time_steps:
+            self.plant.step(hour, self.recorder)
+            hour += 1
+            # The last sol must have been recorded in full to be summarized
+            if hour % self.steps_per_sol == 0 and hour - start_hour >= self.steps_per_sol:
+                hour += self._after_sol(hour, total_time_steps)
+        return self.skipped_sols
+
+    def _tanks(self):
+        return [getattr(self.plant, name) for name in TANK_COLUMNS]
+
+    def _summary(self):
+        end = self.recorder.position
+        start = end - self.steps_per_sol
+        trajectories = [
+            self.recorder.buffers[name][start:end] for name in TRAJECTORY_COLUMNS
+        ]
+        return {
+            "means": np.array([trajectory.mean() for trajectory in trajectories]),
+            "peaks": np.array([np.abs(trajectory).max() for trajectory in trajectories]),
+            "levels": np.array([tank.level for tank in self._tanks()]),
+            "events": {
+                key: counter[0]
+                for key, counter in self.plant.telemetry.counters.items()
+            },
+        }
+
+    def _converged(self):
+        recent = self.history[-(self.window + 1) :]
+        capacities = np.array([tank.capacity for tank in self._tanks()])
+        deltas = [b["levels"] - a["levels"] for a, b in zip(recent, recent[1:])]
+        for a, b in zip(recent, recent[1:]):
+            # Scale by each column's peak so sparse columns (intake every
+            # few hours) are judged against their pulse size, not their mean
+            if np.any(
+                np.abs(b["means"] - a["means"])
+                > self.atol + self.rtol * np.maximum(a["peaks"], b["peaks"])
+            ):
+                return False
+        for a, b in zip(deltas, deltas[1:]):
+            if np.any(np.abs(b - a) > self.atol + self.rtol * capacities):
+                return False
+        return True
+
+    def _safe_sols(self, hour, delta, drift):
+        """Whole sols that can be skipped before a tank or catalyst threshold,
+        or before a drifting trend would put a tank off by more than rtol of
+        its capacity."""
+        safe = math.inf
+        for tank, change_rate in zip(self._tanks(), drift):
+            if change_rate:
+                # A trend changing by `change_rate` per sol is off by about
+                # change_rate * stride**2 / 2 at the end of a linear stride
+                safe = min(
+                    safe, math.sqrt(2 * self.rtol * tank.capacity / abs(change_rate))
+                )
+        for tank, change in zip(self._tanks(), delta):
+            if abs(change) <= self.atol:
+                continue
+            thresholds = (0, 0.1 * tank.capacity, tank.capacity)
+            if change > 0:
+                ahead = [t - tank.level for t in thresholds if t > tank.level]
+            else:
+                ahead = [tank.level - t for t in thresholds if t < tank.level]
+            if ahead:
+                safe = min(safe, min(ahead) / abs(change))
+
+        sabatier = self.plant.sabatier_reactor
+        if sabatier.catalyst_degradation_rate > 0:
+            replacement_hour = (
+                math.log(sabatier.efficiency / sabatier.min_operational_efficiency)
+                / sabatier.catalyst_degradation_rate
+            )
+            if replacement_hour > hour:
+                safe = min(safe, (replacement_hour - hour) / self.steps_per_sol)
+        return math.floor(safe) - self.margin_sols
+
+    def _after_sol(self, hour, total_time_steps):
+        """Record the finished sol and fast-forward if possible; returns hours skipped."""
+        self.history.append(self._summary())
+        if len(self.history) <= self.window:
+            return 0
+        if not self._converged():
+            self.history = self.history[-self.window :]
+            self.stride_sols = self.min_stride_sols
+            return 0
+
+        # Average over the window so one noisy sol does not set the trend
+        delta = (
+            self.history[-1]["levels"] - self.history[-(self.window + 1)]["levels"]
+        ) / self.window
+        sol = hour // self.steps_per_sol
+        drift = np.zeros_like(delta)
+        if self.last_trend is not None:
+            last_sol, last_delta = self.last_trend
+            drift = (delta - last_delta) / (sol - last_sol)
+        self.last_trend = (sol, delta)
+
+        stride = min(
+            self.stride_sols,
+            (total_time_steps - hour) // self.steps_per_sol,
+            self._safe_sols(hour, delta, drift),
+        )
+        if stride < 1:
+            return 0
+
+        self._extrapolate(hour, stride, delta)
+        self.history = []
+        self.stride_sols = min(2 * self.stride_sols, self.max_stride_sols)
+        self.skipped_sols += stride
+        return stride * self.steps_per_sol
+
+    def _extrapolate(self, hour, stride, delta):
+        recorder = self.recorder
+        steps = self.steps_per_sol
+        start = recorder.position
+        end = start + stride * steps
+        sol_offsets = np.arange(1, stride + 1)[:, None]
+
+        # Replay the last sol, then correct the columns that are not periodic
+        for name in recorder.columns:
+            buffer = recorder.buffers[name]
+            buffer[start:end].reshape(stride, steps)[:] = buffer[start - steps : start]
+        for tank, change, (attribute, columns) in zip(
+            self._tanks(), delta, TANK_COLUMNS.items()
+        ):
+            for name in columns:
+                block = recorder.buffers[name][start:end].reshape(stride, steps)
+                np.clip(block + sol_offsets * change, 0, tank.capacity, out=block)
+            tank.level = min(max(tank.level + change * stride, 0), tank.capacity)
+
+        hours = np.arange(hour, hour + stride * steps)
+        sabatier = self.plant.sabatier_reactor
+        recorder.buffers["catalyst_efficiency"][start:end] = sabatier.efficiency * (
+            1 - sabatier.catalyst_degradation_rate * hours
+        )
+        timeline = self.plant.power_system.timeline
+        if timeline is not None:
+            index = slice(hour - timeline.start_hour, hour - timeline.start_hour + len(hours))
+            recorder.buffers["solar_power_generated"][start:end] = timeline.solar_power_kj[index]
+            recorder.buffers["nuclear_power_generated"][start:end] = timeline.nuclear_power_kj[index]
+        recorder.position = end
+
+        # Events repeat at the rate seen in the last stepped sol
+        last_events = self.history[-1]["events"]
+        previous_events = self.history[-2]["events"]
+        for key, count in last_events.items():
+            per_sol = count - previous_events.get(key, 0)
+            if per_sol > 0:
+                counter = self.plant.telemetry.counters[key]
+                counter[0] += per_sol * stride
+                counter[2] = hour + stride * steps - 1
@@ -0,0 +1,91 @@
+import numpy as np
+
+
+class RunningMean:
+    """Elementwise running mean and variance of equally shaped arrays
+    (Welford's method), in memory that does not grow with the count."""
+
+    def __init__(self, shape):
+        self.count = 0
+        self.mean = np.zeros(shape)
+        self._sum_squares = np.zeros(shape)
+
+    def update(self, values):
+        self.count += 1
+        delta = values - self.mean
+        self.mean += delta / self.count
+        self._sum_squares += delta * (values - self.mean)
+
+    @property
+    def variance(self):
+        if self.count < 2:
+            return np.full_like(self.mean, np.nan)
+        return self._sum_squares / (self.count - 1)
+
+
+class P2Quantile:
+    """Elementwise streaming estimate of the `p` quantile of equally shaped
+    arrays, using the P-squared algorithm (Jain and Chlamtac, 1985).
+
+    Five markers per element track the minimum, the p/2, p and (1+p)/2
+    quantiles and the maximum; each update moves them with a piecewise
+    parabolic fit. Memory is fixed at five heights and positions per element.
+    The first five updates are kept and answered exactly.
+    """
+
+    def __init__(self, p, shape):
+        self.p = p
+        self.count = 0
+        self._initial = []
+        self.heights = np.zeros((5,) + tuple(np.atleast_1d(shape)))
+        self.positions = np.zeros_like(self.heights)
+        self.desired = np.array([0, 2 * p, 4 * p, 2 + 2 * p, 4])
+        self.increments = np.array([0, p / 2, p, (1 + p) / 2, 1])
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float).reshape(self.heights.shape[1:])
+        self.count += 1
+        if self.count <= 5:
+            self._initial.append(values)
+            if self.count == 5:
+                self.heights[:] = np.sort(np.stack(self._initial), axis=0)
+                self.positions[:] = np.arange(5).reshape((5,) + (1,) * values.ndim)
+                self._initial = []
+            return
+
+        q, n = self.heights, self.positions
+        # Extend the extreme markers, then shift every marker above the new value
+        np.minimum(q[0], values, out=q[0])
+        np.maximum(q[4], values, out=q[4])
+        n[1:4] += values < q[1:4]
+        n[4] += 1
+        self.desired += self.increments
+
+        for i in (1, 2, 3):
+            d = self.desired[i] - n[i]
+            move = ((d >= 1) & (n[i + 1] - n[i] > 1)) | (
+                (d <= -1) & (n[i - 1] - n[i] < -1)
+            )
+            if not move.any():
+                continue
+            d = np.sign(d) * move
+            parabolic = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+            )
+            neighbour = np.where(d > 0, i + 1, i - 1)
+            q_neighbour = np.take_along_axis(q, neighbour[None], axis=0)[0]
+            n_neighbour = np.take_along_axis(n, neighbour[None], axis=0)[0]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                linear = q[i] + d * (q_neighbour - q[i]) / (n_neighbour - n[i])
+            use_parabolic = (q[i - 1] < parabolic) & (parabolic < q[i + 1])
+            q[i] = np.where(move, np.where(use_parabolic, parabolic, linear), q[i])
+            n[i] += d
+
+    @property
+    def value(self):
+        if self.count == 0:
+            return np.full(self.heights.shape[1:], np.nan)
+        if self.count < 5:
+            return np.percentile(np.stack(self._initial), 100 * self.p, axis=0)
+        return self.heights[2].copy()
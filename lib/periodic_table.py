@@ -1,48 +1,121 @@
-import pandas as pd
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+import csv
 import json
+import numpy as np
+
+DATA_DIRECTORY = Path(__file__).resolve().parent.parent / "data"
+PERIODIC_JSON = DATA_DIRECTORY / "periodic.json"
+ELEMENTS_CSV = DATA_DIRECTORY / "elements.csv"
 
 
 class Element:
+    def __init__(self, name, abrivation, atomic_number, atomic_mass, period, group):
+        self.name = name
+        self.abrivation = abrivation
+        self.atomic_number = atomic_number
+        self.atomic_mass = atomic_mass
+        self.period = period  # row
+        self.group = group  # column
+        self.protons = self.atomic_number
+        self.neutrons = self.atomic_mass - self.protons
+
+    def __repr__(self):
+        return f"{self.abrivation}\n{self.atomic_number}\n{self.atomic_mass}"
+
+
+@dataclass(frozen=True)
+class PeriodicTable:
+    """Element properties in contiguous arrays, one row per element in
+    atomic number order, with `index` mapping each symbol to its row."""
+
+    symbols: tuple
+    names: tuple
+    atomic_number: np.ndarray
+    atomic_mass: np.ndarray
+    period: np.ndarray
+    group: np.ndarray
+    index: dict = field(repr=False)
+
+    @classmethod
+    def from_json(cls, path=PERIODIC_JSON):
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+        symbols = tuple(data)
+
+        def column(name):
+            values = np.array([data[symbol][name] for symbol in symbols], dtype=float)
+            values.flags.writeable = False  # Shared by every caller in the process
+            return values
+
+        return cls(
+            symbols=symbols,
+            names=tuple(data[symbol]["name"] for symbol in symbols),
+            atomic_number=column("atomic_number").astype(int),
+            atomic_mass=column("atomic_mass"),
+            period=column("period").astype(int),
+            group=column("group").astype(int),
+            index={symbol: i for i, symbol in enumerate(symbols)},
+        )
 
+    def __len__(self):
+        return len(self.symbols)
 
-  def __init__(self, name, abrivation, atomic_number,
-               atomic_mass, period, group):
+    def __contains__(self, symbol):
+        return symbol in self.index
 
-    self.name = name
-    self.abrivation = abrivation
-    self.atomic_number = atomic_number
-    self.atomic_mass = atomic_mass
-    self.period = period #row
-    self.group = group #column
-    self.protons = self.atomic_number
-    self.neutrons = self.atomic_mass - self.protons
+    def row(self, symbol):
+        try:
+            return self.index[symbol]
+        except KeyError:
+            raise KeyError(f"Unknown element {symbol!r}") from None
 
+    def mass(self, symbol):
+        """Atomic mass in g/mol."""
+        return float(self.atomic_mass[self.row(symbol)])
 
-  def __repr__(self):
-    return f"{self.abrivation}\n{self.atomic_number}\n{self.atomic_mass}"
+    def element(self, symbol):
+        i = self.row(symbol)
+        return Element(
+            name=self.names[i],
+            abrivation=symbol,
+            atomic_number=int(self.atomic_number[i]),
+            atomic_mass=float(self.atomic_mass[i]),
+            period=int(self.period[i]),
+            group=int(self.group[i]),
+        )
 
 
-df = pd.read_csv('elements.csv', header=None).dropna(axis = 0)
-df[0] = df[0].str.strip("'")
-df[1] = df[1].str.strip("'")
+@lru_cache(maxsize=None)
+def periodic_table(path=PERIODIC_JSON):
+    """The process-wide PeriodicTable, loaded on first use."""
+    return PeriodicTable.from_json(path)
 
-periodic = {}
 
-for i in range(len(df)):
-  element = Element(name = df[0][i],
-                    abrivation = df[1][i],
-                    atomic_number = df[2][i],
-                    atomic_mass = df[3][i],
-                    period = df[4][i],
-                    group = df[5][i])
+@lru_cache(maxsize=None)
+def element(symbol):
+    return periodic_table().element(symbol)
 
 
-  periodic[element.abrivation] = {'name': element.name,
-                    'atomic_number': element.atomic_number,
-                    'atomic_mass': element.atomic_mass,
-                    'period':element.period,
-                    'group': element.group}
+def write_periodic_json(elements_csv=ELEMENTS_CSV, periodic_json=PERIODIC_JSON):
+    """Regenerate periodic.json from the headerless elements.csv."""
+    periodic = {}
+    with open(elements_csv, encoding="utf-8-sig", newline="") as file:
+        for row in csv.reader(file, quotechar="'"):
+            if not row or not row[0]:
+                continue
+            name, symbol, atomic_number, atomic_mass, period, group = row
+            periodic[symbol] = {
+                "name": name,
+                "atomic_number": float(atomic_number),
+                "atomic_mass": float(atomic_mass),
+                "period": float(period),
+                "group": float(group),
+            }
+    with open(periodic_json, "w", encoding="utf-8") as file:
+        json.dump(periodic, file, ensure_ascii=False, indent=4)
 
 
-with open('periodic.json', 'w', encoding='utf-8') as f:
-    json.dump(periodic, f, ensure_ascii=False, indent=4)
+if __name__ == "__main__":
+    write_periodic_json()
@@ -0,0 +1,392 @@
+from dataclasses import dataclass, field
+from typing import Optional
+import logging
+import numpy as np
+from lib import environment
+from lib.plant_config import (
+    ELECTROLYSIS_STAGE,
+    INTAKE_STAGE,
+    SABATIER_STAGE,
+    TANKS,
+    ExecutionPlan,
+    as_plan,
+)
+from lib.plant_parameters import PlantParameters
+from lib.reactor_settings import ReactorSettings
+from lib.storage_tank import StorageTank
+from lib.power_bus import ELECTROLYSIS, HEATING, INTAKE, PRESSURIZATION, PowerBus
+from lib.power_system import PowerSystem
+from lib.power_timeline import PowerTimeline
+from lib.atmosphere_intake_system import AtmosphereIntakeSystem
+from lib.containment_vessel import ContainmentVessel
+from lib.sabatier_reactor import SabatierReactor
+from lib.scheduler import Scheduler
+from lib.electrolysis_reactor import ElectrolysisReactor
+from lib.telemetry import (
+    CATALYST_REPLACED,
+    ELECTROLYSIS_IDLE,
+    INTAKE_SKIPPED,
+    POWER_LIMITED,
+    Telemetry,
+    report,
+)
+from lib.vessel_dynamics import VesselDynamics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Plant:
+    """The wired-up fuel production plant advanced by the scalar engine."""
+
+    settings: ReactorSettings
+    CO2_tank: StorageTank
+    H2_tank: StorageTank
+    CH4_tank: StorageTank
+    H2O_tank: StorageTank
+    O2_tank: StorageTank
+    power_system: PowerSystem
+    atmosphere_intake: Optional[AtmosphereIntakeSystem]  # None if the plan has none
+    sabatier_reactor: SabatierReactor
+    electrolysis_reactor: Optional[ElectrolysisReactor]  # None if the plan has none
+    telemetry: Telemetry
+    params: Optional[PlantParameters] = None
+    sim_duration: float = 0.1
+    rng_state: Optional[dict] = None  # Generator state before the plant drew from it
+    scheduler: Optional[Scheduler] = None  # Rates of the components, see step
+    power_bus: PowerBus = field(default_factory=PowerBus)  # Settles each step's power
+    plan: Optional[ExecutionPlan] = None  # Topology and call order, see build
+
+    @classmethod
+    def build(cls, params=None, sim_duration=0.1, rng=None, telemetry=None, plan=None):
+        """Wire up the plant described by `plan` (an ExecutionPlan, or a
+        plant name or path; the default plant if None).
+
+        `params`, if given, replaces the plan's parameters, keeping its
+        topology.
+        """
+        plan = as_plan(plan)
+        if params is not None:
+            plan = plan.with_parameters(params)
+        params = plan.params
+        rng = rng or np.random.default_rng()
+        rng_state = rng.bit_generator.state
+        telemetry = telemetry or Telemetry()
+
+        # Storage tanks for reactants and products
+        settings = ReactorSettings()
+        tanks = [
+            StorageTank(
+                name,
+                capacity=getattr(params, f"{name}_capacity"),
+                level=getattr(params, f"{name}_initial_level"),
+                telemetry=telemetry,
+            )
+            for name in TANKS
+        ]
+
+        # Environmental cycles
+        total_time_steps = environment.total_time_steps(sim_duration)
+        temperature_cycle_c = environment.temperature_cycle_c(sim_duration, rng=rng)
+        pressure_cycle_pa = environment.pressure_cycle_pa(sim_duration, rng=rng)
+
+        # Initialize reactor and intake systems
+        power_system = PowerSystem(
+            solar_max_kw=params.solar_max_kw,
+            nuclear_max_kw=params.nuclear_max_kw,
+            battery_capacity_kj=params.battery_capacity_kj,
+            battery_level_kj=params.battery_level_kj,
+            rng=rng,
+        )
+        power_system.timeline = PowerTimeline.generate(
+            power_system, total_time_steps, rng
+        )
+
+        # Each component is connected to the tanks its ports name in the plan
+        atmosphere_intake = None
+        if plan.has(INTAKE_STAGE):
+            (CO2_out,) = plan.tank_rows(INTAKE_STAGE)
+            atmosphere_intake = AtmosphereIntakeSystem(
+                name=plan.component_names[INTAKE_STAGE],
+                CO2_tank=tanks[CO2_out],
+                power_system=power_system,
+                intake_rate=params.intake_rate,
+                power_per_cycle=params.intake_power_per_cycle,
+                interval_hours=params.intake_interval_hours,
+                telemetry=telemetry,
+            )
+
+        sabatier_reactor_containment_vessel = ContainmentVessel(
+            target_temp_c=params.target_temp_c,
+            vessel_volume_m3=params.vessel_volume_m3,
+            target_pressure_pa=params.target_pressure_pa,
+            insulation_factor=params.insulation_factor,
+            heating_power_kw=params.heating_power_kw,
+            pressurization_power_kw=params.pressurization_power_kw,
+            internal_temp_c=params.initial_temp_c,
+            internal_pressure_pa=params.initial_pressure_pa,
+            power_system=power_system,  # Reference to the power system to track energy usage
+            substeps=int(params.vessel_substeps),
+            dynamics=(
+                VesselDynamics.from_parameters(params, params.vessel_rtol)
+                if params.vessel_rtol > 0
+                else None
+            ),
+        )
+
+        CO2_in, H2_in, CH4_out, H2O_out = plan.tank_rows(SABATIER_STAGE)
+        sabatier_reactor = SabatierReactor(
+            settings=settings,
+            efficiency=params.sabatier_efficiency,
+            catalyst_degradation_rate=params.catalyst_degradation_rate,
+            vessel=sabatier_reactor_containment_vessel,
+            temperature_cycle_c=temperature_cycle_c,
+            pressure_cycle_pa=pressure_cycle_pa,
+            CO2_tank=tanks[CO2_in],
+            H2_tank=tanks[H2_in],
+            CH4_tank=tanks[CH4_out],
+            H2O_tank=tanks[H2O_out],
+            power_system=power_system,
+            telemetry=telemetry,
+        )
+
+        electrolysis_reactor = None
+        if plan.has(ELECTROLYSIS_STAGE):
+            H2O_in, H2_out, O2_out = plan.tank_rows(ELECTROLYSIS_STAGE)
+            electrolysis_reactor = ElectrolysisReactor(
+                settings,
+                tanks[H2O_in],
+                tanks[H2_out],
+                tanks[O2_out],
+                power_system,
+                efficiency=params.electrolysis_efficiency,
+                telemetry=telemetry,
+            )
+
+        components = {
+            "atmosphere_intake": atmosphere_intake,
+            "sabatier_reactor": sabatier_reactor,
+            "electrolysis_reactor": electrolysis_reactor,
+            "containment_vessel": sabatier_reactor_containment_vessel,
+        }
+        CO2_tank, H2_tank, CH4_tank, H2O_tank, O2_tank = tanks
+        return cls(
+            settings=settings,
+            CO2_tank=CO2_tank,
+            H2_tank=H2_tank,
+            CH4_tank=CH4_tank,
+            H2O_tank=H2O_tank,
+            O2_tank=O2_tank,
+            power_system=power_system,
+            atmosphere_intake=atmosphere_intake,
+            sabatier_reactor=sabatier_reactor,
+            electrolysis_reactor=electrolysis_reactor,
+            telemetry=telemetry,
+            params=params,
+            sim_duration=sim_duration,
+            rng_state=rng_state,
+            scheduler=Scheduler.from_components(
+                **{
+                    name: component
+                    for name, component in components.items()
+                    if component is not None
+                }
+            ),
+            plan=plan,
+        )
+
+    def _intake(self, hour, power_kj, intake_rate, power_per_cycle):
+        """Intake cycle with the energy granted on the bus; returns (CO2
+        added, power used)."""
+        CO2_tank = self.atmosphere_intake.CO2_tank
+        max_intake_possible = power_kj / power_per_cycle * intake_rate
+        tank_space_available = CO2_tank.capacity - CO2_tank.level
+        intake_amount = min(intake_rate, max_intake_possible, tank_space_available)
+        if intake_amount > 0:
+            CO2_tank.add(intake_amount)
+            return intake_amount, (intake_amount / intake_rate) * power_per_cycle
+        report(
+            self.telemetry,
+            logger,
+            self.atmosphere_intake.name,
+            INTAKE_SKIPPED,
+            "Insufficient power or tank capacity for atmosphere intake at hour %s.",
+            hour,
+        )
+        return 0, 0
+
+    def _sabatier(self, hour, settlement, efficiency, catalyst_degradation_rate):
+        """Vessel and Sabatier reaction with the power granted on the bus;
+        returns the (heating, pressurization) energy used and the CH4 made."""
+        reactor = self.sabatier_reactor
+        s = self.settings
+
+        # Catalyst degradation
+        reactor.current_efficiency = efficiency * np.exp(
+            -catalyst_degradation_rate * hour
+        )
+        reaction_efficiency = max(reactor.current_efficiency, 0)
+        if reaction_efficiency < reactor.min_operational_efficiency:
+            report(
+                self.telemetry,
+                logger,
+                "Sabatier",
+                CATALYST_REPLACED,
+                "Catalyst efficiency too low. Replacing catalyst.",
+            )
+            reactor.current_efficiency = efficiency
+
+        vessel = reactor.vessel
+        heating_power_used, pressurization_power_used = vessel.advance(
+            reactor.temperature_cycle_c[hour],
+            settlement[HEATING],
+            settlement[PRESSURIZATION],
+        )
+
+        # Sabatier reaction, scaled by the share of the vessel's request met
+        adjusted_efficiency = (
+            reaction_efficiency
+            * reactor.temp_factor(vessel.internal_temp_c)
+            * reactor.pressure_factor(vessel.internal_pressure_pa)
+        )
+        adjusted_efficiency = min(max(adjusted_efficiency, 0), 1)
+        supplied = settlement.fraction(HEATING, PRESSURIZATION)
+        if supplied < 1:
+            adjusted_efficiency *= supplied
+            report(
+                self.telemetry,
+                logger,
+                "Sabatier",
+                POWER_LIMITED,
+                "Scaled down operation due to limited power at hour %s.",
+                hour,
+            )
+        CO2_tank, H2_tank = reactor.CO2_tank, reactor.H2_tank
+        available_moles = min(
+            CO2_tank.level / s.molar_mass_CO2, H2_tank.level / s.molar_mass_H2 / 4
+        )
+        moles_CH4 = max(available_moles * adjusted_efficiency, 0)
+        CO2_tank.remove(moles_CH4 * s.molar_mass_CO2)
+        H2_tank.remove(moles_CH4 * 4 * s.molar_mass_H2)
+        CH4_produced = moles_CH4 * s.molar_mass_CH4
+        reactor.CH4_tank.add(CH4_produced)
+        reactor.H2O_tank.add(moles_CH4 * 2 * s.molar_mass_H2O)
+        return heating_power_used, pressurization_power_used, CH4_produced
+
+    def _electrolysis(self, hour, power_kj, efficiency):
+        """Split water with the energy granted on the bus; returns (H2
+        produced, power used)."""
+        reactor = self.electrolysis_reactor
+        s = self.settings
+        max_moles_power = (power_kj * efficiency) / s.energy_per_mole_H2O
+        moles_H2O = min(max_moles_power, reactor.H2O_tank.level / s.molar_mass_H2O)
+        if moles_H2O > 0:
+            reactor.H2O_tank.remove(moles_H2O * s.molar_mass_H2O)
+            H2_produced = moles_H2O * 2 * s.molar_mass_H2
+            reactor.H2_tank.add(H2_produced)
+            reactor.O2_tank.add(moles_H2O * s.molar_mass_O2)
+            return H2_produced, (moles_H2O * s.energy_per_mole_H2O) / efficiency
+        report(
+            self.telemetry,
+            logger,
+            "Electrolysis",
+            ELECTROLYSIS_IDLE,
+            "Insufficient resources for electrolysis at hour %s.",
+            hour,
+        )
+        return 0, 0
+
+    def step(self, hour, recorder):
+        """Advance the plant by one hour and append the results to `recorder`.
+
+        Components are called only in hours their scheduler Rate makes due;
+        the containment vessel sub-steps its thermal response within the
+        Sabatier cycle. Every component due this hour first requests power
+        on the bus, which settles generation and the battery once, and then
+        runs with what it was granted, in the order the plan lists them.
+        Their parameters are read from the plan's stage_parameters, as
+        floats, rather than from the components.
+        """
+        logger.debug("Running simulation for hour %s", hour)
+        self.telemetry.hour = hour
+        power_system = self.power_system
+        sabatier_reactor = self.sabatier_reactor
+        atmosphere_intake = self.atmosphere_intake
+        electrolysis_reactor = self.electrolysis_reactor
+        stage_parameters = self.plan.stage_parameters.tolist()
+        intake_rate, intake_power_per_cycle = stage_parameters[INTAKE_STAGE][:2]
+        sabatier_efficiency, catalyst_degradation_rate = stage_parameters[
+            SABATIER_STAGE
+        ][:2]
+        electrolysis_efficiency = stage_parameters[ELECTROLYSIS_STAGE][0]
+
+        total_power_generated = power_system.available_power(hour)
+        intake_due = atmosphere_intake is not None and self.scheduler.due(
+            "atmosphere_intake", hour
+        )
+
+        # Collect the hour's power requests and settle them in one pass
+        power_bus = self.power_bus
+        sabatier_reactor.request_power(power_bus, hour)
+        if intake_due:
+            CO2_tank = atmosphere_intake.CO2_tank
+            tank_space_available = max(CO2_tank.capacity - CO2_tank.level, 0)
+            power_bus.request(
+                INTAKE,
+                min(intake_rate, tank_space_available)
+                / intake_rate
+                * intake_power_per_cycle,
+            )
+        if electrolysis_reactor is not None:
+            power_bus.request(
+                ELECTROLYSIS,
+                electrolysis_reactor.H2O_tank.level
+                / self.settings.molar_mass_H2O
+                * self.settings.energy_per_mole_H2O
+                / electrolysis_efficiency,
+            )
+        settlement = power_bus.settle_power_system(power_system, total_power_generated)
+
+        # Run the components in the plan's order
+        CO2_added = intake_power = H2_produced = electrolysis_power = 0
+        for stage in self.plan.stages:
+            if stage == SABATIER_STAGE:
+                heating_power, pressurization_power, CH4_produced = self._sabatier(
+                    hour, settlement, sabatier_efficiency, catalyst_degradation_rate
+                )
+            elif stage == INTAKE_STAGE:
+                if intake_due:
+                    CO2_added, intake_power = self._intake(
+                        hour, settlement[INTAKE], intake_rate, intake_power_per_cycle
+                    )
+            else:
+                H2_produced, electrolysis_power = self._electrolysis(
+                    hour, settlement[ELECTROLYSIS], electrolysis_efficiency
+                )
+
+        # Collect data for this time step
+        sabatier_power_demand = heating_power + pressurization_power
+        recorder.append(
+            self.CO2_tank.level,
+            self.H2_tank.level,
+            self.CH4_tank.level,
+            self.H2O_tank.level,
+            self.O2_tank.level,
+            power_system.battery_level_kj,
+            sabatier_power_demand + electrolysis_power + intake_power,
+            H2_produced,
+            CH4_produced,
+            self.O2_tank.level,
+            CO2_added,
+            intake_power,
+            electrolysis_power,
+            sabatier_power_demand,
+            heating_power,
+            pressurization_power,
+            settlement.unmet_kj,
+            sabatier_reactor.vessel.internal_temp_c,
+            sabatier_reactor.vessel.internal_pressure_pa,
+            sabatier_efficiency * (1 - catalyst_degradation_rate * hour),
+            power_system.last_solar_power_kj,
+            power_system.last_nuclear_power_kj,
+        )
@@ -0,0 +1,331 @@
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from pathlib import Path
+import numpy as np
+from lib.plant_parameters import PlantParameters
+
+PLANTS_DIRECTORY = Path(__file__).resolve().parent.parent / "data" / "plants"
+DEFAULT_PLANT = "default"
+PLANT_SUFFIXES = (".yaml", ".yml", ".json")  # JSON is read as YAML
+
+# Tanks a plant can declare, in the row order used by the engines
+TANKS = ("CO2", "H2", "CH4", "H2O", "O2")
+TANK_PARAMETERS = ("capacity", "initial_level")
+POWER_PARAMETERS = (
+    "solar_max_kw",
+    "nuclear_max_kw",
+    "battery_capacity_kj",
+    "battery_level_kj",
+)
+INTEGER_PARAMETERS = ("intake_interval_hours", "vessel_substeps")
+
+TOP_LEVEL_KEYS = ("name", "tanks", "power", "components")
+COMPONENT_KEYS = ("type", "name", "reads", "writes", "parameters")
+
+# Stages of an execution plan, one per component type
+INTAKE_STAGE, SABATIER_STAGE, ELECTROLYSIS_STAGE = range(3)
+
+
+@dataclass(frozen=True)
+class ComponentType:
+    """What a plant description may say about one kind of component."""
+
+    stage: int
+    reads: tuple  # Port roles the component takes gas from
+    writes: tuple  # Port roles it fills
+    parameters: tuple  # PlantParameters fields it accepts
+    required: bool = False
+    step_parameters: tuple = ()  # Those read every step, see ExecutionPlan
+
+    @property
+    def ports(self):
+        return self.reads + self.writes
+
+
+COMPONENT_TYPES = {
+    "atmosphere_intake": ComponentType(
+        INTAKE_STAGE,
+        reads=(),
+        writes=("CO2",),
+        parameters=("intake_rate", "intake_power_per_cycle", "intake_interval_hours"),
+        step_parameters=("intake_rate", "intake_power_per_cycle"),
+    ),
+    "sabatier_reactor": ComponentType(
+        SABATIER_STAGE,
+        reads=("CO2", "H2"),
+        writes=("CH4", "H2O"),
+        parameters=(
+            "target_temp_c",
+            "vessel_volume_m3",
+            "target_pressure_pa",
+            "insulation_factor",
+            "heating_power_kw",
+            "pressurization_power_kw",
+            "initial_temp_c",
+            "initial_pressure_pa",
+            "vessel_substeps",
+            "vessel_rtol",
+            "sabatier_efficiency",
+            "catalyst_degradation_rate",
+        ),
+        required=True,
+        step_parameters=("sabatier_efficiency", "catalyst_degradation_rate"),
+    ),
+    "electrolysis_reactor": ComponentType(
+        ELECTROLYSIS_STAGE,
+        reads=("H2O",),
+        writes=("H2", "O2"),
+        parameters=("electrolysis_efficiency",),
+        step_parameters=("electrolysis_efficiency",),
+    ),
+}
+MAX_PORTS = max(len(kind.ports) for kind in COMPONENT_TYPES.values())
+MAX_STEP_PARAMETERS = max(len(kind.step_parameters) for kind in COMPONENT_TYPES.values())
+
+
+def _stage_parameters(params):
+    """(stage, parameter) table of each stage's step_parameters, NaN where
+    unused; scenarios add a trailing axis when `params` is stacked."""
+    table = np.full(
+        (len(COMPONENT_TYPES), MAX_STEP_PARAMETERS) + np.shape(params.intake_rate),
+        np.nan,
+    )
+    for kind in COMPONENT_TYPES.values():
+        for column, name in enumerate(kind.step_parameters):
+            table[kind.stage, column] = getattr(params, name)
+    table.flags.writeable = False
+    return table
+
+
+@dataclass(frozen=True)
+class ExecutionPlan:
+    """A validated plant description compiled for the engines.
+
+    `stages` lists the component stages in call order, and `ports[stage]`
+    the TANKS row connected to each port of that stage's component (in
+    ComponentType.ports order, -1 where unused), so both engines wire and
+    step the plant from integers resolved once here. `params` holds every
+    parameter, with PlantParameters defaults for any the description left
+    out, and `stage_parameters[stage]` the ones that stage's component reads
+    every step, in ComponentType.step_parameters order.
+    """
+
+    name: str
+    params: PlantParameters
+    stages: tuple
+    ports: np.ndarray  # (stage, port) -> row in TANKS
+    stage_parameters: np.ndarray  # (stage, parameter) -> value
+    component_names: tuple  # By stage, None where the plant has no such component
+    description: dict  # As loaded, so a checkpoint can compile the plan again
+
+    def has(self, stage):
+        return stage in self.stages
+
+    def tank_rows(self, stage):
+        """TANKS rows of the stage's ports, as plain ints."""
+        return tuple(int(row) for row in self.ports[stage] if row >= 0)
+
+    def tank_names(self, stage):
+        return tuple(TANKS[row] for row in self.tank_rows(stage))
+
+    def with_parameters(self, params):
+        """The same topology with another PlantParameters (scalar or stacked)."""
+        return replace(self, params=params, stage_parameters=_stage_parameters(params))
+
+
+def _parameter_errors(where, values, allowed):
+    if not isinstance(values, dict):
+        return [f"{where} must be a mapping"]
+    errors = []
+    for key, value in values.items():
+        if key not in allowed:
+            errors.append(f"{where}: unknown parameter {key!r}")
+        elif isinstance(value, bool) or not isinstance(value, (int, float)):
+            errors.append(f"{where}.{key} must be a number, not {value!r}")
+        elif key in INTEGER_PARAMETERS and (value != int(value) or value < 1):
+            errors.append(f"{where}.{key} must be a positive integer")
+    return errors
+
+
+def _tank_errors(tanks):
+    if not isinstance(tanks, dict):
+        return ["tanks must be a mapping"]
+    errors = []
+    defaults = PlantParameters()
+    for tank, values in tanks.items():
+        if tank not in TANKS:
+            errors.append(f"tanks: unknown tank {tank!r}; use one of {', '.join(TANKS)}")
+            continue
+        values = values or {}
+        problems = _parameter_errors(f"tanks.{tank}", values, TANK_PARAMETERS)
+        if not problems:
+            capacity = values.get("capacity", getattr(defaults, f"{tank}_capacity"))
+            level = values.get("initial_level", getattr(defaults, f"{tank}_initial_level"))
+            if capacity <= 0:
+                problems.append(f"tanks.{tank}.capacity must be positive")
+            elif not 0 <= level <= capacity:
+                problems.append(f"tanks.{tank}.initial_level must be between 0 and capacity")
+        errors += problems
+    return errors
+
+
+def _component_errors(index, component, seen):
+    where = f"components[{index}]"
+    if not isinstance(component, dict):
+        return [f"{where} must be a mapping"]
+    errors = [f"{where}: unknown key {key!r}" for key in component if key not in COMPONENT_KEYS]
+    kind = COMPONENT_TYPES.get(component.get("type"))
+    if kind is None:
+        return errors + [
+            f"{where}: unknown type {component.get('type')!r}; "
+            f"use one of {', '.join(COMPONENT_TYPES)}"
+        ]
+    where = f"{where} ({component['type']})"
+    if component["type"] in seen:
+        errors.append(f"{where}: a plant has at most one {component['type']}")
+    seen.add(component["type"])
+
+    for direction in ("reads", "writes"):
+        ports = component.get(direction) or {}
+        roles = getattr(kind, direction)
+        if not isinstance(ports, dict):
+            errors.append(f"{where}.{direction} must map ports to tanks")
+            continue
+        errors += [
+            f"{where}.{direction} has no tank for port {role!r}"
+            for role in roles
+            if role not in ports
+        ]
+        for role, tank in ports.items():
+            if role not in roles:
+                errors.append(f"{where}.{direction}: unknown port {role!r}")
+            elif tank not in TANKS:
+                errors.append(f"{where}.{direction}.{role}: unknown tank {tank!r}")
+    return errors + _parameter_errors(
+        f"{where}.parameters", component.get("parameters") or {}, kind.parameters
+    )
+
+
+def validate(description):
+    """Every problem with a plant description, or an empty list if it is valid."""
+    if not isinstance(description, dict):
+        return ["a plant description must be a mapping"]
+    errors = [f"unknown key {key!r}" for key in description if key not in TOP_LEVEL_KEYS]
+    if not isinstance(description.get("name", ""), str):
+        errors.append("name must be a string")
+    errors += _tank_errors(description.get("tanks") or {})
+    errors += _parameter_errors("power", description.get("power") or {}, POWER_PARAMETERS)
+
+    components = description.get("components")
+    if not isinstance(components, list) or not components:
+        return errors + ["components must be a non-empty list"]
+    seen = set()
+    for index, component in enumerate(components):
+        errors += _component_errors(index, component, seen)
+    errors += [
+        f"components: a plant needs a {type_name}"
+        for type_name, kind in COMPONENT_TYPES.items()
+        if kind.required and type_name not in seen
+    ]
+    return errors
+
+
+def compile_plan(description, source="plant description"):
+    """Validate a plant description and compile it into an ExecutionPlan.
+
+    Raises ValueError listing every problem found.
+    """
+    errors = validate(description)
+    if errors:
+        raise ValueError(f"Invalid {source}:\n" + "\n".join(f"  - {e}" for e in errors))
+
+    overrides = {}
+    for tank, values in (description.get("tanks") or {}).items():
+        for key, value in (values or {}).items():
+            overrides[f"{tank}_{key}"] = value
+    overrides.update(description.get("power") or {})
+
+    stages = []
+    ports = np.full((len(COMPONENT_TYPES), MAX_PORTS), -1, dtype=np.intp)
+    component_names = [None] * len(COMPONENT_TYPES)
+    for component in description["components"]:
+        kind = COMPONENT_TYPES[component["type"]]
+        connected = {**(component.get("reads") or {}), **(component.get("writes") or {})}
+        ports[kind.stage, : len(kind.ports)] = [
+            TANKS.index(connected[role]) for role in kind.ports
+        ]
+        component_names[kind.stage] = component.get("name", component["type"])
+        stages.append(kind.stage)
+        overrides.update(component.get("parameters") or {})
+    ports.flags.writeable = False
+
+    for key in INTEGER_PARAMETERS:
+        if key in overrides:
+            overrides[key] = int(overrides[key])
+    params = PlantParameters(**overrides)
+    return ExecutionPlan(
+        name=description.get("name", DEFAULT_PLANT),
+        params=params,
+        stages=tuple(stages),
+        ports=ports,
+        stage_parameters=_stage_parameters(params),
+        component_names=tuple(component_names),
+        description=description,
+    )
+
+
+def plant_path(plant):
+    """A description file path as given, or the file for a plant name in
+    PLANTS_DIRECTORY."""
+    path = Path(plant)
+    if path.suffix in PLANT_SUFFIXES:
+        return path
+    return PLANTS_DIRECTORY / f"{plant}.yaml"
+
+
+def available_plants():
+    """Names of the plant descriptions in PLANTS_DIRECTORY."""
+    return sorted(path.stem for path in PLANTS_DIRECTORY.glob("*.yaml"))
+
+
+def plant_revision(plant=DEFAULT_PLANT):
+    """(mtime_ns, size) of a plant description file by name or path; a
+    changed revision means a changed description."""
+    try:
+        stat = plant_path(plant).stat()
+    except FileNotFoundError:
+        raise ValueError(
+            f"Unknown plant {plant!r}; available: {', '.join(available_plants())}"
+        ) from None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def load_plan(plant=DEFAULT_PLANT):
+    """Load, validate and compile a plant description by name or path.
+
+    Plans are cached by file revision, so each description is read and
+    checked once per process until the file is edited.
+    """
+    return _load_plan(str(plant_path(plant)), plant_revision(plant))
+
+
+@lru_cache(maxsize=16)
+def _load_plan(path, revision):
+    import yaml
+
+    path = Path(path)
+    try:
+        text = path.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        raise ValueError(f"Unknown plant {str(path)!r}") from None
+    description = yaml.safe_load(text)
+    if isinstance(description, dict):
+        description.setdefault("name", path.stem)
+    return compile_plan(description, source=str(path))
+
+
+def as_plan(plant=None):
+    """An ExecutionPlan for a plan, a plant name or path, or None (the default)."""
+    if isinstance(plant, ExecutionPlan):
+        return plant
+    return load_plan(DEFAULT_PLANT if plant is None else str(plant))
@@ -0,0 +1,63 @@
+from dataclasses import dataclass, fields, replace
+import numpy as np
+
+
+@dataclass
+class PlantParameters:
+    # Storage tanks (g)
+    CO2_capacity: float = 10000
+    CO2_initial_level: float = 0
+    H2_capacity: float = 5000
+    H2_initial_level: float = 400
+    CH4_capacity: float = 3000
+    CH4_initial_level: float = 0
+    H2O_capacity: float = 2000
+    H2O_initial_level: float = 0
+    O2_capacity: float = 5000
+    O2_initial_level: float = 0
+
+    # Power system
+    solar_max_kw: float = 100
+    nuclear_max_kw: float = 500
+    battery_capacity_kj: float = 1_000_000
+    battery_level_kj: float = 500_000  # Start with half capacity
+
+    # Atmosphere intake
+    intake_rate: float = 100  # g of CO2 per cycle
+    intake_power_per_cycle: float = 50  # kJ per cycle
+    intake_interval_hours: int = 12
+
+    # Sabatier reactor containment vessel
+    target_temp_c: float = 275  # Optimal temperature for the Sabatier reaction
+    vessel_volume_m3: float = 1
+    target_pressure_pa: float = 100000  # ~1 bar
+    insulation_factor: float = 0.8
+    heating_power_kw: float = 10
+    pressurization_power_kw: float = 5
+    initial_temp_c: float = -60  # Mars average
+    initial_pressure_pa: float = 600  # Mars ambient
+    vessel_substeps: int = 1  # Thermal sub-steps per hour
+    vessel_rtol: float = 0  # Adaptive ODE tolerance in place of sub-steps; 0 for off
+
+    # Reactors
+    sabatier_efficiency: float = 0.9
+    catalyst_degradation_rate: float = 0.0001
+    electrolysis_efficiency: float = 0.8
+
+    def with_overrides(self, **overrides):
+        """Return a copy with the given parameters replaced."""
+        return replace(self, **overrides)
+
+    @classmethod
+    def stack(cls, parameter_sets):
+        """Combine several parameter sets into one whose fields are arrays
+        with one entry per scenario, as used by the ensemble engine."""
+        parameter_sets = list(parameter_sets)
+        return cls(
+            **{
+                f.name: np.array(
+                    [getattr(p, f.name) for p in parameter_sets], dtype=float
+                )
+                for f in fields(cls)
+            }
+        )
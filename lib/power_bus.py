@@ -0,0 +1,125 @@
+from dataclasses import dataclass, field
+import numpy as np
+from lib.power_system import PowerSystem
+
+# Consumers on the bus
+HEATING = "heating"
+PRESSURIZATION = "pressurization"
+INTAKE = "intake"
+ELECTROLYSIS = "electrolysis"
+
+# Lower numbers are served first when power is short; consumers sharing a
+# priority get the same fraction of their request
+PRIORITIES = {HEATING: 0, PRESSURIZATION: 0, INTAKE: 1, ELECTROLYSIS: 2}
+
+
+def _share(demand_kj, supply_kj):
+    """Fraction of `demand_kj` that `supply_kj` covers, at most 1."""
+    if isinstance(demand_kj, np.ndarray) or isinstance(supply_kj, np.ndarray):
+        return np.where(
+            demand_kj > supply_kj, supply_kj / np.where(demand_kj > 0, demand_kj, 1), 1.0
+        )
+    # Plain floats skip NumPy's per-call overhead on the scalar engine's hot path
+    return supply_kj / demand_kj if demand_kj > supply_kj else 1.0
+
+
+@dataclass
+class Settlement:
+    """The outcome of one PowerBus.settle: energy granted to each consumer
+    (kJ), what each asked for, and the battery level afterwards."""
+
+    allocations: dict
+    requested: dict
+    battery_level_kj: object
+    unmet_kj: object
+
+    def __getitem__(self, consumer):
+        return self.allocations.get(consumer, 0.0)
+
+    def fraction(self, *consumers):
+        """Share of the consumers' combined request that was granted; 1 where
+        nothing was requested."""
+        requested = sum(self.requested.get(c, 0.0) for c in consumers)
+        return _share(requested, sum(self[c] for c in consumers))
+
+
+@dataclass
+class PowerBus:
+    """Collects one step's power requests and settles them together.
+
+    Components call `request` during the step; `settle` then serves the
+    requests in priority order from the hour's generation plus what the
+    battery can deliver, charges the battery with any surplus or draws the
+    deficit from it, and clears the requests. Consumers sharing a priority
+    get the same fraction of their request. Settlement works on floats and
+    on NumPy arrays alike, so the scalar plant and the ensemble engine
+    settle through the same code.
+    """
+
+    charge_efficiency: float = PowerSystem.charge_efficiency
+    discharge_efficiency: float = PowerSystem.discharge_efficiency
+    requests: dict = field(default_factory=dict)  # Priority -> [(consumer, kJ)]
+
+    def request(self, consumer, demand_kj, priority=None):
+        if priority is None:
+            priority = PRIORITIES[consumer]
+        if isinstance(demand_kj, np.ndarray):
+            demand_kj = np.maximum(demand_kj, 0)
+        else:
+            demand_kj = max(demand_kj, 0)
+        self.requests.setdefault(priority, []).append((consumer, demand_kj))
+
+    def settle(self, generated_kj, battery_level_kj, battery_capacity_kj):
+        remaining = generated_kj + battery_level_kj * self.discharge_efficiency
+        requested = {}
+        allocations = {}
+        for priority in sorted(self.requests):
+            level = self.requests[priority]
+            demand = 0.0
+            for _, demand_kj in level:
+                demand = demand + demand_kj
+            share = _share(demand, remaining)
+            for consumer, demand_kj in level:
+                requested[consumer] = requested.get(consumer, 0.0) + demand_kj
+                allocations[consumer] = (
+                    allocations.get(consumer, 0.0) + demand_kj * share
+                )
+            remaining = remaining - demand * share
+        self.requests.clear()
+
+        used = sum(allocations.values())
+        surplus_kj = generated_kj - used
+        return Settlement(
+            allocations=allocations,
+            requested=requested,
+            battery_level_kj=self._charge(
+                battery_level_kj, surplus_kj, battery_capacity_kj
+            ),
+            unmet_kj=sum(requested.values()) - used,
+        )
+
+    def _charge(self, battery_level_kj, surplus_kj, battery_capacity_kj):
+        """Battery level after storing a surplus at charge_efficiency, or
+        after supplying a deficit at discharge_efficiency."""
+        if isinstance(surplus_kj, np.ndarray) or isinstance(
+            battery_level_kj, np.ndarray
+        ):
+            efficiency = np.where(
+                surplus_kj > 0, self.charge_efficiency, 1 / self.discharge_efficiency
+            )
+            return np.clip(
+                battery_level_kj + surplus_kj * efficiency, 0, battery_capacity_kj
+            )
+        if surplus_kj > 0:
+            battery_level_kj += surplus_kj * self.charge_efficiency
+        else:
+            battery_level_kj += surplus_kj / self.discharge_efficiency
+        return min(max(battery_level_kj, 0), battery_capacity_kj)
+
+    def settle_power_system(self, power_system, generated_kj):
+        """Settle against a scalar PowerSystem's battery and update its level."""
+        settlement = self.settle(
+            generated_kj, power_system.battery_level_kj, power_system.battery_capacity_kj
+        )
+        power_system.battery_level_kj = settlement.battery_level_kj
+        return settlement
@@ -1,5 +1,7 @@
 from dataclasses import dataclass
+from typing import Optional
 import numpy as np
+from lib.power_timeline import PowerTimeline
 
 
 @dataclass
@@ -16,6 +18,8 @@ class PowerSystem:
     on_duration: int = 12
     off_duration: int = 12
     martian_year_hours: int = 687 * 24  # Martian year in hours
+    timeline: Optional[PowerTimeline] = None  # Precomputed output, if any
+    rng: Optional[np.random.Generator] = None  # Falls back to the global state
 
     def seasonal_solar_modifier(self, hour):
         """Calculate a seasonal modifier based on the Martian year to simulate solar variability."""
@@ -26,9 +30,17 @@ class PowerSystem:
         return seasonal_modifier
 
     def available_power(self, hour):
+        if self.timeline is not None:
+            # One draw per hour: every caller in the same hour sees the same output
+            solar_power_kj, nuclear_power_kj = self.timeline.power_at(hour)
+            self.last_solar_power_kj = solar_power_kj
+            self.last_nuclear_power_kj = nuclear_power_kj
+            return solar_power_kj + nuclear_power_kj
+
         # Calculate solar and nuclear power in kJ for this hour
         seasonal_modifier = self.seasonal_solar_modifier(hour)
-        variability = np.random.normal(1, 0.1)  # 10% random variation
+        rng = self.rng or np.random
+        variability = rng.normal(1, 0.1)  # 10% random variation
         solar_power_kj = (
             self.solar_max_kw
             * seasonal_modifier
@@ -40,7 +52,7 @@ class PowerSystem:
 
         # Nuclear power in kJ
         nuclear_power_kj = (
-            np.random.uniform(0.9, 1.0) * self.nuclear_max_kw * 3600
+            rng.uniform(0.9, 1.0) * self.nuclear_max_kw * 3600
         )  # Convert kW to kJ
 
         # Total power available, prioritizing solar during the day
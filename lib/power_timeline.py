@@ -0,0 +1,53 @@
+from dataclasses import dataclass
+import numpy as np
+
+
+@dataclass
+class PowerTimeline:
+    """Solar and nuclear output for a whole horizon, drawn in one pass.
+
+    Arrays are indexed by hour, with a trailing scenario axis when the power
+    system parameters are arrays (see EnsembleSimulation).
+    """
+
+    solar_power_kj: np.ndarray
+    nuclear_power_kj: np.ndarray
+    start_hour: int = 0
+
+    def __post_init__(self):
+        # Plain Python lists make per-hour lookups cheap in the scalar engine
+        if np.ndim(self.solar_power_kj) == 1:
+            self._solar = self.solar_power_kj.tolist()
+            self._nuclear = self.nuclear_power_kj.tolist()
+
+    @classmethod
+    def generate(cls, power_system, hours, rng=None, start_hour=0):
+        rng = rng or np.random.default_rng()
+        hour = np.arange(start_hour, start_hour + hours)
+        shape = (hours,) + np.shape(power_system.solar_max_kw)
+        if len(shape) > 1:
+            hour = hour[:, None]
+
+        variability = rng.normal(1, 0.1, shape)  # 10% random variation
+        solar_power_kj = (
+            power_system.solar_max_kw
+            * power_system.seasonal_solar_modifier(hour)
+            * variability
+            * power_system.solar_efficiency
+            * 3600
+        )  # kJ conversion
+        solar_power_kj = np.where(
+            (hour % 24) < power_system.on_duration, solar_power_kj, 0.0
+        )
+        nuclear_power_kj = (
+            rng.uniform(0.9, 1.0, shape) * power_system.nuclear_max_kw * 3600
+        )  # Convert kW to kJ
+        return cls(solar_power_kj, nuclear_power_kj, start_hour)
+
+    def __len__(self):
+        return len(self.solar_power_kj)
+
+    def power_at(self, hour):
+        """Return (solar_kj, nuclear_kj) for an hour of a scalar timeline."""
+        index = hour - self.start_hour
+        return self._solar[index], self._nuclear[index]
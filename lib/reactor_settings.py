@@ -1,12 +1,18 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from lib.chem_help import molar_mass
+
+
+def _molar_mass(formula):
+    return field(default_factory=lambda: molar_mass(formula))
 
 
 @dataclass
 class ReactorSettings:
-    molar_mass_CO2: float = 44.01
-    molar_mass_H2: float = 2.016
-    molar_mass_CH4: float = 16.04
-    molar_mass_H2O: float = 18.015
-    molar_mass_O2: float = 32
+    # Molar masses in g/mol, from the shared periodic table
+    molar_mass_CO2: float = _molar_mass("C O_2")
+    molar_mass_H2: float = _molar_mass("H_2")
+    molar_mass_CH4: float = _molar_mass("C H_4")
+    molar_mass_H2O: float = _molar_mass("H_2 O")
+    molar_mass_O2: float = _molar_mass("O_2")
     energy_per_mole_CH4: float = 165  # kJ per mole CH4
     energy_per_mole_H2O: float = 285.8  # kJ per mole H2O
@@ -0,0 +1,111 @@
+from collections.abc import Mapping
+import numpy as np
+from lib.environment import TIME_STEPS_PER_DAY
+
+COLUMNS = (
+    "CO2_level",
+    "H2_level",
+    "CH4_level",
+    "H2O_level",
+    "O2_level",
+    "battery_level",
+    "power_demand",
+    "H2_produced",
+    "CH4_produced",  # By the Sabatier reaction, including any a full tank spills
+    "O2_produced",
+    "CO2_added",
+    "intake_power_demand",
+    "electrolysis_power_demand",
+    "sabatier_power_demand",
+    "heating_power_demand",
+    "pressurization_power_demand",
+    "unmet_power_demand",
+    "internal_temp_c",
+    "internal_pressure_pa",
+    "catalyst_efficiency",
+    "solar_power_generated",
+    "nuclear_power_generated",
+)
+
+# Columns computed from the recorder position on access instead of stored
+DERIVED_COLUMNS = ("hour", "sol")
+
+
+class SimulationRecorder(Mapping):
+    """Preallocated column buffers for simulation results.
+
+    Each recorded step is written in place into typed NumPy buffers sized to
+    the run. Indexing returns a zero-copy view of the rows written so far, so
+    the recorder can be used wherever the old dict of lists was.
+    """
+
+    def __init__(
+        self,
+        rows,
+        columns=COLUMNS,
+        width=None,
+        start_hour=0,
+        hour_stride=1,
+        dtype=np.float64,
+    ):
+        shape = (rows,) if width is None else (rows, width)
+        self.columns = tuple(columns)
+        self.buffers = {name: np.empty(shape, dtype=dtype) for name in self.columns}
+        self._ordered_buffers = [self.buffers[name] for name in self.columns]
+        self.rows = rows
+        self.start_hour = start_hour
+        self.hour_stride = hour_stride
+        self.position = 0
+        self.metadata = {}  # Run-level results that are not per-step columns
+
+    def append(self, *values):
+        """Record one step, given values in `columns` order."""
+        position = self.position
+        for buffer, value in zip(self._ordered_buffers, values):
+            buffer[position] = value
+        self.position = position + 1
+
+    def append_mapping(self, values):
+        self.append(*[values[name] for name in self.columns])
+
+    def clear(self, start_hour=None):
+        """Rewind to the first row so the buffers can be reused."""
+        self.position = 0
+        if start_hour is not None:
+            self.start_hour = start_hour
+
+    def column(self, name):
+        if name == "hour":
+            return self.start_hour + self.hour_stride * np.arange(self.position)
+        if name == "sol":
+            return self.column("hour") / TIME_STEPS_PER_DAY
+        return self.buffers[name][: self.position]
+
+    @property
+    def nbytes(self):
+        """Memory held by the column buffers."""
+        return sum(buffer.nbytes for buffer in self.buffers.values())
+
+    def __getitem__(self, name):
+        if name not in self.buffers and name not in DERIVED_COLUMNS:
+            raise KeyError(name)
+        return self.column(name)
+
+    def __iter__(self):
+        yield from self.columns
+        yield from DERIVED_COLUMNS
+
+    def __len__(self):
+        return len(self.columns) + len(DERIVED_COLUMNS)
+
+    def to_json_dict(self, columns=None, include_metadata=False):
+        """Plain lists for jsonify, optionally with the run-level metadata."""
+        data = {name: self[name].tolist() for name in (columns or self)}
+        if include_metadata:
+            data.update(self.metadata)
+        return data
+
+    def to_dataframe(self):
+        import pandas as pd
+
+        return pd.DataFrame({name: self[name] for name in self}, copy=False)
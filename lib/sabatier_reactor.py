@@ -1,10 +1,13 @@
 from dataclasses import dataclass
+from typing import Optional
 import logging
 import numpy as np
 from lib.reactor_settings import ReactorSettings
 from lib.containment_vessel import ContainmentVessel
 from lib.storage_tank import StorageTank
+from lib.power_bus import HEATING, PRESSURIZATION, PowerBus
 from lib.power_system import PowerSystem
+from lib.telemetry import CATALYST_REPLACED, POWER_LIMITED, Telemetry, report
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +29,7 @@ class SabatierReactor:
 
     # Activation energy in kJ/mol (approximate for the Sabatier reaction)
     activation_energy_kj: float = 50  # adjustable parameter
+    telemetry: Optional[Telemetry] = None
 
     def temp_factor(self, temp_c):
         R = 8.314  # Gas constant in J/(mol·K)
@@ -50,32 +54,54 @@ class SabatierReactor:
         pressure_effect = min(max(pressure_effect, 0), 1)  # Clamp between 0 and 1
         return pressure_effect
 
+    def request_power(self, bus, hour):
+        """Ask the bus for this hour's vessel heating and pressurization."""
+        heating_kj, pressurization_kj = self.vessel.power_demand(
+            self.temperature_cycle_c[hour]
+        )
+        bus.request(HEATING, heating_kj)
+        bus.request(PRESSURIZATION, pressurization_kj)
+
     def run_cycle(self, hour, total_power_available):
+        """Run one cycle, settling the vessel's power on its own bus."""
+        bus = PowerBus()
+        self.request_power(bus, hour)
+        settlement = bus.settle_power_system(self.power_system, total_power_available)
+        return self.run_allocated(hour, settlement), self.power_system.battery_level_kj
+
+    def run_allocated(self, hour, settlement):
+        """Run one cycle with the power granted to the vessel in `settlement`."""
         # Degrade efficiency over time
         self.current_efficiency = self.efficiency * np.exp(
             -self.catalyst_degradation_rate * hour
         )
         reaction_efficiency = max(self.current_efficiency, 0)
-        logger.info(
-            f"Running Sabatier reactor cycle with catalyst efficiency at {reaction_efficiency:.2f}"
+        logger.debug(
+            "Running Sabatier reactor cycle with catalyst efficiency at %.2f",
+            reaction_efficiency,
         )
 
         if reaction_efficiency < self.min_operational_efficiency:
-            logger.warning("Catalyst efficiency too low. Replacing catalyst.")
+            report(
+                self.telemetry,
+                logger,
+                "Sabatier",
+                CATALYST_REPLACED,
+                "Catalyst efficiency too low. Replacing catalyst.",
+            )
             self.current_efficiency = self.efficiency
 
         # Adjust temperature and pressure
-        external_temp_c = self.temperature_cycle_c[hour]
-        heating_info = self.vessel.adjust_temperature(external_temp_c, hour)
-        pressurization_info = self.vessel.adjust_pressure(hour)
-
-        # Retrieve internal conditions and power used
-        internal_temp_c = heating_info["Internal Temperature (°C)"]
-        internal_pressure_pa = pressurization_info["Internal Pressure (Pa)"]
-        heating_power_used = heating_info["Heating Power Used (kJ)"]
-        pressurization_power_used = pressurization_info[
-            "Pressurization Power Used (kJ)"
-        ]
+        vessel = self.vessel
+        heating_power_used, pressurization_power_used = vessel.advance(
+            self.temperature_cycle_c[hour],
+            settlement[HEATING],
+            settlement[PRESSURIZATION],
+        )
+
+        # Retrieve internal conditions
+        internal_temp_c = vessel.internal_temp_c
+        internal_pressure_pa = vessel.internal_pressure_pa
 
         # Calculate effects on reaction efficiency
         temp_effect = self.temp_factor(internal_temp_c)
@@ -84,37 +110,29 @@ class SabatierReactor:
         adjusted_efficiency = min(
             max(adjusted_efficiency, 0), 1
         )  # Clamp between 0 and 1
-        logger.info(f"Adjusted efficiency: {adjusted_efficiency:.2f}")
-
-        # Total power available
-        logger.info(f"Total power available: {total_power_available:.2f} kJ")
-
-        # Calculate total power required for heating and pressurization
-        power_needed = heating_power_used + pressurization_power_used
-
-        if total_power_available >= power_needed:
-            # Proceed as normal
-            result = self.process_reaction(adjusted_efficiency)
-            power_used = power_needed
-        else:
-            # Scale down based on available power
-            scaling_factor = total_power_available / power_needed
-            adjusted_efficiency *= scaling_factor
-            result = self.process_reaction(adjusted_efficiency)
-            power_used = total_power_available
-            logger.warning(
-                f"Scaled down operation due to limited power at hour {hour}."
+        logger.debug("Adjusted efficiency: %.2f", adjusted_efficiency)
+
+        # Scale down by the share of the vessel's request the bus could meet
+        supplied = settlement.fraction(HEATING, PRESSURIZATION)
+        if supplied < 1:
+            adjusted_efficiency *= supplied
+            report(
+                self.telemetry,
+                logger,
+                "Sabatier",
+                POWER_LIMITED,
+                "Scaled down operation due to limited power at hour %s.",
+                hour,
             )
 
-        # Manage battery and store outputs
-        self.power_system.manage_battery(power_used, total_power_available)
+        result = self.process_reaction(adjusted_efficiency)
         self.store_outputs(result)
         return {
             "CH4 Produced (g)": result["CH4 Produced (g)"],
             "H2O Produced (g)": result["H2O Produced (g)"],
             "Heating Power Used (kJ)": heating_power_used,
             "Pressurization Power Used (kJ)": pressurization_power_used,
-        }, self.power_system.battery_level_kj
+        }
 
     def process_reaction(self, efficiency):
         # Calculate available moles of reactants
@@ -137,8 +155,9 @@ class SabatierReactor:
         self.H2_tank.remove(moles_CH4 * 4 * self.settings.molar_mass_H2)
 
         # Log the reaction details
-        logger.info(
-            f"Sabatier reactor produced {moles_CH4 * self.settings.molar_mass_CH4:.2f} g of CH4."
+        logger.debug(
+            "Sabatier reactor produced %.2f g of CH4.",
+            moles_CH4 * self.settings.molar_mass_CH4,
         )
 
         return {
@@ -0,0 +1,60 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Rate:
+    """How often the engine runs a component.
+
+    The component is called in hours where (hour - phase_hours) is a
+    multiple of interval_hours, and advances its own physics in `substeps`
+    equal sub-steps of 1 / substeps hours within each call.
+    """
+
+    interval_hours: int = 1
+    substeps: int = 1
+    phase_hours: int = 0
+
+    @property
+    def dt_hours(self):
+        return 1 / self.substeps
+
+    def due(self, hour):
+        return (hour - self.phase_hours) % self.interval_hours == 0
+
+    def next_due(self, hour):
+        """The first hour at or after `hour` in which the component runs."""
+        return hour + (self.phase_hours - hour) % self.interval_hours
+
+
+EVERY_HOUR = Rate()
+
+
+class Scheduler:
+    """The Rate of each component a plant steps, by name.
+
+    Components declare their rate with a `rate` attribute; anything without
+    one runs every hour in a single step. Due checks are stateless, so a
+    plant restored from a checkpoint or fast-forwarded over whole sols stays
+    on the same schedule.
+    """
+
+    def __init__(self, rates):
+        self.rates = dict(rates)
+
+    @classmethod
+    def from_components(cls, **components):
+        return cls(
+            {
+                name: getattr(component, "rate", EVERY_HOUR)
+                for name, component in components.items()
+            }
+        )
+
+    def due(self, name, hour):
+        return self.rates[name].due(hour)
+
+    def next_due(self, name, hour):
+        return self.rates[name].next_due(hour)
+
+    def due_components(self, hour):
+        return [name for name, rate in self.rates.items() if rate.due(hour)]
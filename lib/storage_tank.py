@@ -1,5 +1,13 @@
 import logging
 from dataclasses import dataclass
+from typing import Optional
+from lib.telemetry import (
+    TANK_FULL,
+    TANK_LOW,
+    TANK_OVERDRAWN,
+    Telemetry,
+    report,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -10,24 +18,42 @@ class StorageTank:
     capacity: float
     level: float = 0
     is_low: bool = False
+    telemetry: Optional[Telemetry] = None
 
     def add(self, amount):
         if self.level + amount > self.capacity:
-            logger.warning(f"{self.name} tank is full. Cannot add more.")
+            report(
+                self.telemetry,
+                logger,
+                self.name,
+                TANK_FULL,
+                "%s tank is full. Cannot add more.",
+                self.name,
+            )
             self.level = self.capacity
         self.level = min(self.capacity, self.level + amount)
 
     def remove(self, amount):
         if amount > self.level:
-            logger.warning(
-                f"Attempting to remove more than available in the {self.name} tank"
+            report(
+                self.telemetry,
+                logger,
+                self.name,
+                TANK_OVERDRAWN,
+                "Attempting to remove more than available in the %s tank",
+                self.name,
             )
             amount = self.level  # Only remove what is available
         removed = min(self.level, amount)
         self.level -= removed
         if self.level < 0.1 * self.capacity:
-            logger.warning(
-                f"{self.name} tank is almost empty. Consider refilling soon."
+            report(
+                self.telemetry,
+                logger,
+                self.name,
+                TANK_LOW,
+                "%s tank is almost empty. Consider refilling soon.",
+                self.name,
             )
             self.is_low = True
         return removed
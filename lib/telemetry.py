@@ -0,0 +1,53 @@
+# Event names shared by the components
+TANK_FULL = "tank_full"
+TANK_OVERDRAWN = "tank_overdrawn"
+TANK_LOW = "tank_low"
+POWER_LIMITED = "power_limited"
+CATALYST_REPLACED = "catalyst_replaced"
+INTAKE_SKIPPED = "intake_skipped"
+ELECTROLYSIS_IDLE = "electrolysis_idle"
+
+
+class Telemetry:
+    """Per-component event counters for a simulation run.
+
+    Components report conditions such as a full tank or a power-limited
+    cycle with `event`. Each (component, event) pair keeps a count and the
+    first and last hour it occurred. In the default quiet mode that is all
+    that happens; verbose mode also logs every event.
+    """
+
+    def __init__(self, verbose=False):
+        self.verbose = verbose
+        self.hour = None  # Set by the engine at the start of each step
+        self.counters = {}
+
+    def event(self, logger, component, event, message, *args):
+        counter = self.counters.get((component, event))
+        if counter is None:
+            self.counters[(component, event)] = [1, self.hour, self.hour]
+        else:
+            counter[0] += 1
+            counter[2] = self.hour
+        if self.verbose:
+            logger.warning(message, *args)
+
+    def summary(self):
+        summary = {}
+        for (component, event), (count, first_hour, last_hour) in sorted(
+            self.counters.items()
+        ):
+            summary.setdefault(component, {})[event] = {
+                "count": count,
+                "first_hour": first_hour,
+                "last_hour": last_hour,
+            }
+        return summary
+
+
+def report(telemetry, logger, component, event, message, *args):
+    """Count an event on `telemetry`, or log it when a component has none."""
+    if telemetry is None:
+        logger.warning(message, *args)
+    else:
+        telemetry.event(logger, component, event, message, *args)
@@ -0,0 +1,248 @@
+from dataclasses import dataclass
+from functools import lru_cache
+import math
+import numpy as np
+
+R = 8.314  # J/(mol·K)
+R_SPECIFIC = 287  # J/(kg·K) for air (approximation)
+CP = 1005  # J/(kg·K), assumed average for the gas mixture
+PRESSURIZATION_KJ_PER_MOL = 1  # As in ContainmentVessel.pressurization_energy_kj
+
+# Absolute tolerance of each state variable: temperature (K), pressure (Pa),
+# and the heating and pressurization energy used so far (kJ)
+ATOL = (1e-3, 1e-1, 1e-3, 1e-3)
+N_STATES = len(ATOL)
+
+# Implicit scipy.integrate methods; LSODA takes the Jacobian as a dense array
+METHODS = ("BDF", "Radau", "LSODA")
+
+# Nonzero entries of each vessel's Jacobian block, as (row, column) states
+JACOBIAN_ENTRIES = ((0, 0), (0, 1), (0, 2), (1, 0), (1, 1), (1, 3), (2, 0), (2, 2), (3, 1), (3, 3))
+
+
+@lru_cache(maxsize=8)
+def _jacobian_indices(n_vessels):
+    """Row and column of every Jacobian entry on the stacked state vector;
+    vessels are independent, so each state depends only on its own vessel's."""
+    vessels = np.arange(n_vessels)
+    rows = np.concatenate([i * n_vessels + vessels for i, _ in JACOBIAN_ENTRIES])
+    columns = np.concatenate([j * n_vessels + vessels for _, j in JACOBIAN_ENTRIES])
+    return rows, columns
+
+
+def _ramp(x, band):
+    """clip(x / band, 0, 1) and its derivative with respect to x."""
+    ramp = np.clip(x / band, 0, 1)
+    return ramp, np.where((x > 0) & (x < band), 1 / band, 0.0)
+
+
+@dataclass
+class VesselTrajectory:
+    """Dense solution of VesselDynamics.solve, queryable at any time in
+    [0, hours]."""
+
+    solution: object  # scipy.integrate.OdeSolution
+    n_vessels: int
+    hours: float
+    nfev: int  # Right-hand side evaluations the solve took
+
+    def __call__(self, hours):
+        """(temperature °C, pressure Pa, heating kJ, pressurization kJ) at
+        `hours` into the solve, each with one entry per vessel (and a
+        trailing axis if `hours` is an array)."""
+        return tuple(
+            self.solution(hours).reshape(N_STATES, self.n_vessels, *np.shape(hours))
+        )
+
+    def final(self):
+        return self(self.hours)
+
+
+@dataclass
+class VesselDynamics:
+    """Continuous heating and pressurization of one or many containment
+    vessels, integrated with an adaptive stiff solver.
+
+    Each vessel's state is its temperature, its pressure, and the heating
+    and pressurization energy used so far. Insulation losses close the gap
+    to the external temperature at -ln(insulation_factor) per hour, the
+    rate ContainmentVessel's hourly model applies in fixed steps. The
+    heater and the pump run at full power until within temp_band_c or
+    pressure_band_pa of target and then throttle down linearly, and both
+    wind down over the last energy_band_kj of their energy budget. These
+    fast control terms make the system stiff. The right-hand side and the
+    analytic Jacobian work on all vessels at once; the Jacobian is sparse
+    (vessels are independent), so the implicit steps stay cheap however
+    many vessels are solved together.
+
+    Vessel parameters are floats or arrays with one entry per vessel.
+    """
+
+    target_temp_c: object
+    target_pressure_pa: object
+    vessel_volume_m3: object
+    insulation_factor: object
+    heating_power_kw: object
+    pressurization_power_kw: object
+    rtol: float = 1e-4
+    method: str = "BDF"
+    temp_band_c: float = 1.0
+    pressure_band_pa: float = 100.0
+    energy_band_kj: float = 1.0
+
+    @classmethod
+    def from_parameters(cls, params, rtol):
+        """From PlantParameters, scalar or stacked with one vessel per scenario."""
+        return cls(
+            target_temp_c=params.target_temp_c,
+            target_pressure_pa=params.target_pressure_pa,
+            vessel_volume_m3=params.vessel_volume_m3,
+            insulation_factor=params.insulation_factor,
+            heating_power_kw=params.heating_power_kw,
+            pressurization_power_kw=params.pressurization_power_kw,
+            rtol=rtol,
+        )
+
+    def _terms(self, y, c):
+        """Intermediate values shared by the right-hand side and Jacobian."""
+        temp_c, pressure_pa, heating_kj, pressurization_kj = y.reshape(N_STATES, c["n"])
+        terms = {"temp_c": temp_c, "pressure_pa": pressure_pa, "temp_k": temp_c + 273.15}
+        terms["gas_kg_per_pa"] = c["volume"] / (R_SPECIFIC * terms["temp_k"])
+        terms["mass_kg"] = np.maximum(pressure_pa * terms["gas_kg_per_pa"], 0.001)
+        for name, gap, band in (
+            ("heat", c["target_temp"] - temp_c, self.temp_band_c),
+            ("heat_left", c["heating_budget"] - heating_kj, self.energy_band_kj),
+            ("pump", c["target_pressure"] - pressure_pa, self.pressure_band_pa),
+            ("pump_left", c["pressurization_budget"] - pressurization_kj, self.energy_band_kj),
+        ):
+            terms[name], terms[f"d{name}"] = _ramp(gap, band)
+        terms["heating"] = c["max_heating"] * terms["heat"] * terms["heat_left"]  # kJ/h
+        terms["pumping"] = c["max_pumping"] * terms["pump"] * terms["pump_left"]  # kJ/h
+        return terms
+
+    def _rhs(self, t, y, c):
+        terms = self._terms(y, c)
+        heating, pumping = terms["heating"], terms["pumping"]
+        dtemp = heating * 1000 / (terms["mass_kg"] * CP) - c["loss_rate"] * (
+            terms["temp_c"] - c["external_temp"]
+        )
+        dpressure = pumping / PRESSURIZATION_KJ_PER_MOL * R * terms["temp_k"] / c["volume"]
+        return np.concatenate([dtemp, dpressure, heating, pumping])
+
+    def _jacobian(self, t, y, c):
+        from scipy.sparse import csc_matrix
+
+        terms = self._terms(y, c)
+        heating, pumping = terms["heating"], terms["pumping"]
+        pressure_pa, temp_k, mass_kg = terms["pressure_pa"], terms["temp_k"], terms["mass_kg"]
+        # The ramps fall as temperature, pressure and energy used rise
+        dheating_dtemp = -c["max_heating"] * terms["dheat"] * terms["heat_left"]
+        dheating_denergy = -c["max_heating"] * terms["heat"] * terms["dheat_left"]
+        dpumping_dpressure = -c["max_pumping"] * terms["dpump"] * terms["pump_left"]
+        dpumping_denergy = -c["max_pumping"] * terms["pump"] * terms["dpump_left"]
+
+        # Gas mass, unless held at its floor, is P V / (R T)
+        free = pressure_pa * terms["gas_kg_per_pa"] > 0.001
+        dmass_dtemp = np.where(free, -pressure_pa * terms["gas_kg_per_pa"] / temp_k, 0)
+        dmass_dpressure = np.where(free, terms["gas_kg_per_pa"], 0)
+        heat_rate = 1000 / (mass_kg * CP)  # K per kJ
+        pump_rate = R / (PRESSURIZATION_KJ_PER_MOL * c["volume"])  # Pa per kJ·K
+
+        # In JACOBIAN_ENTRIES order
+        values = np.concatenate(
+            [
+                heat_rate * (dheating_dtemp - heating * dmass_dtemp / mass_kg)
+                - c["loss_rate"],
+                -heat_rate * heating * dmass_dpressure / mass_kg,
+                heat_rate * dheating_denergy,
+                pump_rate * pumping,
+                pump_rate * temp_k * dpumping_dpressure,
+                pump_rate * temp_k * dpumping_denergy,
+                dheating_dtemp,
+                dheating_denergy,
+                dpumping_dpressure,
+                dpumping_denergy,
+            ]
+        )
+        size = N_STATES * c["n"]
+        jacobian = csc_matrix((values, _jacobian_indices(c["n"])), shape=(size, size))
+        return jacobian.toarray() if c["dense"] else jacobian
+
+    def solve(
+        self,
+        temp_c,
+        pressure_pa,
+        external_temp_c,
+        hours=1.0,
+        heating_budget_kj=math.inf,
+        pressurization_budget_kj=math.inf,
+    ):
+        """Integrate every vessel over `hours` from the given state, with
+        the external temperature held and the heater and pump limited to
+        their energy budgets (kJ). Returns a VesselTrajectory."""
+        from scipy.integrate import solve_ivp
+
+        if self.method not in METHODS:
+            raise ValueError(f"Unknown method {self.method!r}; use one of {METHODS}")
+        (
+            temp_c,
+            pressure_pa,
+            external_temp_c,
+            heating_budget_kj,
+            pressurization_budget_kj,
+            target_temp_c,
+            target_pressure_pa,
+            vessel_volume_m3,
+            insulation_factor,
+            heating_power_kw,
+            pressurization_power_kw,
+        ) = (
+            np.atleast_1d(np.asarray(values, dtype=float))
+            for values in np.broadcast_arrays(
+                temp_c,
+                pressure_pa,
+                external_temp_c,
+                heating_budget_kj,
+                pressurization_budget_kj,
+                self.target_temp_c,
+                self.target_pressure_pa,
+                self.vessel_volume_m3,
+                self.insulation_factor,
+                self.heating_power_kw,
+                self.pressurization_power_kw,
+            )
+        )
+        n = len(temp_c)
+        max_heating = heating_power_kw * 3600  # kJ/h
+        max_pumping = pressurization_power_kw * 3600
+        columns = {
+            "n": n,
+            "dense": n == 1 or self.method == "LSODA",
+            "external_temp": external_temp_c,
+            # A budget beyond what the heater or pump can use in `hours` never binds
+            "heating_budget": np.minimum(heating_budget_kj, max_heating * hours + 1),
+            "pressurization_budget": np.minimum(
+                pressurization_budget_kj, max_pumping * hours + 1
+            ),
+            "target_temp": target_temp_c,
+            "target_pressure": target_pressure_pa,
+            "volume": vessel_volume_m3,
+            # Insulation keeps insulation_factor of the gap per hour
+            "loss_rate": -np.log(np.clip(insulation_factor, 1e-12, 1)),
+            "max_heating": max_heating,
+            "max_pumping": max_pumping,
+        }
+        result = solve_ivp(
+            self._rhs,
+            (0, hours),
+            np.concatenate([temp_c, pressure_pa, np.zeros(2 * n)]),
+            method=self.method,
+            rtol=self.rtol,
+            atol=np.repeat(ATOL, n),
+            jac=self._jacobian,
+            dense_output=True,
+            args=(columns,),
+        )
+        if not result.success:
+            raise RuntimeError(f"Vessel integration failed: {result.message}")
+        return VesselTrajectory(result.sol, n, hours, result.nfev)
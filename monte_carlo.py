@@ -0,0 +1,167 @@
+"""Monte Carlo uncertainty bands for the plant.
+
+Each replicate is a scalar-engine run seeded from its own child of one
+SeedSequence, so replicates are statistically independent and any
+replicate can be reproduced from the root seed and its index, however
+many workers ran the batch:
+
+    python monte_carlo.py --replicates 500 --sim-duration 1 --seed 42
+"""
+
+import argparse
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from lib import environment
+from lib.online_stats import P2Quantile, RunningMean
+from lib.plant_parameters import PlantParameters
+from lib.recorder import SimulationRecorder
+from sweep import init_worker, limit_worker_threads
+
+# Per-sol outputs whose distribution is tracked across replicates
+BAND_COLUMNS = (
+    "CO2_level",
+    "H2_level",
+    "CH4_level",
+    "H2O_level",
+    "O2_level",
+    "battery_level",
+    "CH4_produced",  # g made by the Sabatier reaction during the sol
+)
+
+QUANTILES = {"p5": 0.05, "p50": 0.5, "p95": 0.95}
+
+
+def _run_replicates(tasks):
+    """Runs in a pool process; returns the end-of-sol BAND_COLUMNS of each run."""
+    import simulation
+
+    steps = environment.TIME_STEPS_PER_DAY
+    results = []
+    for seed, params, sim_duration, fast_forward in tasks:
+        recorder = simulation.run_simulation(
+            sim_duration=sim_duration,
+            params=params,
+            seed=seed,
+            fast_forward=fast_forward,
+        )
+        sols = {name: recorder[name][steps - 1 :: steps] for name in BAND_COLUMNS[:-1]}
+        # Summed from the reaction, as level differences stop once the tank fills
+        whole_sols = len(sols["CH4_level"])
+        sols["CH4_produced"] = (
+            recorder["CH4_produced"][: whole_sols * steps]
+            .reshape(whole_sols, steps)
+            .sum(axis=1)
+        )
+        results.append(sols)
+    return results
+
+
+def run_monte_carlo(
+    replicates=100,
+    sim_duration=1.0,
+    params=None,
+    seed=None,
+    max_workers=None,
+    chunk_size=4,
+    fast_forward=False,
+):
+    """Run `replicates` independent simulations and return their bands.
+
+    The result is a SimulationRecorder with one row per sol (the state at
+    the end of each sol) and, for every BAND_COLUMNS name, the columns
+    `<name>_mean` and `<name>_p5`, `_p50` and `_p95`. Replicates are streamed
+    into online mean and P-squared quantile accumulators as they finish, in
+    replicate order, so memory is bounded by the run length and the few
+    chunks in flight, not by the number of replicates. The root seed entropy
+    is kept in `metadata["seed"]` so an unseeded batch can be repeated.
+    """
+    params = params or PlantParameters()
+    seed_sequence = np.random.SeedSequence(seed)
+    children = seed_sequence.spawn(replicates)
+    tasks = [(child, params, sim_duration, fast_forward) for child in children]
+    chunks = [tasks[i : i + chunk_size] for i in range(0, len(tasks), chunk_size)]
+
+    sols = environment.total_time_steps(sim_duration) // environment.TIME_STEPS_PER_DAY
+    means = {name: RunningMean(sols) for name in BAND_COLUMNS}
+    quantiles = {
+        name: {label: P2Quantile(p, sols) for label, p in QUANTILES.items()}
+        for name in BAND_COLUMNS
+    }
+
+    def accumulate(results):
+        for result in results:
+            for name in BAND_COLUMNS:
+                means[name].update(result[name])
+                for estimator in quantiles[name].values():
+                    estimator.update(result[name])
+
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1:
+        for chunk in chunks:
+            accumulate(_run_replicates(chunk))
+    else:
+        limit_worker_threads()
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("forkserver"),
+            initializer=init_worker,
+        ) as executor:
+            # Keep two chunks per worker in flight and consume them in order
+            pending = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(_run_replicates, chunk))
+                if len(pending) >= 2 * max_workers:
+                    accumulate(pending.popleft().result())
+            while pending:
+                accumulate(pending.popleft().result())
+
+    columns = [
+        f"{name}_{stat}" for name in BAND_COLUMNS for stat in ("mean", *QUANTILES)
+    ]
+    recorder = SimulationRecorder(
+        sols,
+        columns=columns,
+        start_hour=environment.TIME_STEPS_PER_DAY - 1,
+        hour_stride=environment.TIME_STEPS_PER_DAY,
+    )
+    for name in BAND_COLUMNS:
+        recorder.buffers[f"{name}_mean"][:] = means[name].mean
+        for label, estimator in quantiles[name].items():
+            recorder.buffers[f"{name}_{label}"][:] = estimator.value
+    recorder.position = sols
+    recorder.metadata.update(
+        replicates=replicates, seed=seed_sequence.entropy, quantiles=QUANTILES
+    )
+    return recorder
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--replicates", type=int, default=100)
+    parser.add_argument("--sim-duration", type=float, default=1.0, help="Years per run")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=4)
+    parser.add_argument("--fast-forward", action="store_true")
+    parser.add_argument("--output", default="monte_carlo.csv")
+    args = parser.parse_args()
+
+    bands = run_monte_carlo(
+        replicates=args.replicates,
+        sim_duration=args.sim_duration,
+        seed=args.seed,
+        max_workers=args.workers,
+        chunk_size=args.chunk_size,
+        fast_forward=args.fast_forward,
+    )
+    bands.to_dataframe().to_csv(args.output, index=False)
+    print(f"Wrote {args.output} (seed {bands.metadata['seed']})")
+
+
+if __name__ == "__main__":
+    main()
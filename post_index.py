@@ -0,0 +1,167 @@
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+import yaml
+from markdown2 import markdown
+
+logger = logging.getLogger(__name__)
+
+MEDIUM_POSTS_FILE = "medium_posts.yaml"
+MARKDOWN_EXTRAS = ["fenced-code-blocks", "tables"]
+
+
+def file_key(entry):
+    """(mtime_ns, size) of a DirEntry or stat result; a changed key means a changed file."""
+    stat = entry.stat() if hasattr(entry, "stat") else entry
+    return stat.st_mtime_ns, stat.st_size
+
+
+def split_front_matter(content):
+    """Return (metadata, markdown body) for a post's text."""
+    if content.startswith("---"):
+        _, front_matter, md_content = content.split("---", 2)
+        return yaml.safe_load(front_matter) or {}, md_content.strip()
+    return {"title": "Untitled", "description": "", "image": ""}, content
+
+
+@dataclass
+class Post:
+    key: tuple  # file_key when the post was read
+    metadata: dict
+    markdown: str
+    _html: Optional[str] = field(default=None, repr=False)
+
+    @property
+    def html(self):
+        # Rendered on first view, then kept until the file changes
+        if self._html is None:
+            self._html = markdown(self.markdown, extras=MARKDOWN_EXTRAS)
+        return self._html
+
+
+class PostIndex:
+    """Parsed posts and their rendered HTML, kept in step with the posts
+    directory by file mtime and size.
+
+    `refresh` stats the directory and re-reads only files that were added
+    or changed, dropping deleted ones; the sorted index list and `version`
+    change only when something did. Without a watcher every lookup
+    refreshes first, which costs one directory scan. With
+    `watch_interval_s` a daemon thread, started on the first lookup in each
+    process (so after a gunicorn fork), refreshes in the background and
+    lookups only read the current snapshot.
+    """
+
+    def __init__(self, directory="posts", watch_interval_s=None):
+        self.directory = Path(directory)
+        self.watch_interval_s = watch_interval_s
+        self.version = 0  # Incremented whenever the index changes
+        self._posts = {}  # Markdown post stem -> Post
+        self._medium = (None, [])  # (file_key, posts) from MEDIUM_POSTS_FILE
+        self._snapshot = (0, [])  # (version, index list), replaced together
+        self._lock = threading.Lock()
+        self._watcher_lock = threading.Lock()
+        self._watcher = None
+        self._watcher_pid = None
+        self._stop = threading.Event()
+
+    def refresh(self):
+        with self._lock:
+            seen = {}
+            medium_key = None
+            try:
+                with os.scandir(self.directory) as entries:
+                    for entry in entries:
+                        if entry.name == MEDIUM_POSTS_FILE:
+                            medium_key = file_key(entry)
+                        elif entry.name.endswith(".md") and entry.is_file():
+                            seen[entry.name[:-3]] = file_key(entry)
+            except FileNotFoundError:
+                pass
+
+            changed = seen.keys() != self._posts.keys()
+            posts = {}
+            for stem, key in seen.items():
+                post = self._posts.get(stem)
+                if post is None or post.key != key:
+                    post = self._read_post(stem, key)
+                    changed = True
+                posts[stem] = post
+            if medium_key != self._medium[0]:
+                self._medium = (medium_key, self._read_medium_posts(medium_key))
+                changed = True
+
+            if changed:
+                self._posts = posts
+                self.version += 1
+                self._snapshot = (
+                    self.version,
+                    [posts[stem].metadata for stem in sorted(posts)] + self._medium[1],
+                )
+
+    def _read_post(self, stem, key):
+        content = (self.directory / f"{stem}.md").read_text(encoding="utf-8")
+        metadata, body = split_front_matter(content)
+        metadata = {**metadata, "content": body, "filename": stem}
+        return Post(key, metadata, body)
+
+    def _read_medium_posts(self, key):
+        if key is None:
+            return []
+        try:
+            with open(self.directory / MEDIUM_POSTS_FILE, encoding="utf-8") as file:
+                medium_posts = yaml.safe_load(file) or []
+        except Exception as e:
+            logger.error("Error loading Medium posts: %s", e)
+            return []
+        return [{**post, "is_medium": True} for post in medium_posts]
+
+    def _current(self):
+        if self._watcher_pid == os.getpid():
+            return
+        if self.watch_interval_s:
+            self.start_watcher(self.watch_interval_s)
+        else:
+            self.refresh()
+
+    def posts(self):
+        """(version, post metadata) for the index page: Markdown posts by
+        filename, then Medium posts."""
+        self._current()
+        return self._snapshot
+
+    def get(self, filename):
+        """The Post for `filename`, or None."""
+        self._current()
+        return self._posts.get(filename)
+
+    def start_watcher(self, interval_s=2.0):
+        """Refresh from a daemon thread every `interval_s` instead of per lookup."""
+        with self._watcher_lock:
+            if self._watcher_pid == os.getpid():
+                return
+            self.refresh()
+            self._stop.clear()
+
+            def watch():
+                while not self._stop.wait(interval_s):
+                    try:
+                        self.refresh()
+                    except Exception:
+                        logger.exception("Refreshing the post index failed")
+
+            self._watcher = threading.Thread(
+                target=watch, name="post-index", daemon=True
+            )
+            self._watcher.start()
+            self._watcher_pid = os.getpid()
+
+    def stop_watcher(self):
+        if self._watcher_pid == os.getpid():
+            self._stop.set()
+            self._watcher.join()
+        self._watcher = self._watcher_pid = None
@@ -0,0 +1,104 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from flask import Response, request
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    etag: str
+    mimetype: str
+
+    @property
+    def nbytes(self):
+        return len(self.body)
+
+
+@dataclass
+class CachedValue:
+    """An object kept alongside the responses, counted at `nbytes`."""
+
+    value: object
+    nbytes: int
+
+
+def cache_key(*parts):
+    """Stable key for a request from JSON-serializable parts."""
+    encoded = json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class ResponseCache:
+    """Bounded LRU of serialized responses, and of the objects they are cut
+    from, shared by the request threads of one worker process. Both count
+    towards one entry and byte budget."""
+
+    def __init__(self, max_entries=64, max_bytes=256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.total_bytes -= previous.nbytes
+            self._entries[key] = entry
+            self.total_bytes += entry.nbytes
+            while self._entries and (
+                len(self._entries) > self.max_entries
+                or self.total_bytes > self.max_bytes
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self.total_bytes -= evicted.nbytes
+
+    def get_or_build(self, key, build, mimetype):
+        """Return the cached response for `key`, calling `build()` for the
+        body on a miss."""
+        entry = self.get(key)
+        if entry is None:
+            body = build()
+            if isinstance(body, str):
+                body = body.encode("utf-8")
+            entry = CachedResponse(
+                body=body, etag=hashlib.sha256(body).hexdigest()[:32], mimetype=mimetype
+            )
+            self.put(key, entry)
+        return entry
+
+    def get_or_compute(self, key, compute, nbytes):
+        """Return the object cached for `key`, calling `compute()` on a miss
+        and counting the result at `nbytes(result)` bytes."""
+        entry = self.get(key)
+        if entry is None:
+            value = compute()
+            entry = CachedValue(value, nbytes(value))
+            self.put(key, entry)
+        return entry.value
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def conditional_response(entry, cache_control):
+    """Serve a cached entry, answering a matching If-None-Match with 304."""
+    if request.if_none_match.contains(entry.etag):
+        response = Response(status=304)
+    else:
+        response = Response(entry.body, mimetype=entry.mimetype)
+    response.set_etag(entry.etag)
+    response.headers["Cache-Control"] = cache_control
+    return response
@@ -5,209 +5,301 @@ document.addEventListener('DOMContentLoaded', function() {
     const pauseButton = document.getElementById('pause-simulation');
     const speedInput = document.getElementById('sim-speed');
     const durationInput = document.getElementById('sim-duration');
+    const seedInput = document.getElementById('sim-seed');
     const visualizationSelect = document.getElementById('visualization-select');
     const logsContainer = document.getElementById('logs-container');
 
-    let simulationData = null;
-    let simulationInterval = null;
-    let currentStep = 0;
+    const headerDecoder = new TextDecoder();
+
+    const HOURS_PER_SOL = 24;
+    const BASE_HOURS_PER_SECOND = HOURS_PER_SOL; // Played at sim_speed 1
+    const MAX_LOG_LINES = 200;
+
+    // Columns plotted by each visualization, as [column, trace name]
+    const VISUALIZATIONS = {
+        tank_levels: {
+            title: 'Storage Tank Levels Over Time',
+            yTitle: 'Level (g)',
+            traces: [['CO2_level', 'CO₂ Level'], ['H2_level', 'H₂ Level']]
+        },
+        power_demand: {
+            title: 'Power Demand Over Time',
+            yTitle: 'Power Demand (kJ)',
+            traces: [['power_demand', 'Total Power Demand']]
+        },
+        battery_level: {
+            title: 'Battery Level Over Time',
+            yTitle: 'Battery Level (kJ)',
+            traces: [['battery_level', 'Battery Level']]
+        },
+        production_metrics: {
+            title: 'Production Metrics Over Time',
+            yTitle: 'Production (g)',
+            traces: [['H2_produced', 'H₂ Produced'], ['O2_produced', 'O₂ Produced']]
+        },
+        environmental_conditions: {
+            title: 'Environmental Conditions Over Time',
+            yTitle: 'Value',
+            traces: [
+                ['internal_temp_c', 'Internal Temperature (°C)'],
+                ['internal_pressure_pa', 'Internal Pressure (Pa)']
+            ]
+        },
+        efficiency_metrics: {
+            title: 'Catalyst Efficiency Over Time',
+            yTitle: 'Efficiency',
+            traces: [['catalyst_efficiency', 'Catalyst Efficiency']]
+        },
+        power_generation: {
+            title: 'Power Generation Over Time',
+            yTitle: 'Power Generated (kJ)',
+            traces: [
+                ['solar_power_generated', 'Solar Power Generated'],
+                ['nuclear_power_generated', 'Nuclear Power Generated']
+            ]
+        }
+    };
+
+    let simulationData = null; // Column name -> typed array for the whole run
+    let receivedRows = 0;
+    let currentStep = 0; // Hours drawn so far
+    let playedHours = 0; // Fractional playback position
+    let lastFrameTime = null;
+    let animationFrame = null;
     let isPaused = false;
+    const logLines = [];
+    let logFrame = null; // Pending redraw of the log
+    let streamDone = false;
+    let streamRun = 0;
 
     runButton.addEventListener('click', function() {
         isPaused = false;
+        pauseButton.textContent = 'Pause';
         fetchSimulationData();
     });
 
     pauseButton.addEventListener('click', function() {
-        isPaused = true;
+        isPaused = !isPaused;
+        pauseButton.textContent = isPaused ? 'Resume' : 'Pause';
+        if (!isPaused && simulationData !== null && animationFrame === null) {
+            lastFrameTime = null; // Do not count the paused time
+            animationFrame = requestAnimationFrame(playFrame);
+        }
+    });
+
+    // Redraw the new visualization up to the current hour; playback carries on
+    visualizationSelect.addEventListener('change', function() {
+        if (simulationData !== null) {
+            createFigure();
+        }
     });
 
     function fetchSimulationData() {
-        const formData = new FormData();
-        formData.append('sim_speed', speedInput.value);
-        formData.append('sim_duration', durationInput.value);
+        const params = new URLSearchParams();
+        params.append('sim_speed', speedInput.value);
+        params.append('sim_duration', durationInput.value);
+        if (seedInput.value !== '') {
+            params.append('seed', seedInput.value);
+        }
+
+        // Results arrive as binary column messages (see wire_format.py), one
+        // sol each; playback starts with the first one
+        params.append('format', 'binary');
+        const run = ++streamRun;
+        simulationData = null;
+        receivedRows = 0;
+        streamDone = false;
+        currentStep = 0;
+        fetch('/run_simulation/stream?' + params.toString())
+        .then(response => {
+            if (!response.ok) {
+                // Rejected requests answer with {"error": ...}
+                return response.json().catch(() => ({})).then(body => {
+                    throw new Error(body.error || `HTTP ${response.status}`);
+                });
+            }
+            const reader = response.body.getReader();
+            let pending = new Uint8Array(0);
 
-        fetch('/run_simulation', {
-            method: 'POST',
-            body: formData
+            function read() {
+                return reader.read().then(({ done, value }) => {
+                    if (run !== streamRun) {
+                        reader.cancel(); // A newer run replaced this one
+                        return;
+                    }
+                    if (done) {
+                        streamDone = true;
+                        return;
+                    }
+                    pending = concatBytes(pending, value);
+                    let message;
+                    while ((message = decodeMessage(pending)) !== null) {
+                        appendChunk(message.header, message.columns);
+                        // Copy the rest so the next message starts 8-byte aligned
+                        pending = pending.slice(message.end);
+                    }
+                    return read();
+                });
+            }
+            return read();
         })
-        .then(response => response.json())
-        .then(data => {
-            simulationData = data;
-            currentStep = 0;
-            startSimulation();
+        .catch(error => {
+            if (run !== streamRun) {
+                return;
+            }
+            stopPlayback();
+            log(`Simulation failed: ${error.message}`);
         });
     }
 
-    function startSimulation() {
-        if (simulationInterval) {
-            clearInterval(simulationInterval);
+    function stopPlayback() {
+        streamDone = true;
+        if (animationFrame !== null) {
+            cancelAnimationFrame(animationFrame);
+            animationFrame = null;
         }
-        simulationInterval = setInterval(updateVisualization, 500); // Adjust interval as needed
     }
 
-    function updateVisualization() {
-        if (isPaused || currentStep >= simulationData.hour.length) {
-            clearInterval(simulationInterval);
-            return;
-        }
+    function concatBytes(a, b) {
+        const bytes = new Uint8Array(a.length + b.length);
+        bytes.set(a);
+        bytes.set(b, a.length);
+        return bytes;
+    }
 
-        const visualizationType = visualizationSelect.value;
-        if (visualizationType === 'tank_levels') {
-            plotTankLevels(currentStep);
-        } else if (visualizationType === 'power_demand') {
-            plotPowerDemand(currentStep);
-        } else if (visualizationType === 'battery_level') {
-            plotBatteryLevel(currentStep);
-        } else if (visualizationType === 'production_metrics') {
-            plotProductionMetrics(currentStep);
-        } else if (visualizationType === 'environmental_conditions') {
-            plotEnvironmentalConditions(currentStep);
-        } else if (visualizationType === 'efficiency_metrics') {
-            plotEfficiencyMetrics(currentStep);
-        } else if (visualizationType === 'power_generation') {
-            plotPowerGeneration(currentStep);
-        }
-
-        logsContainer.textContent += `Step ${currentStep}: Simulation running...\n`;
-        logsContainer.scrollTop = logsContainer.scrollHeight;
+    // Typed-array views of one complete message at the start of `bytes`
+    // (whose byteOffset is 0), or null until all of it has arrived
+    function decodeMessage(bytes) {
+        if (bytes.length < 4) {
+            return null;
+        }
+        const headerLength = new DataView(bytes.buffer).getUint32(0, true);
+        if (bytes.length < 4 + headerLength) {
+            return null;
+        }
+        const header = JSON.parse(headerDecoder.decode(bytes.subarray(4, 4 + headerLength)));
+        const bodyStart = 4 + headerLength;
+        const end = bodyStart + header.body_bytes;
+        if (bytes.length < end) {
+            return null;
+        }
+        const ArrayType = header.dtype === 'float32' ? Float32Array : Float64Array;
+        const columns = {};
+        for (const column of header.columns) {
+            columns[column.name] = new ArrayType(
+                bytes.buffer, bodyStart + column.offset, column.length);
+        }
+        return { header, columns, end };
+    }
 
-        currentStep++;
+    function appendChunk(header, columns) {
+        const first = simulationData === null;
+        if (first) {
+            // Columns are sized to the whole run once and filled in place
+            simulationData = {};
+            const ArrayType = header.dtype === 'float32' ? Float32Array : Float64Array;
+            for (const name in columns) {
+                simulationData[name] = new ArrayType(header.total_rows);
+            }
+        }
+        for (const name in columns) {
+            simulationData[name].set(columns[name], receivedRows);
+        }
+        receivedRows += header.rows;
+        if (first) {
+            startSimulation();
+        }
     }
 
-    function plotTankLevels(step) {
-        const traceCO2 = {
-            x: simulationData.hour.slice(0, step),
-            y: simulationData.CO2_level.slice(0, step),
-            name: 'CO₂ Level',
-            mode: 'lines'
-        };
-        const traceH2 = {
-            x: simulationData.hour.slice(0, step),
-            y: simulationData.H2_level.slice(0, step),
-            name: 'H₂ Level',
-            mode: 'lines'
-        };
-        const data = [traceCO2, traceH2];
-        const layout = {
-            title: 'Storage Tank Levels Over Time',
-            xaxis: { title: 'Time (hours)' },
-            yaxis: { title: 'Level (g)' }
-        };
-        Plotly.newPlot('visualization', data, layout);
+    function startSimulation() {
+        playedHours = 0;
+        currentStep = 0;
+        lastFrameTime = null;
+        logLines.length = 0;
+        createFigure();
+        if (animationFrame === null) {
+            animationFrame = requestAnimationFrame(playFrame);
+        }
     }
 
-    function plotPowerDemand(step) {
-        const tracePower = {
-            x: simulationData.hour.slice(0, step),
-            y: simulationData.power_demand.slice(0, step),
-            name: 'Total Power Demand',
-            mode: 'lines'
-        };
-        const data = [tracePower];
-        const layout = {
-            title: 'Power Demand Over Time',
-            xaxis: { title: 'Time (hours)' },
-            yaxis: { title: 'Power Demand (kJ)' }
-        };
-        Plotly.newPlot('visualization', data, layout);
+    // Advance playback by the hours due since the last frame and append them
+    // to the existing traces, so each frame costs only the new points
+    function playFrame(now) {
+        animationFrame = null;
+        if (isPaused || simulationData === null) {
+            return;
+        }
+        if (lastFrameTime !== null) {
+            const speed = Math.max(parseFloat(speedInput.value) || 1, 0);
+            playedHours += (now - lastFrameTime) / 1000 * BASE_HOURS_PER_SECOND * speed;
+            playedHours = Math.min(playedHours, receivedRows); // Wait for the stream
+        }
+        lastFrameTime = now;
+
+        const target = Math.min(Math.floor(playedHours), receivedRows);
+        if (target > currentStep) {
+            extendFigure(currentStep, target);
+            const sol = Math.floor(target / HOURS_PER_SOL);
+            if (sol > Math.floor(currentStep / HOURS_PER_SOL)) {
+                log(`Sol ${sol} reached (hour ${target})`);
+            }
+            currentStep = target;
+        }
+        if (streamDone && currentStep >= receivedRows) {
+            log(`Playback finished after ${receivedRows} hours`);
+            return;
+        }
+        animationFrame = requestAnimationFrame(playFrame);
     }
 
-    function plotBatteryLevel(step) {
-        const traceBattery = {
-            x: simulationData.hour.slice(0, step),
-            y: simulationData.battery_level.slice(0, step),
-            name: 'Battery Level',
-            mode: 'lines'
+    function traceData(visualization, start, end) {
+        return {
+            x: visualization.traces.map(() => simulationData.hour.slice(start, end)),
+            y: visualization.traces.map(([column]) => simulationData[column].slice(start, end))
         };
-        const data = [traceBattery];
-        const layout = {
-            title: 'Battery Level Over Time',
-            xaxis: { title: 'Time (hours)' },
-            yaxis: { title: 'Battery Level (kJ)' }
-        };
-        Plotly.newPlot('visualization', data, layout);
     }
 
-    function plotProductionMetrics(step) {
-        const traceH2Produced = {
-            x: simulationData.hour.slice(0, step),
-            y: simulationData.H2_produced.slice(0, step),
-            name: 'H₂ Produced',
-            mode: 'lines'
-        };
-        const traceO2Produced = {
-            x: simulationData.hour.slice(0, step),
-            y: simulationData.O2_produced.slice(0, step),
-            name: 'O₂ Produced',
+    // Draw the selected visualization once, with the hours played so far
+    function createFigure() {
+        const visualization = VISUALIZATIONS[visualizationSelect.value];
+        const data = traceData(visualization, 0, currentStep);
+        const traces = visualization.traces.map(([, name], i) => ({
+            x: data.x[i],
+            y: data.y[i],
+            name: name,
             mode: 'lines'
-        };
-        const data = [traceH2Produced, traceO2Produced];
+        }));
         const layout = {
-            title: 'Production Metrics Over Time',
+            title: visualization.title,
             xaxis: { title: 'Time (hours)' },
-            yaxis: { title: 'Production (g)' }
+            yaxis: { title: visualization.yTitle }
         };
-        Plotly.newPlot('visualization', data, layout);
+        Plotly.newPlot('visualization', traces, layout);
     }
 
-    function plotEnvironmentalConditions(step) {
-        const traceTemp = {
-            x: simulationData.hour.slice(0, step),
-            y: simulationData.internal_temp_c.slice(0, step),
-            name: 'Internal Temperature (°C)',
-            mode: 'lines'
-        };
-        const tracePressure = {
-            x: simulationData.hour.slice(0, step),
-            y: simulationData.internal_pressure_pa.slice(0, step),
-            name: 'Internal Pressure (Pa)',
-            mode: 'lines'
-        };
-        const data = [traceTemp, tracePressure];
-        const layout = {
-            title: 'Environmental Conditions Over Time',
-            xaxis: { title: 'Time (hours)' },
-            yaxis: { title: 'Value' }
-        };
-        Plotly.newPlot('visualization', data, layout);
+    function extendFigure(start, end) {
+        const visualization = VISUALIZATIONS[visualizationSelect.value];
+        Plotly.extendTraces(
+            'visualization',
+            traceData(visualization, start, end),
+            visualization.traces.map((_, i) => i)
+        );
     }
 
-    function plotEfficiencyMetrics(step) {
-        const traceEfficiency = {
-            x: simulationData.hour.slice(0, step),
-            y: simulationData.catalyst_efficiency.slice(0, step),
-            name: 'Catalyst Efficiency',
-            mode: 'lines'
-        };
-        const data = [traceEfficiency];
-        const layout = {
-            title: 'Catalyst Efficiency Over Time',
-            xaxis: { title: 'Time (hours)' },
-            yaxis: { title: 'Efficiency' }
-        };
-        Plotly.newPlot('visualization', data, layout);
+    // Keep the last MAX_LOG_LINES lines and redraw the log at most once a frame
+    function log(line) {
+        logLines.push(line);
+        if (logLines.length > MAX_LOG_LINES) {
+            logLines.splice(0, logLines.length - MAX_LOG_LINES);
+        }
+        if (logFrame === null) {
+            logFrame = requestAnimationFrame(drawLog);
+        }
     }
 
-    function plotPowerGeneration(step) {
-        const traceSolar = {
-            x: simulationData.hour.slice(0, step),
-            y: simulationData.solar_power_generated.slice(0, step),
-            name: 'Solar Power Generated',
-            mode: 'lines'
-        };
-        const traceNuclear = {
-            x: simulationData.hour.slice(0, step),
-            y: simulationData.nuclear_power_generated.slice(0, step),
-            name: 'Nuclear Power Generated',
-            mode: 'lines'
-        };
-        const data = [traceSolar, traceNuclear];
-        const layout = {
-            title: 'Power Generation Over Time',
-            xaxis: { title: 'Time (hours)' },
-            yaxis: { title: 'Power Generated (kJ)' }
-        };
-        Plotly.newPlot('visualization', data, layout);
+    function drawLog() {
+        logFrame = null;
+        logsContainer.textContent = logLines.join('\n');
+        logsContainer.scrollTop = logsContainer.scrollHeight;
     }
 });
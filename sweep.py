@@ -0,0 +1,268 @@
+"""Parameter sweeps over plant design parameters.
+
+Each configuration is a dict of PlantParameters overrides. The runs are
+spread over a process pool in chunks, each is reduced to a row of summary
+metrics in the worker, and the rows are collected into one table:
+
+    python sweep.py --grid solar_max_kw=50,100,200 --grid nuclear_max_kw=250,500 \\
+        --sim-duration 1 --output sweep.parquet
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields
+from pathlib import Path
+
+import numpy as np
+
+from lib.plant_parameters import PlantParameters
+
+logger = logging.getLogger(__name__)
+
+# Per-run metrics, in table column order
+SUMMARY_COLUMNS = (
+    "CH4_final_g",
+    "O2_final_g",
+    "CO2_captured_g",
+    "H2_produced_g",
+    "battery_min_kj",
+    "battery_final_kj",
+    "power_demand_mean_kj",
+    "power_demand_peak_kj",
+    "power_generated_kj",
+    "unmet_power_kj",
+    "internal_temp_mean_c",
+    "catalyst_efficiency_final",
+    "power_limited_hours",
+    "catalyst_replacements",
+    "tank_full_events",
+    "runtime_s",
+)
+
+PARAMETER_NAMES = tuple(f.name for f in fields(PlantParameters))
+
+
+def parameter_grid(**axes):
+    """Every combination of the given parameter values, as override dicts.
+
+    >>> parameter_grid(solar_max_kw=[50, 100], insulation_factor=[0.8])
+    [{'solar_max_kw': 50, 'insulation_factor': 0.8}, {'solar_max_kw': 100, 'insulation_factor': 0.8}]
+    """
+    unknown = set(axes) - set(PARAMETER_NAMES)
+    if unknown:
+        raise ValueError(f"Unknown plant parameters: {', '.join(sorted(unknown))}")
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*axes.values())]
+
+
+def event_count(events, event):
+    """Total count of `event` across components in a telemetry summary."""
+    return sum(
+        component_events[event]["count"]
+        for component_events in events.values()
+        if event in component_events
+    )
+
+
+def summarize(recorder):
+    """Reduce a run's recorder to one row of SUMMARY_COLUMNS metrics."""
+    events = recorder.metadata.get("events", {})
+    return {
+        "CH4_final_g": recorder["CH4_level"][-1],
+        "O2_final_g": recorder["O2_level"][-1],
+        "CO2_captured_g": recorder["CO2_added"].sum(),
+        "H2_produced_g": recorder["H2_produced"].sum(),
+        "battery_min_kj": recorder["battery_level"].min(),
+        "battery_final_kj": recorder["battery_level"][-1],
+        "power_demand_mean_kj": recorder["power_demand"].mean(),
+        "power_demand_peak_kj": recorder["power_demand"].max(),
+        "power_generated_kj": (
+            recorder["solar_power_generated"].sum()
+            + recorder["nuclear_power_generated"].sum()
+        ),
+        "unmet_power_kj": recorder["unmet_power_demand"].sum(),
+        "internal_temp_mean_c": recorder["internal_temp_c"].mean(),
+        "catalyst_efficiency_final": recorder["catalyst_efficiency"][-1],
+        "power_limited_hours": event_count(events, "power_limited"),
+        "catalyst_replacements": event_count(events, "catalyst_replaced"),
+        "tank_full_events": event_count(events, "tank_full"),
+    }
+
+
+def _run_one(task):
+    """Runs in a pool process; returns the summary row for one configuration."""
+    import simulation
+
+    overrides, base, sim_duration, seed, fast_forward = task
+    start = time.perf_counter()
+    try:
+        recorder = simulation.run_simulation(
+            sim_duration=sim_duration,
+            params=base.with_overrides(**overrides),
+            seed=seed,
+            fast_forward=fast_forward,
+        )
+        row = summarize(recorder)
+        row["error"] = ""
+    except Exception as e:
+        row = {name: np.nan for name in SUMMARY_COLUMNS}
+        row["error"] = f"{type(e).__name__}: {e}"
+    row["runtime_s"] = time.perf_counter() - start
+    return row
+
+
+def limit_worker_threads():
+    """Keep BLAS and OpenMP pools in workers from oversubscribing cores.
+
+    Every run is single threaded. The thread counts are read when NumPy is
+    first imported, and workers inherit the environment the forkserver
+    started with, so this sets them here before the first pool starts.
+    """
+    for variable in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ.setdefault(variable, "1")
+
+
+def init_worker():
+    logging.getLogger("simulation").setLevel(logging.WARNING)
+    logging.getLogger("lib").setLevel(logging.WARNING)
+
+
+def run_sweep(
+    configurations,
+    sim_duration=1.0,
+    seed=0,
+    base=None,
+    max_workers=None,
+    chunk_size=None,
+    fast_forward=False,
+):
+    """Run one simulation per configuration and return a summary DataFrame.
+
+    `configurations` is an iterable of dicts of PlantParameters overrides
+    applied to `base` (see parameter_grid). Every run uses the same `seed`,
+    so differences between rows come from the parameters alone rather than
+    from weather and noise. Runs are handed to the pool `chunk_size` at a
+    time (by default about four chunks per worker) to keep the per-task
+    overhead small; with `max_workers=1` they run in this process.
+
+    The table has one row per configuration, in order: the swept parameter
+    values, SUMMARY_COLUMNS, and an `error` column that is empty unless the
+    run raised.
+    """
+    import pandas as pd
+
+    configurations = [dict(configuration) for configuration in configurations]
+    base = base or PlantParameters()
+    max_workers = max_workers or os.cpu_count() or 1
+    tasks = [
+        (configuration, base, sim_duration, seed, fast_forward)
+        for configuration in configurations
+    ]
+    if chunk_size is None:
+        chunk_size = max(1, math.ceil(len(tasks) / (4 * max_workers)))
+
+    start = time.perf_counter()
+    if max_workers == 1 or len(tasks) <= 1:
+        rows = list(map(_run_one, tasks))
+    else:
+        limit_worker_threads()
+        with ProcessPoolExecutor(
+            max_workers=min(max_workers, len(tasks)),
+            mp_context=multiprocessing.get_context("forkserver"),
+            initializer=init_worker,
+        ) as executor:
+            rows = list(executor.map(_run_one, tasks, chunksize=chunk_size))
+    logger.info(
+        "Swept %d configurations on %d workers in %.1f s",
+        len(tasks),
+        max_workers,
+        time.perf_counter() - start,
+    )
+
+    swept = list(dict.fromkeys(name for c in configurations for name in c))
+    table = pd.DataFrame(
+        {
+            **{
+                name: [c.get(name, getattr(base, name)) for c in configurations]
+                for name in swept
+            },
+            **{name: [row[name] for row in rows] for name in SUMMARY_COLUMNS},
+            "error": [row["error"] for row in rows],
+        }
+    )
+    return table
+
+
+def write_table(table, path):
+    """Write the sweep table to a columnar file and return the path written.
+
+    `.parquet` is used when pyarrow is installed; otherwise, or for any other
+    suffix, the columns are saved as arrays in a NumPy `.npz` archive.
+    """
+    path = Path(path)
+    if path.suffix == ".parquet":
+        try:
+            table.to_parquet(path, index=False)
+            return path
+        except ImportError:
+            logger.warning("pyarrow is not installed; writing %s as .npz", path.name)
+    path = path.with_suffix(".npz")
+    np.savez(path, **{name: table[name].to_numpy() for name in table.columns})
+    return path
+
+
+def _parse_axis(text):
+    name, _, values = text.partition("=")
+    return name.strip(), [float(value) for value in values.split(",") if value.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--grid",
+        action="append",
+        default=[],
+        type=_parse_axis,
+        metavar="NAME=V1,V2,...",
+        help="A parameter axis; the sweep is the product of all axes",
+    )
+    parser.add_argument(
+        "--configurations",
+        help="JSON file with a list of parameter override objects, used instead of --grid",
+    )
+    parser.add_argument("--sim-duration", type=float, default=1.0, help="Years per run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--fast-forward", action="store_true")
+    parser.add_argument("--output", default="sweep.parquet")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    logging.getLogger("simulation").setLevel(logging.WARNING)
+    logging.getLogger("lib").setLevel(logging.WARNING)
+    if args.configurations:
+        configurations = json.loads(Path(args.configurations).read_text(encoding="utf-8"))
+    else:
+        configurations = parameter_grid(**dict(args.grid))
+
+    table = run_sweep(
+        configurations,
+        sim_duration=args.sim_duration,
+        seed=args.seed,
+        max_workers=args.workers,
+        chunk_size=args.chunk_size,
+        fast_forward=args.fast_forward,
+    )
+    print(f"Wrote {write_table(table, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
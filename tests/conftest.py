@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# Import lib, simulation and the web modules from the repository root, as
+# the app does, wherever pytest is run from
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
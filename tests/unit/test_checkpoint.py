@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+import simulation
+from lib.checkpoint import Checkpoint
+from lib.plant_config import load_plan
+
+SIM_DURATION = 0.02  # Martian years; 329 hours
+SEED = 11
+
+
+def assert_same_run(resumed, full):
+    assert resumed.columns == full.columns
+    for name in full:
+        np.testing.assert_array_equal(resumed[name], full[name], err_msg=name)
+    assert resumed.metadata["events"] == full.metadata["events"]
+
+
+@pytest.mark.parametrize("hour", [0, 1, 100, 328, 329])
+def test_resume_matches_a_full_run_bit_for_bit(hour):
+    full = simulation.run_simulation(sim_duration=SIM_DURATION, seed=SEED)
+    checkpoint = simulation.checkpoint_simulation(hour, SIM_DURATION, seed=SEED)
+    assert_same_run(simulation.resume_simulation(checkpoint), full)
+
+
+def test_resume_from_serialized_checkpoint():
+    full = simulation.run_simulation(sim_duration=SIM_DURATION, seed=SEED)
+    checkpoint = simulation.checkpoint_simulation(150, SIM_DURATION, seed=SEED)
+    restored = Checkpoint.from_bytes(checkpoint.to_bytes())
+    assert_same_run(simulation.resume_simulation(restored), full)
+
+
+def test_resume_keeps_the_plant_description():
+    plan = load_plan("earth_hydrogen")
+    full = simulation.run_simulation(sim_duration=SIM_DURATION, seed=SEED, plan=plan)
+    checkpoint = simulation.checkpoint_simulation(
+        120, SIM_DURATION, seed=SEED, plan=plan
+    )
+    restored = Checkpoint.from_bytes(checkpoint.to_bytes())
+    assert_same_run(simulation.resume_simulation(restored), full)
+
+
+def test_resume_with_the_vessel_ode_solver():
+    params = load_plan("default").params.with_overrides(vessel_rtol=1e-4)
+    full = simulation.run_simulation(sim_duration=0.005, params=params, seed=SEED)
+    checkpoint = simulation.checkpoint_simulation(30, 0.005, params=params, seed=SEED)
+    assert_same_run(simulation.resume_simulation(checkpoint), full)
+
+
+def test_forks_reject_initial_state_parameters():
+    checkpoint = simulation.checkpoint_simulation(10, SIM_DURATION, seed=SEED)
+    with pytest.raises(ValueError, match="battery_level_kj"):
+        simulation.resume_simulation(checkpoint, battery_level_kj=0)
+    forked = simulation.resume_simulation(checkpoint, battery_capacity_kj=2e6)
+    assert forked.metadata["forked_at_hour"] == 10
+
+
+@pytest.mark.parametrize("include_history", [True, False])
+def test_fast_forward_resumes_mid_sol(include_history):
+    checkpoint = simulation.checkpoint_simulation(
+        30, 0.3, seed=SEED, include_history=include_history
+    )
+    resumed = simulation.resume_simulation(checkpoint, fast_forward=True, tolerance=1e-2)
+    assert resumed.position == resumed.rows
+    assert resumed.metadata["skipped_sols"] > 0
+    assert np.all(np.isfinite(resumed["CH4_level"]))
+
+
+def test_fast_forward_rejects_an_intake_interval_that_splits_a_sol():
+    params = load_plan("default").params.with_overrides(intake_interval_hours=5)
+    with pytest.raises(ValueError, match="must divide 24"):
+        simulation.run_simulation(sim_duration=0.01, params=params, fast_forward=True)
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from lib.chem_help import (
+    AMBIGUOUS,
+    BALANCED,
+    INVALID,
+    NO_SOLUTION,
+    balance,
+    balance_equation,
+    balance_many,
+    compile_formula,
+    molar_mass,
+    molar_masses,
+    null_space,
+)
+from lib.periodic_table import periodic_table
+
+EQUATIONS = {
+    "C H_4 + H_2 O -> C O_2 + H_2": (BALANCED, (1, 2, 1, 4)),
+    "K I + K Cl O_3 + H Cl -> I_2 + H_2 O + K Cl": (BALANCED, (6, 1, 6, 3, 3, 7)),
+    "Fe + S_2 -> Fe S": (BALANCED, (2, 1, 2)),
+    "Fe S_2 + H N O_3 -> Fe_2 S_3 O_12 + N O + H_2 S O_4": (NO_SOLUTION, None),
+    "H_2 -> O_2": (NO_SOLUTION, None),
+    "H_2 + O_2 -> H_2 O + H_2 O_2": (AMBIGUOUS, None),
+    "H_2 + -> O": (INVALID, None),
+}
+
+
+def test_null_space_is_an_exact_integer_basis():
+    matrix = [[1, 0, -1], [0, 2, -1]]
+    (vector,) = null_space(matrix)
+    assert vector in ([2, 1, 2], [-2, -1, -2])
+    assert all(sum(a * b for a, b in zip(row, vector)) == 0 for row in matrix)
+
+
+def test_null_space_of_full_rank_and_empty_matrices():
+    assert null_space([[1, 2], [3, 4]]) == []
+    assert null_space([]) == []
+
+
+def test_null_space_stays_exact_with_large_coefficients():
+    matrix = [[10**12, -(10**12 + 1)]]
+    assert null_space(matrix) in ([[10**12 + 1, 10**12]], [[-(10**12 + 1), -(10**12)]])
+
+
+@pytest.mark.parametrize("equation, expected", EQUATIONS.items())
+def test_balance_equation(equation, expected):
+    result = balance_equation(equation)
+    assert (result.status, result.coefficients) == expected
+
+
+def test_balance_formats_results():
+    assert balance("Fe + S_2 -> Fe S") == "2Fe + 1S_2 -> 2Fe S"
+    assert balance("Fe S_2 + H N O_3 -> Fe_2 S_3 O_12 + N O + H_2 S O_4") == "No solution"
+    with pytest.raises(ValueError):
+        balance("H_2 + -> O")
+
+
+@pytest.mark.parametrize("max_workers, chunk_size", [(1, 512), (2, 2)])
+def test_balance_many_keeps_order(max_workers, chunk_size):
+    equations = list(EQUATIONS) * 3
+    results = balance_many(equations, max_workers=max_workers, chunk_size=chunk_size)
+    assert [result.equation for result in results] == equations
+    assert [(r.status, r.coefficients) for r in results] == [EQUATIONS[e] for e in equations]
+
+
+def test_compile_formula_returns_shared_read_only_vectors():
+    table = periodic_table()
+    rows, counts = compile_formula("H_2 O")
+    assert [table.symbols[row] for row in rows] == ["H", "O"]
+    assert counts.tolist() == [2, 1]
+    assert not rows.flags.writeable and not counts.flags.writeable
+    assert compile_formula("H_2 O")[0] is rows
+
+
+def test_compile_formula_sums_repeated_elements():
+    rows, counts = compile_formula("C H_3 C O O H")
+    table = periodic_table()
+    assert dict(zip((table.symbols[row] for row in rows), counts)) == {"C": 2, "H": 4, "O": 2}
+
+
+def test_molar_masses_match_molar_mass():
+    chemicals = ["H_2 O", "C O_2", "C H_4", "O_2"]
+    masses = molar_masses(chemicals)
+    np.testing.assert_allclose(masses, [molar_mass(c) for c in chemicals])
+    np.testing.assert_allclose(masses, [18.015, 44.009, 16.043, 31.998], atol=0.01)
+    assert molar_masses([]).shape == (0,)
+
+
+def test_compile_formula_rejects_unknown_elements():
+    with pytest.raises(KeyError, match="Xx"):
+        compile_formula("Xx_2")
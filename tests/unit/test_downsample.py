@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from lib.downsample import lttb_indices, min_max_indices, select, sol_aggregate
+from lib.recorder import SimulationRecorder
+
+
+def recorder_with(values):
+    recorder = SimulationRecorder(len(values), columns=("CO2_level",))
+    for value in values:
+        recorder.append(value)
+    return recorder
+
+
+def test_min_max_indices_keep_the_peaks():
+    values = np.zeros(1000)
+    values[123], values[877] = 5, -5
+    indices = min_max_indices(values, 20)
+    assert {0, 123, 877, 999} <= set(indices)
+    assert len(indices) <= 22
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_min_max_indices_short_and_empty_input():
+    np.testing.assert_array_equal(min_max_indices(np.arange(5.0), 10), np.arange(5))
+    assert len(min_max_indices(np.array([]), 10)) == 0
+
+
+def test_lttb_indices_keeps_ends_and_returns_points_rows():
+    x = np.arange(1000.0)
+    y = np.sin(x / 50)
+    indices = lttb_indices(x, y, 50)
+    assert len(indices) == 50
+    assert indices[0] == 0 and indices[-1] == 999
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_lttb_indices_few_points_and_empty_input():
+    x = np.arange(10.0)
+    np.testing.assert_array_equal(lttb_indices(x, x, 2), [0, 9])
+    np.testing.assert_array_equal(lttb_indices(x, x, 20), np.arange(10))
+    assert len(lttb_indices(np.array([]), np.array([]), 5)) == 0
+
+
+@pytest.mark.parametrize("points", [0, -1])
+def test_select_rejects_non_positive_points(points):
+    with pytest.raises(ValueError, match="points"):
+        select(recorder_with(np.arange(48.0)), points=points)
+
+
+def test_select_empty_window():
+    result = select(recorder_with(np.arange(48.0)), start_hour=100, points=10)
+    assert len(result["hour"]) == 0
+    assert len(result["CO2_level"]) == 0
+
+
+def test_select_window_and_unknown_columns():
+    recorder = recorder_with(np.arange(48.0))
+    result = select(recorder, columns=["CO2_level"], start_hour=10, end_hour=20)
+    np.testing.assert_array_equal(result["hour"], np.arange(10, 20))
+    np.testing.assert_array_equal(result["CO2_level"], np.arange(10.0, 20.0))
+    with pytest.raises(ValueError, match="Unknown columns"):
+        select(recorder, columns=["nope"])
+
+
+def test_sol_aggregate_per_sol_statistics():
+    hours = np.arange(48)
+    values = np.arange(48.0)
+    sols, means = sol_aggregate(hours, values, "mean", steps_per_sol=24)
+    np.testing.assert_array_equal(sols, [0, 1])
+    np.testing.assert_allclose(means, [11.5, 35.5])
+    _, maxima = sol_aggregate(hours, values, "max", steps_per_sol=24)
+    np.testing.assert_array_equal(maxima, [23, 47])
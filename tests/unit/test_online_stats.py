@@ -0,0 +1,31 @@
+import numpy as np
+
+from lib.online_stats import P2Quantile, RunningMean
+
+
+def test_p2_quantile_tracks_skewed_quantiles():
+    rng = np.random.default_rng(0)
+    data = rng.lognormal(mean=0, sigma=1, size=(5000, 4))
+    for p in (0.05, 0.5, 0.95):
+        estimate = P2Quantile(p, 4)
+        for row in data:
+            estimate.update(row)
+        np.testing.assert_allclose(estimate.value, np.quantile(data, p, axis=0), rtol=0.05)
+
+
+def test_p2_quantile_is_exact_for_the_first_five_updates():
+    estimate = P2Quantile(0.95, 2)
+    data = np.array([[3.0, 1.0], [1.0, 5.0], [2.0, 4.0]])
+    for row in data:
+        estimate.update(row)
+    np.testing.assert_allclose(estimate.value, np.percentile(data, 95, axis=0))
+
+
+def test_running_mean_matches_numpy():
+    rng = np.random.default_rng(1)
+    data = rng.normal(size=(50, 3))
+    running = RunningMean(3)
+    for row in data:
+        running.update(row)
+    np.testing.assert_allclose(running.mean, data.mean(axis=0))
+    np.testing.assert_allclose(running.variance, data.var(axis=0, ddof=1))
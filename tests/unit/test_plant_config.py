@@ -0,0 +1,146 @@
+import copy
+import os
+
+import pytest
+
+from lib.plant_config import (
+    ELECTROLYSIS_STAGE,
+    INTAKE_STAGE,
+    SABATIER_STAGE,
+    TANKS,
+    available_plants,
+    compile_plan,
+    load_plan,
+    validate,
+)
+from lib.plant_parameters import PlantParameters
+
+MINIMAL = {
+    "components": [
+        {
+            "type": "sabatier_reactor",
+            "reads": {"CO2": "CO2", "H2": "H2"},
+            "writes": {"CH4": "CH4", "H2O": "H2O"},
+        }
+    ]
+}
+
+ELECTROLYSIS = {
+    "type": "electrolysis_reactor",
+    "reads": {"H2O": "H2O"},
+    "writes": {"H2": "H2", "O2": "O2"},
+}
+
+
+def description(**changes):
+    result = copy.deepcopy(MINIMAL)
+    result.update(changes)
+    return result
+
+
+def sabatier(**changes):
+    component = copy.deepcopy(MINIMAL["components"][0])
+    component.update(changes)
+    return component
+
+
+def test_bundled_plants_compile():
+    assert {"default", "earth_hydrogen"} <= set(available_plants())
+    for plant in available_plants():
+        assert validate(load_plan(plant).description) == []
+
+
+def test_default_plant_matches_plant_parameters():
+    plan = load_plan("default")
+    assert plan.params == PlantParameters()
+    assert plan.stages == (INTAKE_STAGE, SABATIER_STAGE, ELECTROLYSIS_STAGE)
+    assert plan.tank_names(ELECTROLYSIS_STAGE) == ("H2O", "H2", "O2")
+    assert plan.stage_parameters[SABATIER_STAGE].tolist() == [0.9, 0.0001]
+
+
+def test_with_parameters_recompiles_stage_parameters():
+    plan = load_plan("default")
+    params = PlantParameters.stack([PlantParameters(intake_rate=rate) for rate in (1, 2)])
+    stacked = plan.with_parameters(params)
+    assert stacked.stage_parameters[INTAKE_STAGE, 0].tolist() == [1, 2]
+    assert plan.stage_parameters[INTAKE_STAGE, 0] == 100
+
+
+def test_minimal_plant_compiles_with_defaults():
+    plan = compile_plan(description())
+    assert plan.stages == (SABATIER_STAGE,)
+    assert not plan.has(INTAKE_STAGE)
+    assert plan.tank_rows(SABATIER_STAGE) == tuple(
+        TANKS.index(tank) for tank in ("CO2", "H2", "CH4", "H2O")
+    )
+    assert plan.params == PlantParameters()
+
+
+@pytest.mark.parametrize(
+    "plant, error",
+    [
+        ([], "must be a mapping"),
+        (description(colour="red"), "unknown key 'colour'"),
+        (description(name=3), "name must be a string"),
+        (description(components=[]), "components must be a non-empty list"),
+        (description(tanks={"N2": {}}), "unknown tank 'N2'"),
+        (description(tanks={"H2": {"capacity": 0}}), "capacity must be positive"),
+        (
+            description(tanks={"H2": {"capacity": 10, "initial_level": 20}}),
+            "initial_level must be between 0 and capacity",
+        ),
+        (description(power={"wind_kw": 1}), "unknown parameter 'wind_kw'"),
+        (description(power={"solar_max_kw": "lots"}), "must be a number"),
+        (description(power={"solar_max_kw": True}), "must be a number"),
+        (description(components=[{"type": "fusion"}]), "unknown type 'fusion'"),
+        (description(components=[ELECTROLYSIS]), "a plant needs a sabatier_reactor"),
+        (description(components=[sabatier(), sabatier()]), "at most one sabatier_reactor"),
+        (description(components=[sabatier(reads={"CO2": "CO2"})]), "no tank for port 'H2'"),
+        (
+            description(components=[sabatier(reads={"CO2": "CO2", "H2": "H2", "N2": "H2"})]),
+            "unknown port 'N2'",
+        ),
+        (
+            description(components=[sabatier(writes={"CH4": "CH4", "H2O": "Water"})]),
+            "unknown tank 'Water'",
+        ),
+        (
+            description(components=[sabatier(parameters={"intake_rate": 1})]),
+            "unknown parameter 'intake_rate'",
+        ),
+        (
+            description(components=[sabatier(parameters={"vessel_substeps": 1.5})]),
+            "must be a positive integer",
+        ),
+    ],
+)
+def test_validate_rejects(plant, error):
+    errors = validate(plant)
+    assert any(error in message for message in errors), errors
+    with pytest.raises(ValueError, match="Invalid test plant"):
+        compile_plan(plant, source="test plant")
+
+
+def test_compile_plan_reports_every_error():
+    plant = description(colour="red", tanks={"N2": {}})
+    with pytest.raises(ValueError) as raised:
+        compile_plan(plant)
+    assert "colour" in str(raised.value) and "N2" in str(raised.value)
+
+
+def test_unknown_plant_name():
+    with pytest.raises(ValueError, match="Unknown plant"):
+        load_plan("no_such_plant")
+
+
+def test_edited_plant_file_is_reloaded(tmp_path):
+    import yaml
+
+    path = tmp_path / "plant.yaml"
+    path.write_text(yaml.safe_dump(description(name="before")))
+    assert load_plan(path).description["name"] == "before"
+    assert load_plan(path) is load_plan(path)
+
+    path.write_text(yaml.safe_dump(description(name="after")))
+    os.utime(path, ns=(0, path.stat().st_mtime_ns + 1))
+    assert load_plan(path).description["name"] == "after"
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from lib.power_bus import ELECTROLYSIS, HEATING, INTAKE, PRESSURIZATION, PowerBus
+
+
+def lossless_bus():
+    return PowerBus(charge_efficiency=1.0, discharge_efficiency=1.0)
+
+
+def request_all(bus, heating, pressurization, intake, electrolysis):
+    bus.request(HEATING, heating)
+    bus.request(PRESSURIZATION, pressurization)
+    bus.request(INTAKE, intake)
+    bus.request(ELECTROLYSIS, electrolysis)
+
+
+def test_everything_granted_and_surplus_charges_the_battery():
+    bus = PowerBus(charge_efficiency=0.5, discharge_efficiency=1.0)
+    request_all(bus, 10, 10, 10, 10)
+    settlement = bus.settle(generated_kj=100, battery_level_kj=0, battery_capacity_kj=1000)
+    assert [settlement[c] for c in (HEATING, PRESSURIZATION, INTAKE, ELECTROLYSIS)] == [10] * 4
+    assert settlement.unmet_kj == 0
+    assert settlement.battery_level_kj == pytest.approx(30)
+    assert bus.requests == {}
+
+
+def test_shortfall_is_served_in_priority_order():
+    bus = lossless_bus()
+    request_all(bus, 20, 20, 30, 50)
+    settlement = bus.settle(generated_kj=50, battery_level_kj=10, battery_capacity_kj=100)
+    # The vessel comes first, the intake gets the rest, electrolysis nothing
+    assert settlement[HEATING] == settlement[PRESSURIZATION] == 20
+    assert settlement[INTAKE] == pytest.approx(20)
+    assert settlement[ELECTROLYSIS] == 0
+    assert settlement.fraction(INTAKE) == pytest.approx(2 / 3)
+    assert settlement.unmet_kj == pytest.approx(60)
+    assert settlement.battery_level_kj == pytest.approx(0)
+
+
+def test_consumers_sharing_a_priority_get_the_same_fraction():
+    bus = lossless_bus()
+    bus.request(HEATING, 30)
+    bus.request(PRESSURIZATION, 10)
+    settlement = bus.settle(generated_kj=20, battery_level_kj=0, battery_capacity_kj=100)
+    assert settlement[HEATING] == pytest.approx(15)
+    assert settlement[PRESSURIZATION] == pytest.approx(5)
+    assert settlement.fraction(HEATING, PRESSURIZATION) == pytest.approx(0.5)
+
+
+def test_unrequested_consumers_are_fully_served():
+    settlement = lossless_bus().settle(
+        generated_kj=0, battery_level_kj=5, battery_capacity_kj=10
+    )
+    assert settlement[INTAKE] == 0.0
+    assert settlement.fraction(INTAKE) == 1.0
+    assert settlement.battery_level_kj == 5
+
+
+def test_arrays_settle_like_scalars():
+    demands = np.array([[20, 20, 30, 50], [10, 10, 10, 10], [0, 0, 0, 0]], dtype=float)
+    generated = np.array([50.0, 100.0, 5.0])
+    battery = np.array([10.0, 0.0, 20.0])
+
+    bus = PowerBus()
+    request_all(bus, *demands.T)
+    vectorized = bus.settle(generated, battery, battery_capacity_kj=100)
+    for i in range(len(generated)):
+        scalar_bus = PowerBus()
+        request_all(scalar_bus, *demands[i])
+        scalar = scalar_bus.settle(generated[i], battery[i], battery_capacity_kj=100)
+        for consumer in (HEATING, PRESSURIZATION, INTAKE, ELECTROLYSIS):
+            assert vectorized[consumer][i] == pytest.approx(scalar[consumer])
+        assert vectorized.battery_level_kj[i] == pytest.approx(scalar.battery_level_kj)
+        assert vectorized.unmet_kj[i] == pytest.approx(scalar.unmet_kj)
+
+
+def test_negative_requests_count_as_zero():
+    bus = lossless_bus()
+    bus.request(INTAKE, -5)
+    bus.request(ELECTROLYSIS, np.array([-1.0, 2.0]))
+    settlement = bus.settle(generated_kj=10, battery_level_kj=0, battery_capacity_kj=100)
+    assert settlement[INTAKE] == 0
+    np.testing.assert_array_equal(settlement[ELECTROLYSIS], [0.0, 2.0])
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from lib.environment import TIME_STEPS_PER_DAY
+from lib.recorder import COLUMNS, SimulationRecorder
+
+
+def test_columns_grow_as_rows_are_appended():
+    recorder = SimulationRecorder(4, columns=("a", "b"))
+    assert len(recorder["a"]) == 0
+    recorder.append(1.0, 10.0)
+    recorder.append_mapping({"b": 20.0, "a": 2.0})
+    np.testing.assert_array_equal(recorder["a"], [1.0, 2.0])
+    np.testing.assert_array_equal(recorder["b"], [10.0, 20.0])
+    np.testing.assert_array_equal(recorder["hour"], [0, 1])
+    # Views share the preallocated buffers
+    assert np.shares_memory(recorder["a"], recorder.buffers["a"])
+
+
+def test_full_recorder_rejects_another_row():
+    recorder = SimulationRecorder(1, columns=("a",))
+    recorder.append(1.0)
+    with pytest.raises(IndexError):
+        recorder.append(2.0)
+
+
+def test_derived_hour_and_sol_columns():
+    recorder = SimulationRecorder(3, columns=("a",), start_hour=48, hour_stride=2)
+    for value in range(3):
+        recorder.append(value)
+    np.testing.assert_array_equal(recorder["hour"], [48, 50, 52])
+    np.testing.assert_allclose(recorder["sol"], np.array([48, 50, 52]) / TIME_STEPS_PER_DAY)
+
+
+def test_clear_rewinds_and_reuses_the_buffers():
+    recorder = SimulationRecorder(2, columns=("a",))
+    recorder.append(1.0)
+    buffer = recorder.buffers["a"]
+    recorder.clear(start_hour=24)
+    assert len(recorder["a"]) == 0
+    recorder.append(5.0)
+    assert recorder.buffers["a"] is buffer
+    np.testing.assert_array_equal(recorder["hour"], [24])
+
+
+def test_mapping_interface():
+    recorder = SimulationRecorder(1)
+    assert list(recorder) == [*COLUMNS, "hour", "sol"]
+    assert len(recorder) == len(COLUMNS) + 2
+    with pytest.raises(KeyError):
+        recorder["nope"]
+
+
+def test_width_records_one_column_per_scenario():
+    recorder = SimulationRecorder(2, columns=("a",), width=3)
+    recorder.append(np.array([1.0, 2.0, 3.0]))
+    recorder.append(4.0)  # Broadcast across scenarios
+    np.testing.assert_array_equal(recorder["a"], [[1, 2, 3], [4, 4, 4]])
+
+
+def test_to_json_dict_and_to_dataframe():
+    pytest.importorskip("pandas")
+    recorder = SimulationRecorder(3, columns=("a", "b"))
+    for value in range(2):
+        recorder.append(value, 2 * value)
+    recorder.metadata["seed"] = 7
+    assert recorder.to_json_dict(["a"]) == {"a": [0.0, 1.0]}
+    assert recorder.to_json_dict(include_metadata=True)["seed"] == 7
+
+    frame = recorder.to_dataframe()
+    assert list(frame.columns) == ["a", "b", "hour", "sol"]
+    assert len(frame) == 2
+    np.testing.assert_array_equal(frame["b"], [0.0, 2.0])
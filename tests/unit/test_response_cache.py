@@ -0,0 +1,17 @@
+from response_cache import ResponseCache
+
+
+def test_values_and_responses_share_the_byte_budget():
+    cache = ResponseCache(max_entries=8, max_bytes=100)
+    cache.get_or_build("page", lambda: "x" * 40, "text/html")
+    assert cache.get_or_compute("run", lambda: "recorder", lambda value: 50) == "recorder"
+    assert cache.total_bytes == 90
+
+    # Cached values are returned without computing them again
+    assert cache.get_or_compute("run", lambda: "other", lambda value: 50) == "recorder"
+
+    # Going over the budget evicts the least recently used entry
+    cache.get_or_compute("run2", lambda: "bigger", lambda value: 30)
+    assert cache.get("page") is None
+    assert cache.total_bytes == 80
+    assert len(cache) == 2
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+import wire_format
+
+
+def test_encode_decode_round_trip():
+    columns = {"hour": np.arange(5.0), "CO2_level": np.linspace(0, 1, 5), "empty": []}
+    data = wire_format.encode(columns, {"seed": 3})
+    header, decoded, end = wire_format.decode(data)
+    assert end == len(data)
+    assert header["seed"] == 3 and header["rows"] == 5 and header["dtype"] == "float64"
+    assert list(decoded) == list(columns)
+    for name, values in columns.items():
+        np.testing.assert_array_equal(decoded[name], values)
+
+
+def test_buffers_are_aligned_for_typed_array_views():
+    data = wire_format.encode({"a": np.arange(3.0), "b": np.arange(7.0)}, dtype="float32")
+    header, decoded, _ = wire_format.decode(data)
+    (header_length,) = np.frombuffer(data[:4], dtype="<u4")
+    body = 4 + int(header_length)
+    assert body % wire_format.ALIGNMENT == 0
+    assert all(column["offset"] % wire_format.ALIGNMENT == 0 for column in header["columns"])
+    assert decoded["b"].dtype == np.float32
+    np.testing.assert_array_equal(decoded["b"], np.arange(7.0))
+
+
+def test_concatenated_messages_decode_in_turn():
+    first = wire_format.encode({"a": [1.0, 2.0]}, {"total_rows": 3})
+    second = wire_format.encode({"a": [3.0]}, {"total_rows": 3})
+    stream = first + second
+    _, columns, offset = wire_format.decode(stream)
+    np.testing.assert_array_equal(columns["a"], [1.0, 2.0])
+    _, columns, offset = wire_format.decode(stream, offset)
+    np.testing.assert_array_equal(columns["a"], [3.0])
+    assert offset == len(stream)
+
+
+def test_unknown_dtype():
+    with pytest.raises(ValueError, match="float16"):
+        wire_format.encode({"a": [1.0]}, dtype="float16")
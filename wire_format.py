@@ -0,0 +1,82 @@
+"""Binary columnar encoding of simulation results.
+
+A message is
+
+    uint32 little-endian   header length in bytes
+    header                 UTF-8 JSON, space-padded to a multiple of 8 bytes
+    body                   one little-endian float buffer per column
+
+The header is {"dtype": "float64" | "float32", "rows": n, "columns":
+[{"name", "offset", "length"}], "body_bytes": ..., **metadata}, with each
+offset measured from the start of the body and a multiple of 8 bytes, so a
+browser can view every column in place as a Float64Array or Float32Array.
+Messages are self-delimiting and can be concatenated into a stream.
+
+NumPy is imported by encode and decode, so the app can import this module
+for MIMETYPE and DTYPES without loading it.
+"""
+
+import json
+import struct
+
+MIMETYPE = "application/vnd.pyisru.columns"
+DTYPES = {"float64": "<f8", "float32": "<f4"}
+ALIGNMENT = 8  # bytes; the largest element size, so every buffer is aligned
+
+
+def _padding(size):
+    return -size % ALIGNMENT
+
+
+def encode(columns, metadata=None, dtype="float64"):
+    """Encode a mapping of name -> 1-D array (and JSON-able metadata) as bytes."""
+    import numpy as np
+
+    if dtype not in DTYPES:
+        raise ValueError(f"Unknown dtype {dtype!r}; use one of {tuple(DTYPES)}")
+    buffers = []
+    entries = []
+    offset = 0
+    rows = 0
+    for name, values in columns.items():
+        data = np.ascontiguousarray(values, dtype=DTYPES[dtype]).tobytes()
+        entries.append({"name": name, "offset": offset, "length": len(values)})
+        buffers += [data, b"\0" * _padding(len(data))]
+        offset += len(data) + _padding(len(data))
+        rows = max(rows, len(values))
+
+    header = json.dumps(
+        {
+            **(metadata or {}),
+            "dtype": dtype,
+            "rows": rows,
+            "columns": entries,
+            "body_bytes": offset,
+        },
+        separators=(",", ":"),
+    ).encode("utf-8")
+    # The 4-byte length prefix counts towards the alignment of the body
+    header += b" " * _padding(4 + len(header))
+    return b"".join([struct.pack("<I", len(header)), header, *buffers])
+
+
+def decode(data, offset=0):
+    """Decode one message starting at `offset`.
+
+    Returns (header, {name: array}, offset of the next message); the arrays
+    are read-only views of `data`.
+    """
+    import numpy as np
+
+    (header_length,) = struct.unpack_from("<I", data, offset)
+    start = offset + 4
+    header = json.loads(bytes(data[start : start + header_length]))
+    body = start + header_length
+    dtype = np.dtype(DTYPES[header["dtype"]])
+    columns = {
+        entry["name"]: np.frombuffer(
+            data, dtype=dtype, count=entry["length"], offset=body + entry["offset"]
+        )
+        for entry in header["columns"]
+    }
+    return header, columns, body + header["body_bytes"]
@@ -1,4 +1,11 @@
-from app import app
+import os
+
+from app import app, warm_up
+
+# With PYISRU_PRELOAD=1, gunicorn imports this module once in the master
+# (see gunicorn.conf.py) and workers fork with the engine already loaded.
+if os.environ.get("PYISRU_PRELOAD") == "1":
+    warm_up()
 
 if __name__ == "__main__":
     app.run()